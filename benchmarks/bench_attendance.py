@@ -0,0 +1,51 @@
+"""
+Бенчмарк аналитики посещаемости: построение матрицы «игроки × тренировки»
+из истории опросов (1–5 сезонов) и ответ /stats по готовой матрице.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_attendance [--roster 1000]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import make_db
+from bot.handlers.stats import depth_chart_lines, summary_lines
+from bot.utils.attendance import build_attendance
+from bot.utils.reference_data import load_reference_data
+from data.synthetic_roster import fill_attendance
+
+SEASONS = [1, 3, 5]
+
+
+def per_call_ms(func, calls: int = 200) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1000
+
+
+async def run(roster: int):
+    print(f"{'seasons':>7} | {'votes':>8} | {'build, ms':>10} | {'summary, ms':>11} | {'depth QB, ms':>12}")
+    for seasons in SEASONS:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = await make_db(Path(tmp) / "bench.db", roster)
+            counts = fill_attendance(db_file, weeks=52 * seasons)
+            reference = await load_reference_data(db_file)
+
+            started = time.perf_counter()
+            matrix = await build_attendance(db_file)
+            build_ms = (time.perf_counter() - started) * 1000
+
+            qb = reference.position_ids["QB"]
+            summary_ms = per_call_ms(lambda: summary_lines(matrix, reference))
+            depth_ms = per_call_ms(lambda: depth_chart_lines(matrix, qb, "QB"))
+            print(f"{seasons:>7} | {counts['poll_votes']:>8} | {build_ms:>10.1f} | {summary_ms:>11.3f} | {depth_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roster", type=int, default=1000)
+    asyncio.run(run(parser.parse_args().roster))
@@ -0,0 +1,213 @@
+"""
+Нагрузочный тест: настоящий Dispatcher из bot/main.py, заглушка Telegram API
+и тысячи синтетических апдейтов через dp.feed_update.
+
+Сценарии (каждый «тренер» — отдельный пользователь со своим FSM):
+- players  — /players
+- poll     — /poll QB (опрос + упоминания игроков)
+- add      — полный диалог /add_player: 6 сообщений и 3 callback'а
+- callback — нажатие «Отмена» (callback_query)
+
+Выводит пропускную способность, p50/p95/p99 задержки и число SQL-запросов на апдейт.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_dispatcher [--roster 500] [--coaches 20] [--rounds 50] [--api-latency 0]
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from aiogram import Bot
+from aiogram.types import Update
+
+from benchmarks.common import make_db
+from benchmarks.fake_telegram import BOT_USER, FakeTelegramSession
+from bot.config import DB_PRAGMA_PROFILES
+from bot.main import create_dispatcher
+from bot.utils import db as db_module
+from bot.utils import sender as sender_module
+from bot.utils.db_pool import init_pool, close_pool
+from bot.utils.sqlite_storage import SQLiteStorage
+
+# Вне диапазона tg_id синтетического состава
+COACH_ID_BASE = 9_000_000_000
+_update_ids = itertools.count(1)
+_message_ids = itertools.count(1)
+
+
+def seed_coaches(db_file: Path, coaches: int):
+    conn = sqlite3.connect(db_file)
+    for i in range(coaches):
+        cursor = conn.execute(
+            "INSERT INTO team (name, surname, tg_username, tg_id, status) VALUES (?, ?, ?, ?, 'active')",
+            (f"Тренер{i}", f"Тренеров{i}", f"coach{i}", COACH_ID_BASE + i)
+        )
+        conn.execute("INSERT INTO player_roles (player_id, role_id) VALUES (?, 2)", (cursor.lastrowid,))
+    conn.commit()
+    conn.close()
+
+
+def user(tg_id: int) -> dict:
+    return {"id": tg_id, "is_bot": False, "first_name": f"Тренер{tg_id}"}
+
+
+def message_update(bot: Bot, tg_id: int, text: str) -> Update:
+    entities = []
+    if text.startswith("/"):
+        entities = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return Update.model_validate({
+        "update_id": next(_update_ids),
+        "message": {
+            "message_id": next(_message_ids),
+            "date": int(time.time()),
+            "chat": {"id": tg_id, "type": "private"},
+            "from": user(tg_id),
+            "text": text,
+            "entities": entities,
+        },
+    }, context={"bot": bot})
+
+
+def callback_update(bot: Bot, tg_id: int, data: str) -> Update:
+    return Update.model_validate({
+        "update_id": next(_update_ids),
+        "callback_query": {
+            "id": str(next(_update_ids)),
+            "chat_instance": str(tg_id),
+            "data": data,
+            "from": user(tg_id),
+            "message": {
+                "message_id": next(_message_ids),
+                "date": int(time.time()),
+                "chat": {"id": tg_id, "type": "private"},
+                "from": BOT_USER.model_dump(),
+                "text": "...",
+            },
+        },
+    }, context={"bot": bot})
+
+
+def scenario(name: str, bot: Bot, tg_id: int, round_no: int) -> list[Update]:
+    if name == "players":
+        return [message_update(bot, tg_id, "/players")]
+    if name == "poll":
+        return [message_update(bot, tg_id, "/poll QB")]
+    if name == "callback":
+        return [callback_update(bot, tg_id, "cancel")]
+    if name == "add":
+        username = f"new_{tg_id}_{round_no}"
+        return [
+            message_update(bot, tg_id, "/add_player"),
+            message_update(bot, tg_id, "Иван"),
+            message_update(bot, tg_id, "Петров"),
+            message_update(bot, tg_id, username),
+            callback_update(bot, tg_id, "role:player"),
+            callback_update(bot, tg_id, "position:2"),
+            callback_update(bot, tg_id, "confirm:yes"),
+        ]
+    raise ValueError(name)
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run_scenario(dp, bot, name: str, coaches: int, rounds: int, queries: list[str]) -> dict:
+    latencies: list[float] = []
+    queries.clear()
+
+    async def coach_flow(tg_id: int):
+        for round_no in range(rounds):
+            for update in scenario(name, bot, tg_id, round_no):
+                started = time.perf_counter()
+                await dp.feed_update(bot, update)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(coach_flow(COACH_ID_BASE + i) for i in range(coaches)))
+    elapsed = time.perf_counter() - started
+
+    sql = [q for q in queries if q.lstrip().upper().startswith(("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"))]
+    return {
+        "updates": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.fmean(latencies),
+        "queries": len(sql) / len(latencies),
+    }
+
+
+def lift_rate_limits(bot: Bot):
+    """
+    Снимает лимиты Telegram в MessageSender: измеряем обработку апдейтов ботом,
+    а не ожидание токенов (20 сообщений в минуту в группу растянули бы прогон на часы).
+    """
+    sender_module.GROUP_RATE = sender_module.PRIVATE_RATE = 1e9
+    sender_module.GROUP_BURST = sender_module.PRIVATE_BURST = 1e9
+    sender_module._senders[id(bot)] = sender_module.MessageSender(bot, global_rate=1e9)
+
+
+async def run(args):
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = await make_db(Path(tmp) / "bench.db", args.roster)
+        seed_coaches(db_file, args.coaches)
+
+        queries: list[str] = []
+
+        async def trace(db):
+            await db.set_trace_callback(queries.append)
+
+        db_module.DB_PATH = str(db_file)
+        await init_pool(db_file, readers=4, pragmas=DB_PRAGMA_PROFILES["wal"], on_connect=trace)
+
+        session = FakeTelegramSession(latency=args.api_latency)
+        bot = Bot(token="123456:BENCHMARK", session=session)
+        if not args.real_limits:
+            lift_rate_limits(bot)
+        storage = SQLiteStorage(db_file, flush_interval=1.0)
+        dp = create_dispatcher(storage=storage)
+
+        print(f"roster={args.roster} coaches={args.coaches} rounds={args.rounds} api_latency={args.api_latency}s")
+        print(f"{'scenario':>9} | {'updates':>7} | {'upd/s':>8} | {'p50 ms':>7} | {'p95 ms':>7} | "
+              f"{'p99 ms':>7} | {'SQL/upd':>7}")
+        try:
+            for name in args.scenarios:
+                r = await run_scenario(dp, bot, name, args.coaches, args.rounds, queries)
+                print(f"{name:>9} | {r['updates']:>7} | {r['throughput']:>8.0f} | {r['p50']:>7.2f} | "
+                      f"{r['p95']:>7.2f} | {r['p99']:>7.2f} | {r['queries']:>7.2f}")
+        finally:
+            await storage.close()
+            await close_pool()
+
+        print(f"Telegram API calls: {dict(session.calls)}")
+        # Проверка, что сценарий add действительно дошёл до записи в БД
+        conn = sqlite3.connect(db_file)
+        added = conn.execute("SELECT COUNT(*) FROM team WHERE tg_username LIKE 'new\\_%' ESCAPE '\\'").fetchone()[0]
+        conn.close()
+        print(f"Players added by /add_player: {added}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roster", type=int, default=500, help="число игроков в БД")
+    parser.add_argument("--coaches", type=int, default=20, help="число одновременных пользователей")
+    parser.add_argument("--rounds", type=int, default=50, help="повторов сценария на пользователя")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="задержка заглушки Telegram API, сек")
+    parser.add_argument("--real-limits", action="store_true", help="не снимать лимиты Telegram в MessageSender")
+    parser.add_argument("--scenarios", nargs="+", default=["players", "poll", "add", "callback"])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,59 @@
+"""
+Бенчмарк накладных расходов FSM-хранилища на один апдейт.
+
+Каждый «апдейт» — то, что делает типичный шаг /add_player:
+get_state (FSM-middleware) + update_data + set_state.
+Сравниваются MemoryStorage, SQLiteStorage с отложенной записью (write-behind)
+и SQLiteStorage с записью на каждый вызов (flush_interval=0).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_fsm_storage
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from benchmarks.common import make_db
+from bot.config import DB_PRAGMA_PROFILES
+from bot.utils.db_pool import init_pool, close_pool
+from bot.utils.sqlite_storage import SQLiteStorage
+from bot.utils.states import AddPlayerStates
+
+USERS = 50
+UPDATES = 5000
+STEPS = [AddPlayerStates.name, AddPlayerStates.surname, AddPlayerStates.tg_username, AddPlayerStates.role]
+
+
+async def drive(storage) -> float:
+    started = time.perf_counter()
+    for i in range(UPDATES):
+        key = StorageKey(bot_id=1, chat_id=i % USERS, user_id=i % USERS)
+        await storage.get_state(key)
+        await storage.update_data(key, {"step": i, "name": f"Игрок{i}"})
+        await storage.set_state(key, STEPS[i % len(STEPS)])
+    await storage.close()
+    return (time.perf_counter() - started) / UPDATES * 1_000_000
+
+
+async def run():
+    print(f"{'storage':>26} | {'us/update':>10}")
+    print(f"{'MemoryStorage':>26} | {await drive(MemoryStorage()):>10.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = await make_db(Path(tmp) / "bench.db", 10)
+        await init_pool(db_file, readers=2, pragmas=DB_PRAGMA_PROFILES["wal"])
+        try:
+            write_behind = await drive(SQLiteStorage(db_file, flush_interval=1.0))
+            print(f"{'SQLiteStorage write-behind':>26} | {write_behind:>10.1f}")
+            write_through = await drive(SQLiteStorage(db_file, flush_interval=0))
+            print(f"{'SQLiteStorage write-through':>26} | {write_through:>10.1f}")
+        finally:
+            await close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,67 @@
+"""
+Микробенчмарк клавиатур: сборка InlineKeyboardMarkup на каждый вызов
+(как раньше делали хендлеры, в т.ч. с запросом позиций/чатов в БД)
+против готовой клавиатуры из кэша по версии справочников.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_keyboards
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import make_db
+from bot.utils import db as db_module
+from bot.utils import keyboards
+from bot.utils.reference_data import load_reference_data
+
+CALLS = 5_000
+
+
+def per_call_us(func, calls: int = CALLS) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+async def per_call_us_async(coro_factory, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        await coro_factory()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+async def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "bench.db"
+        await make_db(db_file, 100)
+        reference = await load_reference_data(db_file)
+
+        async def query_and_build():
+            keyboards.build_positions_keyboard(await db_module.get_positions(db_file))
+
+        cases = [
+            ("positions", lambda: keyboards.build_positions_keyboard(reference.positions),
+             lambda: keyboards.positions_keyboard(reference)),
+            ("position grid", lambda: keyboards.build_position_edit_keyboard(reference.positions),
+             lambda: keyboards.position_edit_keyboard(reference)),
+            ("poll chats", lambda: keyboards.build_chats_keyboard(reference.chats),
+             lambda: keyboards.chats_keyboard(reference)),
+        ]
+
+        print(f"позиций: {len(reference.positions)}, чатов: {len(reference.chats)}")
+        print(f"{'keyboard':<16} | {'build, µs':>10} | {'cached, µs':>11}")
+        for name, build, cached in cases:
+            build_us = per_call_us(build)
+            cached_us = per_call_us(cached)
+            print(f"{name:<16} | {build_us:>10.2f} | {cached_us:>11.3f}")
+
+        # Как было до справочников в памяти: запрос в БД + сборка на каждый вызов
+        db_us = await per_call_us_async(query_and_build, 500)
+        print(f"{'positions + SQL':<16} | {db_us:>10.2f} | {'—':>11}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+"""
+Бенчмарк поиска игрока по id: старый способ (list_players + перебор списка)
+против запроса по первичному ключу (get_player_by_id / get_players_by_ids).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_player_lookup
+"""
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import make_db
+from bot.utils import db as db_module
+
+SIZES = [100, 1_000, 10_000, 50_000]
+LOOKUPS = 200
+
+async def old_get_player_by_id(player_id: int, db_path):
+    players = await db_module.list_players(db_path)
+    for player in players:
+        if player["id"] == player_id:
+            return player
+    return None
+
+
+async def timed(coro_factory, ids) -> float:
+    started = time.perf_counter()
+    for player_id in ids:
+        await coro_factory(player_id)
+    return (time.perf_counter() - started) / len(ids) * 1000
+
+
+async def run():
+    print(f"{'rows':>8} | {'scan, ms':>10} | {'by id, ms':>10} | {'batch 100, ms':>14}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = Path(tmp) / "bench.db"
+            await make_db(db_file, size)
+            ids = [random.randint(1, size) for _ in range(LOOKUPS)]
+
+            # Полный перебор дорогой — на больших таблицах хватит пары замеров
+            scan_ms = await timed(lambda pid: old_get_player_by_id(pid, db_file), ids[:max(2, 2000 // size)])
+            by_id_ms = await timed(lambda pid: db_module.get_player_by_id(pid, db_file), ids)
+
+            started = time.perf_counter()
+            batch = await db_module.get_players_by_ids(ids[:100], db_file)
+            batch_ms = (time.perf_counter() - started) * 1000
+            assert len(batch) == len(set(ids[:100]))
+
+            print(f"{size:>8} | {scan_ms:>10.3f} | {by_id_ms:>10.3f} | {batch_ms:>14.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+"""
+Бенчмарк смешанной нагрузки чтение/запись для профилей PRAGMA из config.py.
+
+Несколько «тренеров» одновременно читают состав (list_players / get_player_by_id),
+пока другие правят игроков (update_player_field). Сравниваются профили
+legacy (rollback journal) и wal.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_pragmas
+"""
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import make_db
+from bot.config import DB_PRAGMA_PROFILES
+from bot.utils import db as db_module
+from bot.utils.db_pool import init_pool, close_pool
+
+ROSTER_SIZE = 500
+READERS = 6
+WRITERS = 2
+DURATION = 3.0  # секунд на профиль
+
+
+async def reader(deadline: float, counter: dict):
+    while time.perf_counter() < deadline:
+        if random.random() < 0.2:
+            await db_module.list_players(only_active=True)
+        else:
+            await db_module.get_player_by_id(random.randint(1, ROSTER_SIZE))
+        counter["reads"] += 1
+
+
+async def writer(deadline: float, counter: dict):
+    while time.perf_counter() < deadline:
+        await db_module.update_player_field(random.randint(1, ROSTER_SIZE), "number", str(random.randint(1, 99)))
+        counter["writes"] += 1
+
+
+async def run_profile(name: str, readers: int = READERS) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = await make_db(Path(tmp) / "bench.db", ROSTER_SIZE)
+        db_module.DB_PATH = str(db_file)
+        await init_pool(db_file, readers=READERS, pragmas=DB_PRAGMA_PROFILES[name])
+        counter = {"reads": 0, "writes": 0}
+        try:
+            deadline = time.perf_counter() + DURATION
+            await asyncio.gather(
+                *(reader(deadline, counter) for _ in range(readers)),
+                *(writer(deadline, counter) for _ in range(WRITERS)),
+            )
+        finally:
+            await close_pool()
+        return {k: v / DURATION for k, v in counter.items()}
+
+
+async def run():
+    print(f"{'profile':>8} | {'load':>10} | {'reads/s':>9} | {'writes/s':>9}")
+    for name in ("legacy", "wal"):
+        for load, readers in (("mixed", READERS), ("write-only", 0)):
+            result = await run_profile(name, readers)
+            print(f"{name:>8} | {load:>10} | {result['reads']:>9.0f} | {result['writes']:>9.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
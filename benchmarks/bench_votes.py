@@ -0,0 +1,68 @@
+"""
+Бенчмарк записи голосов: волна PollAnswer после опроса на тренировку
+(каждый участник голосует, часть — передумывает) записывается
+по одному commit на голос (save_poll_votes из хендлера, как без VoteWriter)
+или пачками через VoteWriter.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_votes
+"""
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import make_db
+from bot.config import DB_PRAGMA_PROFILES
+from bot.utils.db import save_poll_votes
+from bot.utils.db_pool import init_pool, close_pool
+from bot.utils.vote_writer import VoteWriter
+
+VOTERS = 2_000
+REVOTE_SHARE = 0.2
+
+
+def vote_wave(poll_id: str) -> list[tuple[str, int, list[int]]]:
+    rng = random.Random(0)
+    votes = [(poll_id, tg_id, [rng.randrange(3)]) for tg_id in range(VOTERS)]
+    votes += [(poll_id, tg_id, [rng.randrange(3)]) for tg_id in rng.sample(range(VOTERS), int(VOTERS * REVOTE_SHARE))]
+    return votes
+
+
+async def drive_per_vote(db_file, poll_id: str) -> tuple[float, int]:
+    votes = vote_wave(poll_id)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        save_poll_votes([(pid, tg_id, option_ids[0], time.time())], [], db_path=db_file)
+        for pid, tg_id, option_ids in votes
+    ))
+    return (time.perf_counter() - started) / len(votes) * 1_000_000, len(votes)
+
+
+async def drive(writer: VoteWriter, poll_id: str) -> tuple[float, int]:
+    votes = vote_wave(poll_id)
+    started = time.perf_counter()
+    # Голоса — параллельные апдейты, как при handle_as_tasks
+    await asyncio.gather(*(writer.record(*vote) for vote in votes))
+    await writer.close()
+    return (time.perf_counter() - started) / len(votes) * 1_000_000, writer.flushes
+
+
+async def run():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = await make_db(Path(tmp) / "bench.db", 10)
+        await init_pool(db_file, readers=2, pragmas=DB_PRAGMA_PROFILES["wal"])
+        try:
+            print(f"голосов в волне: {len(vote_wave('p'))}")
+            print(f"{'writer':>22} | {'us/vote':>8} | {'commits':>8}")
+            us, commits = await drive_per_vote(db_file, "per-vote")
+            print(f"{'commit на голос':>22} | {us:>8.1f} | {commits:>8}")
+            us, commits = await drive(VoteWriter(db_file, flush_interval=2.0, batch_size=500), "batched")
+            print(f"{'VoteWriter 2 с / 500':>22} | {us:>8.1f} | {commits:>8}")
+        finally:
+            await close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
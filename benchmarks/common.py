@@ -0,0 +1,11 @@
+"""
+Общие помощники для бенчмарков: временная БД по настоящей схеме с N участниками.
+"""
+from pathlib import Path
+
+from data.synthetic_roster import build_roster_db
+
+
+async def make_db(db_file: Path, size: int) -> Path:
+    """Создаёт БД по схеме create_all_tables с `size` синтетическими участниками (см. data/synthetic_roster.py)."""
+    return await build_roster_db(db_file, size)
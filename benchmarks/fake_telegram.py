@@ -0,0 +1,79 @@
+"""
+Локальная заглушка Telegram Bot API для бенчмарков: вместо HTTP-запросов
+сразу возвращает правдоподобный ответ и считает вызовы по методам.
+"""
+import asyncio
+import itertools
+import time
+from collections import Counter
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Chat, Message, Poll, PollOption, User
+
+BOT_USER = User(id=123456, is_bot=True, first_name="GriffinsSPbBot", username="griffins_spb_bot")
+
+
+class FakeTelegramSession(BaseSession):
+    """
+    Сессия aiogram без сети.
+    latency — искусственная задержка ответа API в секундах (имитация сети).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(self, url: str, headers: dict[str, Any] | None = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True):
+        # Файлы в бенчмарках не скачиваются: «файл» из одного пустого фрагмента
+        self.calls["stream_content"] += 1
+        yield b""
+
+    def _message(self, bot: Bot, method: TelegramMethod) -> Message:
+        chat_id = getattr(method, "chat_id", 0) or 0
+        chat_type = "supergroup" if int(chat_id) < 0 else "private"
+        message = Message(
+            message_id=next(self._message_ids),
+            date=int(time.time()),
+            chat=Chat(id=int(chat_id), type=chat_type),
+            from_user=BOT_USER,
+            message_thread_id=getattr(method, "message_thread_id", None) or None,
+            text=getattr(method, "text", None),
+        )
+        if type(method).__name__ == "SendPoll":
+            # Poll собираем без валидации: набор обязательных полей меняется от версии к версии API
+            poll = Poll.model_construct(
+                id=str(message.message_id),
+                question=method.question,
+                options=[PollOption.model_construct(text=str(o), voter_count=0) for o in method.options],
+                total_voter_count=0,
+                is_closed=False,
+                is_anonymous=method.is_anonymous,
+                type=method.type or "regular",
+                allows_multiple_answers=bool(method.allows_multiple_answers),
+            )
+            message = message.model_copy(update={"poll": poll})
+        return message.as_(bot)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: int | None = None):
+        self.calls[type(method).__name__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        returning = method.__returning__
+        if returning is bool:
+            return True
+        if returning is User:
+            return BOT_USER
+        if returning is Message:
+            return self._message(bot, method)
+        # EditMessageText и подобные: Message | bool
+        return True
@@ -6,10 +6,83 @@ load_dotenv()
 #Токен бота
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
+# Режим получения апдейтов: polling (по умолчанию) или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+
+# Настройки webhook-режима
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "")  # публичный адрес, например https://bot.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")          # X-Telegram-Bot-Api-Secret-Token
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8080))
+
 # Получаем путь к корню проекта (родитель папки bot/)
 BASE_DIR = Path(__file__).resolve().parent.parent
 DB_PATH = BASE_DIR / "data" / "team.db"
 
+# Размер пула соединений для чтения (соединение для записи всегда одно)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 4))
+
+# Профили настроек SQLite (PRAGMA), применяются к каждому соединению пула
+DB_PRAGMA_PROFILES = {
+    # Поведение SQLite по умолчанию (rollback journal): запись блокирует читателей
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON",
+    },
+    # WAL: читатели не ждут писателя, NORMAL безопасен для WAL и не делает fsync на каждый commit
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,  # ~16 МБ страниц в кэше (отрицательное значение — в КиБ)
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+        "foreign_keys": "ON",
+    },
+    # WAL с fsync на каждый commit — если важнее надёжность, чем скорость записи
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "busy_timeout": 10000,
+        "foreign_keys": "ON",
+    },
+}
+DB_PRAGMA_PROFILE = os.getenv("DB_PRAGMA_PROFILE", "wal")
+DB_PRAGMAS = DB_PRAGMA_PROFILES[DB_PRAGMA_PROFILE]
+
+# Кэш ролей пользователей: время жизни записи (сек) и максимальный размер
+ROLE_CACHE_TTL = int(os.getenv("ROLE_CACHE_TTL", 300))
+ROLE_CACHE_SIZE = int(os.getenv("ROLE_CACHE_SIZE", 1024))
+
+# FSM-хранилище в SQLite: как часто сбрасывать изменения на диск (сек)
+# и через сколько секунд бездействия состояние диалога считается брошенным
+FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", 1.0))
+FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", 24 * 60 * 60))
+
+# Сколько человек показывать на одной странице /players и /coaches
+ROSTER_PAGE_SIZE = int(os.getenv("ROSTER_PAGE_SIZE", 20))
+# Сколько готовых страниц /players и /coaches держать в кэше
+ROSTER_RENDER_CACHE_SIZE = int(os.getenv("ROSTER_RENDER_CACHE_SIZE", 256))
+
+# Голоса в опросах: как часто сбрасывать накопленные голоса в БД (сек)
+# и при скольких накопленных голосах сбрасывать сразу, не дожидаясь интервала
+VOTE_FLUSH_INTERVAL = float(os.getenv("VOTE_FLUSH_INTERVAL", 2.0))
+VOTE_BATCH_SIZE = int(os.getenv("VOTE_BATCH_SIZE", 500))
+
+# Напоминания не проголосовавшим: за сколько часов до тренировки
+# и как часто (сек) проверять, не пора ли напомнить
+REMINDER_HOURS_BEFORE = float(os.getenv("REMINDER_HOURS_BEFORE", 3))
+REMINDER_CHECK_INTERVAL = float(os.getenv("REMINDER_CHECK_INTERVAL", 60))
+
+# Расписание опросов: как часто (сек) проверять правила и насколько поздно (часов)
+# ещё можно отправить опрос, пропущенный, пока бот был выключен
+SCHEDULE_CHECK_INTERVAL = float(os.getenv("SCHEDULE_CHECK_INTERVAL", 30))
+SCHEDULE_CATCHUP_HOURS = float(os.getenv("SCHEDULE_CATCHUP_HOURS", 6))
+
 #Данные дефолтного админа
 DEFAULT_ADMIN = {
     "name": os.getenv("ADMIN_NAME", "Admin"),
@@ -1,26 +1,24 @@
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery
+from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
-from bot.utils.db import insert_player, get_positions
+from bot.utils.db import insert_player
+from bot.utils.reference_data import get_reference_data
 from bot.utils.role_filter import RoleFilter
 from bot.utils.states import AddPlayerStates
-from bot.utils.keyboards import CANCEL_KEYBOARD, SKIP_KEYBOARD
+from bot.utils.keyboards import CANCEL_KEYBOARD, CONFIRM_KEYBOARD, ROLE_KEYBOARD, SKIP_KEYBOARD, positions_keyboard
 from bot.config import ROLE_COACH, ROLE_PLAYER
 
 import logging
 
-router = Router()
 
-@router.callback_query(F.data == "skip", AddPlayerStates.tg_username)
 async def skip_tg_username(callback: CallbackQuery, state: FSMContext):
     await state.update_data(tg_username=None)
     await callback.answer()
     await move_to_role_step(callback.message, state)
 
 #Вход в FSM
-@router.message(Command("add_player"), RoleFilter(allowed_roles=["admin", "coach"]))
 async def start_add_player(message: Message, state: FSMContext):
     await state.set_state(AddPlayerStates.name)
     keyboard = CANCEL_KEYBOARD
@@ -31,7 +29,6 @@ async def start_add_player(message: Message, state: FSMContext):
     )
 
 #Шаг добавления имени
-@router.message(AddPlayerStates.name)
 async def process_name(message: Message, state: FSMContext):
     keyboard = CANCEL_KEYBOARD
     name = message.text.strip()
@@ -47,7 +44,6 @@ async def process_name(message: Message, state: FSMContext):
                          reply_markup=keyboard)
 
 #Шаг добавления фамилии
-@router.message(AddPlayerStates.surname)
 async def process_surname(message: Message, state: FSMContext):
     keyboard = CANCEL_KEYBOARD
     surname = message.text.strip()
@@ -63,7 +59,6 @@ async def process_surname(message: Message, state: FSMContext):
                          reply_markup=SKIP_KEYBOARD)
 
 #Шаг добавления tg_username
-@router.message(AddPlayerStates.tg_username)
 async def process_tg_username(message: Message, state: FSMContext):
     keyboard = SKIP_KEYBOARD
 
@@ -93,17 +88,8 @@ async def process_tg_username(message: Message, state: FSMContext):
 async def move_to_role_step(message: Message, state: FSMContext):
     await state.set_state(AddPlayerStates.role)
 
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="Только игрок", callback_data="role:player")],
-            [InlineKeyboardButton(text="Только тренер", callback_data="role:coach")],
-            [InlineKeyboardButton(text="Игрок + тренер", callback_data="role:both")],
-            [InlineKeyboardButton(text="Отмена", callback_data="cancel")]
-        ]
-    )
-    await message.answer("Выберите роль для пользователя:", reply_markup=keyboard)
+    await message.answer("Выберите роль для пользователя:", reply_markup=ROLE_KEYBOARD)
 
-@router.callback_query(F.data.startswith("role:"), AddPlayerStates.role)
 async def process_role_choice(callback: CallbackQuery, state: FSMContext):
     choice = callback.data.split(":")[1]
 
@@ -123,13 +109,8 @@ async def process_role_choice(callback: CallbackQuery, state: FSMContext):
     if ROLE_PLAYER in role_ids:
         # Спрашиваем позицию
         await state.set_state(AddPlayerStates.position)
-        positions = await get_positions()
-        keyboard = InlineKeyboardMarkup(
-            inline_keyboard=[
-                                [InlineKeyboardButton(text=pos[1], callback_data=f"position:{pos[0]}")]
-                                for pos in positions
-                            ] + [[InlineKeyboardButton(text="Отмена", callback_data="cancel")]]
-        )
+        # Клавиатура строится один раз на версию справочников
+        keyboard = positions_keyboard(await get_reference_data())
         await callback.message.edit_text("Выберите позицию игрока:", reply_markup=keyboard)
     else:
         # Только тренер — формируем текст подтверждения напрямую
@@ -139,13 +120,9 @@ async def process_role_choice(callback: CallbackQuery, state: FSMContext):
         await state.set_state(AddPlayerStates.confirmation)
 
 
-
-@router.callback_query(F.data.startswith("position:"), AddPlayerStates.position)
 async def process_position_callback(callback: CallbackQuery, state: FSMContext):
     position_id = int(callback.data.split(":")[1])
-    positions = await get_positions()
-    positions_dict = {pos[0]: pos[1] for pos in positions}
-    position_name = positions_dict.get(position_id)
+    position_name = (await get_reference_data()).position_names.get(position_id)
     await state.update_data(position_id=position_id, position_name=position_name)
     await show_confirmation(callback, state)
     await callback.answer()
@@ -174,21 +151,10 @@ async def show_confirmation(callback: CallbackQuery, state: FSMContext):
         f"Всё верно?"
     )
 
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="✅ Подтвердить", callback_data="confirm:yes"),
-                InlineKeyboardButton(text="❌ Отменить", callback_data="confirm:no")
-            ]
-        ]
-    )
-
     await state.set_state(AddPlayerStates.confirmation)
-    await callback.message.edit_text(confirmation_text, reply_markup=keyboard)
-
+    await callback.message.edit_text(confirmation_text, reply_markup=CONFIRM_KEYBOARD)
 
 
-@router.callback_query(F.data.startswith("confirm:"), AddPlayerStates.confirmation)
 async def process_confirmation(callback: CallbackQuery, state: FSMContext):
     if callback.data == "confirm:no":
         await state.clear()
@@ -225,3 +191,17 @@ async def process_confirmation(callback: CallbackQuery, state: FSMContext):
         await state.clear()
 
     await callback.answer()
+
+
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.callback_query.register(skip_tg_username, F.data == "skip", AddPlayerStates.tg_username)
+    router.message.register(start_add_player, Command("add_player"), RoleFilter(allowed_roles=["admin", "coach"]))
+    router.message.register(process_name, AddPlayerStates.name)
+    router.message.register(process_surname, AddPlayerStates.surname)
+    router.message.register(process_tg_username, AddPlayerStates.tg_username)
+    router.callback_query.register(process_role_choice, F.data.startswith("role:"), AddPlayerStates.role)
+    router.callback_query.register(process_position_callback, F.data.startswith("position:"), AddPlayerStates.position)
+    router.callback_query.register(process_confirmation, F.data.startswith("confirm:"), AddPlayerStates.confirmation)
+    return router
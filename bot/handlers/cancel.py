@@ -6,15 +6,20 @@ from aiogram.types import Message
 
 from bot.utils.role_filter import RoleFilter
 
-router = Router()
 
-@router.callback_query(F.data == "cancel")
 async def cancel_adding_callback(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await callback.message.edit_text("Действие отменено.")
     await callback.answer()
 
-@router.message(Command("cancel"), RoleFilter(allowed_roles=["admin", "coach"]))
 async def cancel_adding(message: Message, state: FSMContext):
     await state.clear()
-    await message.answer("Действие отменено.")
\ No newline at end of file
+    await message.answer("Действие отменено.")
+
+
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.callback_query.register(cancel_adding_callback, F.data == "cancel")
+    router.message.register(cancel_adding, Command("cancel"), RoleFilter(allowed_roles=["admin", "coach"]))
+    return router
@@ -1,36 +1,29 @@
-from aiogram import Router, F, Bot
+import logging
+
+from aiogram import Router, F
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, Message
+from aiogram.types import CallbackQuery, Message
 
-from bot.utils.db import get_chat_by_position, get_all_chats
+from bot.utils.callbacks import PollChatCallback
+from bot.utils.keyboards import CANCEL_KEYBOARD, CONFIRM_KEYBOARD, NOTIFY_KEYBOARD, chats_keyboard
+from bot.utils.reference_data import get_reference_data, parse_thread_id
 from bot.utils.notifications import send_mentions_in_batches, build_players_mention_list
-from bot.utils.poll_question import get_training_poll_question
 from bot.utils.role_filter import RoleFilter
 from bot.utils.states import CreatePollStates
-import logging
+from bot.utils.training_polls import poll_row, record_polls, send_training_polls
 
-router = Router()
 
-CANCEL_KEYBOARD = InlineKeyboardMarkup(
-    inline_keyboard=[
-        [InlineKeyboardButton(text="Отмена", callback_data="cancel")]
-    ]
-)
-
-@router.callback_query(F.data == "cancel", StateFilter(CreatePollStates))
 async def cancel_adding_callback(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await callback.message.edit_text("Создание опроса отменено.")
     await callback.answer()
 
-@router.message(Command("cancel"), RoleFilter(allowed_roles=["admin", "coach"]))
 async def cancel_adding(message: Message, state: FSMContext):
     await state.clear()
     await message.answer("Создание опроса отменено.")
 
 #Вход в FSM
-@router.message(Command("poll"), RoleFilter(allowed_roles=["admin", "coach"]))
 async def start_create_poll(message: Message, state: FSMContext):
     # Разбираем аргумент, если есть
     parts = message.text.split(maxsplit=1)
@@ -45,36 +38,23 @@ async def quick_poll(message: Message, topic: str, notify_players: bool = True):
     """Быстрое создание опроса с предустановкой"""
     topic = topic.upper().strip()
 
-    chat_id, thread_id = await get_chat_by_position(topic)
-    if not chat_id:
+    reference = await get_reference_data()
+    if not reference.chats_for(topic):
         await message.answer(f"Не удалось найти чат для топика {topic}.")
         return
 
-    question = get_training_poll_question(topic)
-    options = ["Буду", "Не буду", "Тренер"]
-
-    await message.bot.send_poll(
-        chat_id=chat_id,
-        message_thread_id=thread_id,
-        question=question,
-        options=options,
-        is_anonymous=False
-    )
+    try:
+        sent = await send_training_polls(message.bot, topic, notify_players)
+    except Exception as e:
+        logging.error(f"[create_poll] Не удалось отправить опрос {topic}: {e}")
+        await message.answer(f"Не удалось отправить опрос для {topic}: {e}")
+        return
+    if not sent:
+        await message.answer(f"В расписании нет ближайших тренировок для {topic}.")
+        return
 
     await message.answer(f"Опрос для {topic} отправлен.")
 
-    if notify_players:
-        mentions = await build_players_mention_list(position=topic)
-        logging.info(f"[quick_poll] mentions={mentions}")
-
-        if mentions:
-            await send_mentions_in_batches(
-                bot=message.bot,
-                chat_id=chat_id,
-                thread_id=thread_id,
-                mentions=mentions
-            )
-
 
 async def interactive_poll(message: Message, state: FSMContext):
     """Интерактивное создание опроса через FSM"""
@@ -85,7 +65,6 @@ async def interactive_poll(message: Message, state: FSMContext):
                          )
 
 #Шаг ввода вопроса опроса
-@router.message(CreatePollStates.question)
 async def process_poll_question(message: Message, state: FSMContext):
     keyboard = CANCEL_KEYBOARD
     question = message.text.strip()
@@ -101,7 +80,6 @@ async def process_poll_question(message: Message, state: FSMContext):
 
 
 # Шаг: ввод вариантов опроса
-@router.message(CreatePollStates.options)
 async def process_poll_options(message: Message, state: FSMContext):
     options_text = message.text.strip()
     if not options_text:
@@ -120,45 +98,35 @@ async def process_poll_options(message: Message, state: FSMContext):
     await state.update_data(options=options)
     await state.set_state(CreatePollStates.chat)
 
-    # Получаем список чатов из БД
-    chats = await get_all_chats()
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-                            [InlineKeyboardButton(text=name, callback_data=f"chats:{chat_id}:{thread_id}:{name}")]
-                            for chat_id, thread_id, name in chats
-                        ] + [[InlineKeyboardButton(text="Отмена", callback_data="cancel")]]
-    )
+    # Список чатов — из справочника в памяти
+    keyboard = chats_keyboard(await get_reference_data())
     await message.answer("Выберите для кого опрос:", reply_markup=keyboard)
 
 
 # Шаг: выбор чата
-@router.callback_query(F.data.startswith("chats:"), CreatePollStates.chat)
-async def process_chat_choice(callback: CallbackQuery, state: FSMContext):
-    _, chat_id, thread_id_raw, chat_name = callback.data.split(":")
+async def process_chat_choice(callback: CallbackQuery, callback_data: PollChatCallback, state: FSMContext):
+    reference = await get_reference_data()
+    # Кнопка из клавиатуры до /reload: номера чатов могли сдвинуться
+    if callback_data.version != reference.version or not 0 <= callback_data.index < len(reference.chats):
+        await callback.message.edit_reply_markup(reply_markup=chats_keyboard(reference))
+        await callback.answer("Список чатов обновился, выберите чат ещё раз.", show_alert=True)
+        return
 
-    # thread_id может быть пустым -> None
-    thread_id = int(thread_id_raw) if thread_id_raw.isdigit() else None
+    chat_id, thread_id_raw, chat_name = reference.chats[callback_data.index]
+    thread_id = parse_thread_id(thread_id_raw)
 
     await state.update_data(chat_id=int(chat_id), thread_id=thread_id, chat_name=chat_name)
     await state.set_state(CreatePollStates.notify_players)
 
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="Да", callback_data="notify:yes")],
-            [InlineKeyboardButton(text="Нет", callback_data="notify:no")],
-            [InlineKeyboardButton(text="Отмена", callback_data="cancel")]
-        ]
-    )
     await callback.message.edit_text(
         f"Вы выбрали чат: {chat_name}\n\n"
         "Хотите уведомить игроков о новом опросе?",
-        reply_markup=keyboard
+        reply_markup=NOTIFY_KEYBOARD
     )
     await callback.answer()
 
 
 # Шаг: выбор уведомления
-@router.callback_query(F.data.startswith("notify:"), CreatePollStates.notify_players)
 async def process_notify_choice(callback: CallbackQuery, state: FSMContext):
     choice = callback.data.split(":")[1]
     notify = choice == "yes"
@@ -171,14 +139,6 @@ async def process_notify_choice(callback: CallbackQuery, state: FSMContext):
     chat_name = data.get("chat_name", "не указан")
 
     options_display = "\n".join(f"{idx+1}. {opt}" for idx, opt in enumerate(options))
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="✅ Подтвердить", callback_data="confirm:yes"),
-                InlineKeyboardButton(text="❌ Отменить", callback_data="confirm:no")
-            ]
-        ]
-    )
 
     await callback.message.edit_text(
         f"Проверьте опрос перед созданием:\n\n"
@@ -186,12 +146,11 @@ async def process_notify_choice(callback: CallbackQuery, state: FSMContext):
         f"Варианты:\n{options_display}\n"
         f"Чат: {chat_name}\n"
         f"Уведомить игроков: {'Да' if notify else 'Нет'}",
-        reply_markup=keyboard
+        reply_markup=CONFIRM_KEYBOARD
     )
     await callback.answer()
 
 # Шаг: подтверждение создания опроса
-@router.callback_query(F.data.startswith("confirm:"), CreatePollStates.confirmation)
 async def confirm_poll_callback(callback: CallbackQuery, state: FSMContext):
     action = callback.data.split(":")[1]
 
@@ -232,19 +191,38 @@ async def confirm_poll_callback(callback: CallbackQuery, state: FSMContext):
             is_anonymous=False
             )
 
+    reference = await get_reference_data()
+    await record_polls([poll_row(sent_poll, thread_id, reference.position_ids.get(str(chat_name).upper()))])
+
     # Уведомление игроков
     if notify_players:
         if chat_name == "ALL":
-            mention_text = await build_players_mention_text()  # без фильтра по позиции
+            mentions = await build_players_mention_list()  # без фильтра по позиции
         else:
-            mention_text = await build_players_mention_text(position=chat_name)
+            mentions = await build_players_mention_list(position=chat_name)
 
-        await callback.bot.send_message(
-            chat_id=chat_id,
-            message_thread_id=thread_id,
-            text=f"Новый опрос! {mention_text}"
-        )
+        if mentions:
+            await send_mentions_in_batches(
+                bot=callback.bot,
+                chat_id=chat_id,
+                thread_id=thread_id,
+                mentions=mentions
+            )
 
     await callback.message.edit_text(f"Опрос создан! ID: {sent_poll.message_id}")
     await state.clear()
-    await callback.answer()
\ No newline at end of file
+    await callback.answer()
+
+
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.callback_query.register(cancel_adding_callback, F.data == "cancel", StateFilter(CreatePollStates))
+    router.message.register(cancel_adding, Command("cancel"), RoleFilter(allowed_roles=["admin", "coach"]))
+    router.message.register(start_create_poll, Command("poll"), RoleFilter(allowed_roles=["admin", "coach"]))
+    router.message.register(process_poll_question, CreatePollStates.question)
+    router.message.register(process_poll_options, CreatePollStates.options)
+    router.callback_query.register(process_chat_choice, PollChatCallback.filter(), CreatePollStates.chat)
+    router.callback_query.register(process_notify_choice, F.data.startswith("notify:"), CreatePollStates.notify_players)
+    router.callback_query.register(confirm_poll_callback, F.data.startswith("confirm:"), CreatePollStates.confirmation)
+    return router
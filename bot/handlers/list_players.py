@@ -1,11 +1,19 @@
-from aiogram import Router
+import html
+from typing import Iterable, Iterator
+
+from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message
-from bot.utils.db import list_players, get_positions
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from bot.config import ROSTER_PAGE_SIZE, ROSTER_RENDER_CACHE_SIZE
+from bot.utils.callbacks import RosterPageCallback
+from bot.utils.db import list_players_page, roster_version
+from bot.utils.reference_data import get_reference_data
+from bot.utils.render_cache import VersionedCache
+from bot.utils.role_cache import MISSING
 from bot.utils.role_filter import RoleFilter
+from bot.utils.text_chunks import MAX_MESSAGE_ENTITIES, TELEGRAM_MESSAGE_LIMIT, iter_messages, split_parts
 import logging
 
-router = Router()
 
 STATUS_MAP = {
     "active": "В строю",
@@ -39,34 +47,164 @@ def format_person_line(person: dict, index: int, show_position: bool = True) ->
     status_text = STATUS_MAP.get(person['status'], "Неизвестно")
     status_emoji = STATUS_EMOJI.get(person['status'], "❓")
 
-    name_part = f"<b>{person['name']} {person['surname']}</b>"
+    # Данные из БД экранируем: «<» или «&» в имени сломали бы разбор HTML всего сообщения
+    name_part = f"<b>{html.escape(person['name'] or '')} {html.escape(person['surname'] or '')}</b>"
 
     if person.get("tg_username"):
-        name_part += f" (@{person['tg_username']})"
+        name_part += f" (@{html.escape(person['tg_username'])})"
 
     position_part = f" {person['position']}" if show_position and person.get('position') else ""
-    number_part = f" #{person['number']}" if person.get('number') else ""
+    number_part = f" #{html.escape(person['number'])}" if person.get('number') else ""
 
     return f"{status_emoji}{index}. {name_part} — {position_part}{number_part} [{status_text}] -- ID {person['id']} \n"
 
 
+# Списки состава: роль в БД, заголовок и ответ на пустой список
+ROSTERS = {
+    "players": {
+        "role": "player",
+        "title": "📋 <b>Список игроков:</b>\n",
+        "empty": "📭 В базе пока нет ни одного игрока.",
+    },
+    "coaches": {
+        "role": "coach",
+        "title": "📋 <b>Список тренеров:</b>\n",
+        "empty": "📭 В базе пока нет ни одного тренера.",
+    },
+}
 
-@router.message(Command("players"), RoleFilter(allowed_roles=["admin", "coach"]))
-async def show_players(message: Message):
-    logging.info(f"[show_players] Вызов команды от {message.from_user.id}, текст: {message.text}")
-    all_players = await list_players()
-    logging.info(f"[show_players] Список игроков получен: {all_players}")
+# Готовые ответы /players, /players <POS>, /coaches и страниц навигации.
+# Ключ — фильтр (или callback_data страницы), версия состава — db.roster_version()
+roster_cache = VersionedCache(roster_version, maxsize=ROSTER_RENDER_CACHE_SIZE)
 
-    # Фильтруем только игроков
-    players = [p for p in all_players if has_role(p, "player")]
+# Запас под строку «Показаны a–b» в конце страницы
+PAGE_FOOTER_RESERVE = 64
+# В строке до двух сущностей разметки: жирное имя и @username
+LINES_PER_MESSAGE = MAX_MESSAGE_ENTITIES // 2
 
-    if not players:
-        await message.answer("📭 В базе пока нет ни одного игрока.")
-        return
 
-    # Получаем все позиции из БД
-    positions_rows = await get_positions()
-    valid_positions = {pos[1].upper() for pos in positions_rows}
+def roster_lines(people: Iterable[dict], start: int = 1) -> Iterator[str]:
+    """Строки списка по одной, с нумерацией от start."""
+    for i, person in enumerate(people, start=start):
+        yield format_person_line(person, i, show_position=True)
+
+
+def iter_roster_messages(kind: str, people: Iterable[dict]) -> Iterator[str]:
+    """
+    Потоковый рендер всего списка: сообщение отдаётся, как только следующая
+    строка в него уже не помещается (лимит 4096 и лимит сущностей).
+    Строки (и HTML-теги внутри них) никогда не разрезаются.
+    """
+    return iter_messages(
+        roster_lines(people),
+        prefix=ROSTERS[kind]["title"],
+        sep="\n",
+        max_parts=LINES_PER_MESSAGE
+    )
+
+
+def fit_page(kind: str, people: list[dict], start: int, from_end: bool = False) -> int:
+    """
+    Сколько человек из `people` помещается в одно сообщение-страницу.
+    from_end — считать с конца (страница «назад» заканчивается перед курсором).
+    """
+    if from_end:
+        lines = (format_person_line(p, start - 1 - i) for i, p in enumerate(reversed(people)))
+    else:
+        lines = roster_lines(people, start)
+    group = next(split_parts(
+        lines,
+        prefix=ROSTERS[kind]["title"],
+        sep="\n",
+        limit=TELEGRAM_MESSAGE_LIMIT - PAGE_FOOTER_RESERVE,
+        max_parts=LINES_PER_MESSAGE
+    ), [])
+    return len(group)
+
+
+def roster_callback(kind: str, position: str | None, direction: str, cursor_id: int, cursor_index: int) -> str:
+    """
+    callback_data кнопки навигации (RosterPageCallback): вид списка, позиция,
+    направление, id игрока-курсора и его номер в списке.
+    Курсор — id, а не имя: callback_data ограничена 64 байтами.
+    """
+    return RosterPageCallback(
+        kind=kind,
+        position=position,
+        forward=direction == "next",
+        cursor_id=cursor_id,
+        cursor_index=cursor_index,
+    ).pack()
+
+
+def render_roster_page(
+        kind: str,
+        people: list[dict],
+        start: int,
+        position: str | None,
+        has_prev: bool,
+        has_next: bool
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    """Текст страницы списка и клавиатура «назад / вперёд» (None, если страница одна)."""
+    text = [ROSTERS[kind]["title"], *roster_lines(people, start)]
+
+    buttons = []
+    if has_prev:
+        buttons.append(InlineKeyboardButton(
+            text="⬅️ Назад",
+            callback_data=roster_callback(kind, position, "prev", people[0]["id"], start)
+        ))
+    if has_next:
+        buttons.append(InlineKeyboardButton(
+            text="Вперёд ➡️",
+            callback_data=roster_callback(kind, position, "next", people[-1]["id"], start + len(people) - 1)
+        ))
+
+    if not buttons:
+        return "\n".join(text), None
+
+    text.append(f"Показаны {start}–{start + len(people) - 1}")
+    return "\n".join(text), InlineKeyboardMarkup(inline_keyboard=[buttons])
+
+
+def roster_key(kind: str, position: str | None) -> tuple[str, str | None]:
+    """Ключ кэша: вид списка и фильтр по позиции без учёта регистра."""
+    return kind, position.upper() if position else None
+
+
+async def render_roster(kind: str, position: str | None = None) -> list[tuple[str, InlineKeyboardMarkup | None]]:
+    """
+    Сообщения списка (текст, клавиатура): первая страница с навигацией или, если
+    ROSTER_PAGE_SIZE <= 0, весь список несколькими сообщениями. Пустой список — людей нет.
+    Результат кладётся в roster_cache до следующего изменения состава.
+    """
+    # Версию берём до чтения из БД: если состав изменится во время рендера, результат не закэшируется
+    version = roster_version()
+    role = ROSTERS[kind]["role"]
+
+    if ROSTER_PAGE_SIZE <= 0:
+        people = await list_players_page(role, position=position, limit=-1)
+        messages = [(text, None) for text in iter_roster_messages(kind, people)]
+    else:
+        # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+        people = await list_players_page(role, position=position, limit=ROSTER_PAGE_SIZE + 1)
+        messages = []
+        if people:
+            # Страница обрезается и по лимиту сообщения, если длинные строки не влезают в 4096
+            shown = people[:fit_page(kind, people[:ROSTER_PAGE_SIZE], 1)]
+            messages.append(render_roster_page(kind, shown, 1, position, False, len(people) > len(shown)))
+
+    roster_cache.set(roster_key(kind, position), messages, version)
+    return messages
+
+
+async def send_roster(message: Message, messages: list[tuple[str, InlineKeyboardMarkup | None]]):
+    for text, keyboard in messages:
+        await message.answer(text, parse_mode="HTML", reply_markup=keyboard)
+
+
+async def show_players(message: Message):
+    logging.info(f"[show_players] Вызов команды от {message.from_user.id}, текст: {message.text}")
 
     # Разбор аргумента команды
     args = None
@@ -75,55 +213,101 @@ async def show_players(message: Message):
         if len(parts) == 2:
             args = parts[1].strip().upper()
 
-    if args and args not in valid_positions:
-        await message.answer(
-            f"❌ Неверная позиция '{args}'.\n"
-            f"Выберите из списка: {', '.join(valid_positions)}\n"
-            f"Или отправьте команду без параметра, чтобы получить всех игроков."
-        )
-        return
+    # Повторный запрос того же списка до изменения состава — без БД и форматирования
+    messages = roster_cache.get(roster_key("players", args))
+    if messages is MISSING:
+        position = None
+        if args:
+            # Название позиции в БД по введённому (без учёта регистра)
+            reference = await get_reference_data()
+            position = reference.position_name(args)
 
-    # Если указан аргумент, фильтруем по позиции
-    if args:
-        players = [p for p in players if p.get("position", "").upper() == args]
+            if position is None:
+                await message.answer(
+                    f"❌ Неверная позиция '{args}'.\n"
+                    f"Выберите из списка: {', '.join(reference.position_names.values())}\n"
+                    f"Или отправьте команду без параметра, чтобы получить всех игроков."
+                )
+                return
+        messages = await render_roster("players", position)
 
-    if not players:
+    if messages:
+        await send_roster(message, messages)
+    elif args:
         await message.answer("📭 Игроков с такой позицией не найдено.")
-        return
-
-    # Формируем красивый текст
-    text = ["📋 <b>Список игроков:</b>\n"]
-
-    for i, player in enumerate(players, start=1):
-        line = format_person_line(player, i, show_position=True)
-        text.append(line)
+    else:
+        await message.answer(ROSTERS["players"]["empty"])
 
-    await message.answer("\n".join(text), parse_mode="HTML")
 
-@router.message(Command("coaches"), RoleFilter(allowed_roles=["admin", "coach"]))
 async def show_coaches(message: Message):
     # Разбор аргумента команды
     parts = message.text.strip().split(maxsplit=1)
     if len(parts) > 1:
         await message.answer("❌ Команда /coaches не принимает аргументы.")
         return
-    
-    all_players = await list_players()
+
     logging.info(f"Запрошен список тренеров")
+    messages = roster_cache.get(roster_key("coaches", None))
+    if messages is MISSING:
+        messages = await render_roster("coaches")
+
+    if messages:
+        await send_roster(message, messages)
+    else:
+        await message.answer(ROSTERS["coaches"]["empty"])
+
+
+async def render_page_callback(data: RosterPageCallback) -> tuple[str, InlineKeyboardMarkup | None] | None:
+    """Страница по callback_data кнопки навигации; None — курсор больше не найден."""
+    kind, position = data.kind, data.position
+    cursor_id, cursor_index = data.cursor_id, data.cursor_index
+    page_size = max(ROSTER_PAGE_SIZE, 1)
+
+    if data.forward:
+        people = await list_players_page(
+            ROSTERS[kind]["role"], position=position, after_id=cursor_id, limit=page_size + 1
+        )
+        start = cursor_index + 1
+        shown = people[:fit_page(kind, people[:page_size], start)]
+        has_next = len(people) > len(shown)
+    else:
+        people = await list_players_page(
+            ROSTERS[kind]["role"], position=position, before_id=cursor_id, limit=page_size + 1
+        )
+        count = fit_page(kind, people[-page_size:], cursor_index, from_end=True)
+        shown = people[len(people) - count:]
+        has_next = True
+        # Раньше показанных записей ничего нет — это первая страница
+        start = max(1, cursor_index - count) if len(people) > count else 1
+
+    if not shown:
+        return None
+    return render_roster_page(kind, shown, start, position, start > 1, has_next)
+
 
-    # Фильтруем только тренеров
-    coaches = [c for c in all_players if has_role(c, "coach")]
+async def roster_page_callback(callback: CallbackQuery):
+    """Переход на соседнюю страницу /players или /coaches."""
+    page = roster_cache.get(callback.data)
+    if page is MISSING:
+        version = roster_version()
+        page = await render_page_callback(RosterPageCallback.unpack(callback.data))
+        if page is not None:
+            roster_cache.set(callback.data, page, version)
 
-    if not coaches:
-        await message.answer("📭 В базе пока нет ни одного тренера.")
+    if page is None:
+        # Игрока-курсора удалили или список сократился
+        await callback.answer("Список изменился, отправьте команду заново.", show_alert=True)
         return
 
-    # Формируем красивый текст
-    text = ["📋 <b>Список тренеров:</b>\n"]
+    text, keyboard = page
+    await callback.message.edit_text(text, parse_mode="HTML", reply_markup=keyboard)
+    await callback.answer()
 
-    for i, coach in enumerate(coaches, start=1):
-        # Показываем позицию, если тренер одновременно игрок
-        line = format_person_line(coach, i, show_position=True)
-        text.append(line)
 
-    await message.answer("\n".join(text), parse_mode="HTML")
\ No newline at end of file
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.message.register(show_players, Command("players"), RoleFilter(allowed_roles=["admin", "coach"]))
+    router.message.register(show_coaches, Command("coaches"), RoleFilter(allowed_roles=["admin", "coach"]))
+    router.callback_query.register(roster_page_callback, RosterPageCallback.filter(F.kind.in_(ROSTERS)), RoleFilter(allowed_roles=["admin", "coach"]))
+    return router
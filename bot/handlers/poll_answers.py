@@ -0,0 +1,20 @@
+from aiogram import Router
+from aiogram.types import PollAnswer
+
+from bot.utils.vote_writer import vote_writer
+
+
+# Голоса в опросах бота (опросы не анонимные, поэтому Telegram присылает PollAnswer).
+# Запись в БД — пачками через vote_writer: после опроса на тренировку голоса приходят волной
+async def record_poll_answer(poll_answer: PollAnswer):
+    # Голос от имени канала (voter_chat) к участнику состава не привязать
+    if poll_answer.user is None:
+        return
+    await vote_writer.record(poll_answer.poll_id, poll_answer.user.id, poll_answer.option_ids)
+
+
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.poll_answer.register(record_poll_answer)
+    return router
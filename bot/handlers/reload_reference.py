@@ -0,0 +1,22 @@
+from aiogram import Router
+from aiogram.filters import Command
+from aiogram.types import Message
+
+from bot.utils.reference_data import reload_reference_data
+from bot.utils.role_filter import RoleFilter
+
+
+# Позиции, чаты и расписание тренировок держатся в памяти; после их правки в БД администратор перечитывает справочники
+async def reload_reference(message: Message):
+    reference = await reload_reference_data()
+    await message.answer(
+        f"🔄 Справочники обновлены: позиций — {len(reference.positions)}, чатов — {len(reference.chats)}, "
+        f"тренировок в неделю — {len(reference.calendar.rules)}."
+    )
+
+
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.message.register(reload_reference, Command("reload"), RoleFilter(allowed_roles=["admin"]))
+    return router
@@ -0,0 +1,85 @@
+import time
+from datetime import datetime
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from bot.utils.db import add_poll_schedule, delete_poll_schedule, list_poll_schedule
+from bot.utils.poll_question import MSK
+from bot.utils.poll_scheduler import CronRule
+from bot.utils.reference_data import get_reference_data
+from bot.utils.role_filter import RoleFilter
+
+
+SCHEDULE_HELP = (
+    "Правила задаются cron-выражением по МСК: минута час день месяц день_недели (0 или 7 — ВС).\n"
+    "/schedule add 0 12 * * 1 QB — опрос QB по понедельникам в 12:00\n"
+    "/schedule add 0 12 * * 5 — опрос всем позициям по пятницам в 12:00\n"
+    "/schedule del <id> — удалить правило"
+)
+
+
+async def schedule_lines() -> list[str]:
+    reference = await get_reference_data()
+    now = datetime.now(MSK)
+    lines = ["🗓 Расписание опросов:"]
+    for rule_id, expr, position_id, _ in await list_poll_schedule():
+        position = reference.position_names.get(position_id, "?") if position_id is not None else "все позиции"
+        try:
+            upcoming = CronRule.parse(expr).next_after(now)
+            upcoming_str = upcoming.strftime("%d.%m.%Y %H:%M") if upcoming else "никогда"
+        except ValueError:
+            upcoming_str = "ошибка в правиле"
+        lines.append(f"#{rule_id}: {expr} — {position}, следующий: {upcoming_str}")
+    if len(lines) == 1:
+        lines.append("пока пусто")
+    return lines
+
+
+async def manage_schedule(message: Message, command: CommandObject):
+    args = (command.args or "").split()
+
+    if not args:
+        lines = await schedule_lines()
+        await message.answer("\n".join(lines + ["", SCHEDULE_HELP]))
+        return
+
+    action, rest = args[0].lower(), args[1:]
+
+    if action == "add" and len(rest) in (5, 6):
+        position_id = None
+        if len(rest) == 6:
+            reference = await get_reference_data()
+            position_id = reference.position_ids.get(rest[5].upper())
+            if position_id is None:
+                await message.answer(f"Неизвестная позиция: {rest[5]}")
+                return
+        try:
+            rule = CronRule.parse(" ".join(rest[:5]))
+        except ValueError as e:
+            await message.answer(str(e))
+            return
+        upcoming = rule.next_after(datetime.now(MSK))
+        if upcoming is None:
+            await message.answer(f"Правило «{rule.expr}» никогда не сработает.")
+            return
+        rule_id = await add_poll_schedule(rule.expr, position_id, time.time())
+        await message.answer(f"✅ Правило #{rule_id} добавлено, первый опрос: {upcoming:%d.%m.%Y %H:%M}")
+        return
+
+    if action == "del" and len(rest) == 1 and rest[0].isdigit():
+        if await delete_poll_schedule(int(rest[0])):
+            await message.answer(f"🗑 Правило #{rest[0]} удалено.")
+        else:
+            await message.answer(f"Правило #{rest[0]} не найдено.")
+        return
+
+    await message.answer(SCHEDULE_HELP)
+
+
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.message.register(manage_schedule, Command("schedule"), RoleFilter(allowed_roles=["admin", "coach"]))
+    return router
@@ -0,0 +1,84 @@
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from bot.utils.attendance import WEEKDAYS, AttendanceMatrix, get_attendance
+from bot.utils.reference_data import ReferenceData, get_reference_data
+from bot.utils.role_filter import RoleFilter
+from bot.utils.text_chunks import iter_messages
+
+
+def percent(attended: int, expected: int) -> str:
+    return f"{attended * 100 // expected}%" if expected else "—"
+
+
+def summary_lines(matrix: AttendanceMatrix, reference: ReferenceData) -> list[str]:
+    """Посещаемость команды: по дням недели и по позициям."""
+    lines = [
+        f"📊 Посещаемость: тренировок — {matrix.training_count()}, голосов — {matrix.votes}",
+        f"Вся команда: {percent(*matrix.rate())}",
+        "",
+        "По дням недели:",
+    ]
+    lines += [f"  {WEEKDAYS[day]} — {percent(*matrix.rate(weekday=day))}" for day in matrix.weekdays()]
+    lines += ["", "По позициям:"]
+    for position_id, name in reference.positions:
+        if matrix.training_count(position_id):
+            lines.append(
+                f"  {name} — {percent(*matrix.rate(position_id))} "
+                f"(тренировок: {matrix.training_count(position_id)})"
+            )
+    lines.append("\nСостав позиции по посещаемости: /stats <позиция>")
+    return lines
+
+
+def depth_chart_lines(matrix: AttendanceMatrix, position_id: int, position: str) -> list[str]:
+    """Состав позиции по убыванию посещаемости с сериями."""
+    weekdays = ", ".join(
+        f"{WEEKDAYS[day]} {percent(*matrix.rate(position_id, day))}" for day in matrix.weekdays(position_id)
+    )
+    lines = [
+        f"📊 {position}: посещаемость {percent(*matrix.rate(position_id))}, "
+        f"тренировок — {matrix.training_count(position_id)}",
+    ]
+    if weekdays:
+        lines.append(f"По дням: {weekdays}")
+    lines.append("")
+    for index, row in enumerate(matrix.depth_chart(position_id), start=1):
+        lines.append(
+            f"{index}. {row.surname} {row.name} — {percent(row.attended, row.expected)} "
+            f"({row.attended}/{row.expected}), серия {row.current_streak}, лучшая {row.best_streak}"
+        )
+    return lines
+
+
+async def show_stats(message: Message, command: CommandObject):
+    reference = await get_reference_data()
+    matrix = await get_attendance()
+
+    position = None
+    if command.args:
+        position = reference.position_name(command.args)
+        if position is None:
+            names = ", ".join(name for _, name in reference.positions)
+            await message.answer(f"Неизвестная позиция: {command.args.strip()}. Доступны: {names}")
+            return
+
+    if not matrix.training_count():
+        await message.answer("Пока нет опросов на тренировки — статистика появится после первого /poll <позиция>.")
+        return
+
+    if position:
+        lines = depth_chart_lines(matrix, reference.position_ids[position.upper()], position)
+    else:
+        lines = summary_lines(matrix, reference)
+
+    for text in iter_messages(lines, sep="\n", max_parts=None):
+        await message.answer(text)
+
+
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.message.register(show_stats, Command("stats"), RoleFilter(allowed_roles=["admin", "coach"]))
+    return router
@@ -1,63 +1,24 @@
 from aiogram import Router, F
-from aiogram.filters import Command
-from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.filters import Command, StateFilter
+from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
 
-from bot.utils.db import get_player_by_id, get_user_role, update_player_field, get_positions
+from bot.utils.callbacks import UpdateCallback
+from bot.utils.db import get_player_by_id, get_user_roles, update_player_field
+from bot.utils.reference_data import get_reference_data
+from bot.utils.role_cache import MISSING
 from bot.utils.role_filter import RoleFilter
 from bot.utils.states import UpdatePlayerStates
 from bot.handlers.cancel import cancel_adding
-from bot.utils.keyboards import EDIT_FIELD_INLINE
-
-router = Router()
-
-async def get_positions_keyboard():
-    positions = await get_positions()  # [(1, "OL"), (2, "QB"), ...]
-
-    # строим кнопки по строкам (по 2 кнопки в ряд)
-    inline_keyboard = []
-    row = []
-    for i, (pos_id, pos_name) in enumerate(positions, start=1):
-        row.append(InlineKeyboardButton(text=pos_name, callback_data=f"position_{pos_id}"))
-        if i % 2 == 0:
-            inline_keyboard.append(row)
-            row = []
-    if row:
-        inline_keyboard.append(row)  # оставшиеся кнопки
-
-    # добавляем кнопку "Назад" в отдельной строке
-    inline_keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="back")])
-
-    keyboard = InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
-    return keyboard
-
-# Inline-кнопки для выбора поля
-def get_field_inline_menu():
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="✏️ Имя", callback_data="edit_name"),
-             InlineKeyboardButton(text="✏️ Фамилия", callback_data="edit_surname")],
-            [InlineKeyboardButton(text="✏️ Отчество", callback_data="edit_middlename"),
-             InlineKeyboardButton(text="🔢 Номер", callback_data="edit_number")],
-            [InlineKeyboardButton(text="👤 TG username", callback_data="edit_tg_username"),
-             InlineKeyboardButton(text="🧭 Позиция", callback_data="edit_position")],
-            [InlineKeyboardButton(text="🚦 Статус", callback_data="edit_status")],
-            [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel")]
-        ]
-    )
+from bot.utils.keyboards import EDIT_FIELD_INLINE, FIELD_MENU_KEYBOARD, STATUS_KEYBOARD, position_edit_keyboard
+
+
+# Поля, которые можно выбрать в меню /update (value кнопки «f»), и допустимые статусы.
+# Значения приходят от клиента в callback_data — всё, что не из списка, отклоняется
+EDIT_FIELDS = {"name", "surname", "middlename", "number", "tg_username", "position", "status"}
+TEXT_FIELDS = {"name", "surname", "middlename", "number", "tg_username"}
+STATUSES = {"active", "inactive", "injured"}
 
-STATUS_INLINE_KEYBOARD = InlineKeyboardMarkup(
-    inline_keyboard=[
-        [
-            InlineKeyboardButton(text="✅ В строю", callback_data="status_active"),
-            InlineKeyboardButton(text="💤 В запасе", callback_data="status_inactive"),
-            InlineKeyboardButton(text="🤕 Травма", callback_data="status_injured")
-        ],
-        [
-            InlineKeyboardButton(text="⬅️ Назад", callback_data="back")
-        ]
-    ]
-)
 
 def has_role(roles: str | None, role: str) -> bool:
     if not roles:
@@ -65,15 +26,13 @@ def has_role(roles: str | None, role: str) -> bool:
     return role in [r.strip() for r in roles.split(",")]
 
 # --- Начало FSM ---
-@router.message(Command("update"), RoleFilter(allowed_roles=["admin", "coach"]))
 async def start_update_player(message: Message, state: FSMContext):
     await state.set_state(UpdatePlayerStates.id)
     await message.answer(
         "Начинаем редактирование игрока.\nВведите ID игрока:"
     )
 
-@router.message(UpdatePlayerStates.id)
-async def process_player_id(message: Message, state: FSMContext):
+async def process_player_id(message: Message, state: FSMContext, user_roles: frozenset[str] | None = MISSING):
     text = message.text.strip()
     if not text.isdigit():
         await message.answer("ID должен быть числом. Введите корректный ID:")
@@ -85,9 +44,11 @@ async def process_player_id(message: Message, state: FSMContext):
         await message.answer(f"Игрок с ID {player_id} не найден. Введите другой ID:")
         return
 
-    caller_roles = await get_user_role(message.from_user.id)
+    # Роли вызывающего определены RoleMiddleware; без неё — читаем через кэш
+    if user_roles is MISSING:
+        user_roles = await get_user_roles(message.from_user.id)
     target_roles = player.get("roles")
-    if has_role(target_roles, "coach") and not has_role(caller_roles, "admin"):
+    if has_role(target_roles, "coach") and "admin" not in (user_roles or ()):
         await message.answer("Редактирование тренера доступно только администратору.")
         return
 
@@ -103,94 +64,92 @@ async def process_player_id(message: Message, state: FSMContext):
         f"Статус: {player['status']}\n\n"
         "Выберите, что хотите изменить:"
     )
-    await message.answer(info, reply_markup=get_field_inline_menu())
+    await message.answer(info, reply_markup=FIELD_MENU_KEYBOARD)
 
-# --- Обработка выбора поля через Inline ---
-from aiogram.types import CallbackQuery
-
-@router.callback_query(F.data.startswith("edit_") |
-                       F.data.startswith("status_") |
-                       F.data.startswith("position_") |
-                       F.data.in_(["save", "back", "cancel"]))
-async def handle_edit_callbacks(query: CallbackQuery, state: FSMContext):
-    data = await state.get_data()
-    player_id = data.get("player_id")
-    field = data.get("field")
-    new_value = data.get("new_value")
-    action = query.data
-
-    # Выбор поля
-    if action.startswith("edit_"):
-        field_name = action[5:]
-        await state.update_data(field=field_name, new_value=None)
-        await state.set_state(UpdatePlayerStates.edit_field)
-
-        if field_name == "status":
-            await query.message.answer("Выберите новый статус:", reply_markup=STATUS_INLINE_KEYBOARD)
-        elif field_name == "position":
-            keyboard = await get_positions_keyboard()
-            await query.message.answer("Выберите новую позицию:", reply_markup=keyboard)
-        else:
-            await query.message.answer(f"Введите новое значение для {field_name}:", reply_markup=EDIT_FIELD_INLINE)
-
-        await query.answer()
+# --- Обработка кнопок через Inline ---
+async def choose_field(query: CallbackQuery, state: FSMContext, data: dict, field_name: str):
+    if field_name not in EDIT_FIELDS:
+        await query.message.answer("Это поле нельзя изменить.", reply_markup=FIELD_MENU_KEYBOARD)
         return
+    await state.update_data(field=field_name, new_value=None)
+    await state.set_state(UpdatePlayerStates.edit_field)
 
-    # Выбор статуса
-    if action.startswith("status_"):
-        status_value = action[7:]
-        await state.update_data(new_value=status_value)
-        if field == "status" and player_id:
-            await update_player_field(player_id, "status", status_value)
-            await state.set_state(UpdatePlayerStates.menu)
-            await state.update_data(new_value=None)
-            await query.message.answer(f"Статус успешно обновлён: {status_value}", reply_markup=get_field_inline_menu())
-        await query.answer()
-        return
+    if field_name == "status":
+        await query.message.answer("Выберите новый статус:", reply_markup=STATUS_KEYBOARD)
+    elif field_name == "position":
+        keyboard = position_edit_keyboard(await get_reference_data())
+        await query.message.answer("Выберите новую позицию:", reply_markup=keyboard)
+    else:
+        await query.message.answer(f"Введите новое значение для {field_name}:", reply_markup=EDIT_FIELD_INLINE)
 
 
-    if action.startswith("position_"):
-        position_id = int(action.split("_")[1])
-        await state.update_data(new_value=position_id)
-        if player_id:
-            await update_player_field(player_id, "position_id", position_id)
-            await state.set_state(UpdatePlayerStates.menu)
-            await state.update_data(new_value=None)
-            await query.message.answer(f"Позиция успешно обновлена.", reply_markup=get_field_inline_menu())
-        await query.answer()
+async def choose_status(query: CallbackQuery, state: FSMContext, data: dict, status_value: str):
+    if status_value not in STATUSES:
+        await query.message.answer("Неизвестный статус.", reply_markup=STATUS_KEYBOARD)
         return
-
-
-    # Сохранение
-    if action == "save":
-        if not field or new_value is None:
-            await query.message.answer("Сначала введите новое значение.")
-            await query.answer()
-            return
-        await update_player_field(player_id, field, new_value)
+    player_id = data.get("player_id")
+    await state.update_data(new_value=status_value)
+    if data.get("field") == "status" and player_id:
+        await update_player_field(player_id, "status", status_value)
         await state.set_state(UpdatePlayerStates.menu)
         await state.update_data(new_value=None)
-        await query.message.answer(f"{field.capitalize()} успешно обновлено: {new_value}", reply_markup=get_field_inline_menu())
-        await query.answer()
-        return
+        await query.message.answer(f"Статус успешно обновлён: {status_value}", reply_markup=FIELD_MENU_KEYBOARD)
 
-    # Назад
-    if action == "back":
+
+async def choose_position(query: CallbackQuery, state: FSMContext, data: dict, value: str):
+    if not str(value).isdigit():
+        await query.message.answer("Неизвестная позиция.", reply_markup=FIELD_MENU_KEYBOARD)
+        return
+    player_id = data.get("player_id")
+    position_id = int(value)
+    await state.update_data(new_value=position_id)
+    if player_id:
+        await update_player_field(player_id, "position_id", position_id)
         await state.set_state(UpdatePlayerStates.menu)
         await state.update_data(new_value=None)
-        await query.message.answer(f"Изменение {field} отменено.", reply_markup=get_field_inline_menu())
-        await query.answer()
-        return
+        await query.message.answer(f"Позиция успешно обновлена.", reply_markup=FIELD_MENU_KEYBOARD)
 
-    # Полная отмена
-    if action == "cancel":
-        await cancel_adding(query.message, state)
-        await query.answer()
+
+async def save_value(query: CallbackQuery, state: FSMContext, data: dict, value: str | None):
+    field = data.get("field")
+    new_value = data.get("new_value")
+    if field not in TEXT_FIELDS or new_value is None:
+        await query.message.answer("Сначала введите новое значение.")
         return
+    await update_player_field(data.get("player_id"), field, new_value)
+    await state.set_state(UpdatePlayerStates.menu)
+    await state.update_data(new_value=None)
+    await query.message.answer(f"{field.capitalize()} успешно обновлено: {new_value}", reply_markup=FIELD_MENU_KEYBOARD)
+
+
+async def go_back(query: CallbackQuery, state: FSMContext, data: dict, value: str | None):
+    await state.set_state(UpdatePlayerStates.menu)
+    await state.update_data(new_value=None)
+    await query.message.answer(f"Изменение {data.get('field')} отменено.", reply_markup=FIELD_MENU_KEYBOARD)
+
+
+async def cancel_update(query: CallbackQuery, state: FSMContext, data: dict, value: str | None):
+    await cancel_adding(query.message, state)
+
+
+# Таблица действий: UpdateCallback.action -> обработчик(query, state, данные FSM, value)
+UPDATE_ACTIONS = {
+    "f": choose_field,
+    "s": choose_status,
+    "p": choose_position,
+    "ok": save_value,
+    "bk": go_back,
+    "x": cancel_update,
+}
+
+
+async def handle_edit_callbacks(query: CallbackQuery, callback_data: UpdateCallback, state: FSMContext):
+    data = await state.get_data()
+    await UPDATE_ACTIONS[callback_data.action](query, state, data, callback_data.value)
+    await query.answer()
 
 
 # --- Ввод нового значения ---
-@router.message(UpdatePlayerStates.edit_field)
 async def input_field_value(message: Message, state: FSMContext):
     data = await state.get_data()
     field = data.get("field")
@@ -230,4 +189,19 @@ async def input_field_value(message: Message, state: FSMContext):
     await message.answer(
         f"Новое значение: {text}\nНажмите 💾 Сохранить или ⬅️ Назад.",
         reply_markup=EDIT_FIELD_INLINE
-    )
\ No newline at end of file
+    )
+
+
+def create_router() -> Router:
+    """Роутер с хендлерами модуля; новый на каждый Dispatcher."""
+    router = Router()
+    router.message.register(start_update_player, Command("update"), RoleFilter(allowed_roles=["admin", "coach"]))
+    router.message.register(process_player_id, UpdatePlayerStates.id)
+    router.callback_query.register(
+        handle_edit_callbacks,
+        UpdateCallback.filter(F.action.in_(UPDATE_ACTIONS)),
+        StateFilter(UpdatePlayerStates),
+        RoleFilter(allowed_roles=["admin", "coach"])
+    )
+    router.message.register(input_field_value, UpdatePlayerStates.edit_field)
+    return router
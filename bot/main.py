@@ -1,26 +1,150 @@
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from config import BOT_TOKEN
-from handlers.add_player import router as add_player_router
-from handlers.list_players import router as list_players_router
-from handlers.create_poll import router as create_poll_router
-from handlers.update_players import router as update_players_router
-from handlers.cancel import router as cancel_router
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+from bot.config import (
+    BOT_MODE,
+    BOT_TOKEN,
+    DB_PATH,
+    DB_POOL_SIZE,
+    DB_PRAGMAS,
+    FSM_FLUSH_INTERVAL,
+    FSM_STATE_TTL,
+    WEBHOOK_BASE_URL,
+    WEBHOOK_HOST,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+)
+from bot.handlers import (
+    add_player,
+    cancel,
+    create_poll,
+    list_players,
+    poll_answers,
+    reload_reference,
+    schedule,
+    stats,
+    update_players,
+)
+from bot.utils.db_pool import init_pool, close_pool
+from bot.utils.poll_scheduler import poll_scheduler
+from bot.utils.reference_data import load_reference_data
+from bot.utils.reminders import reminder_job
+from bot.utils.role_middleware import RoleMiddleware
+from bot.utils.sqlite_storage import SQLiteStorage
+from bot.utils.vote_writer import vote_writer
+from data.create_team_table import migrate
 import logging
 
-logging.basicConfig(level=logging.INFO)
+# Модули хендлеров в порядке подключения роутеров
+HANDLERS = [
+    add_player,
+    list_players,
+    create_poll,
+    update_players,
+    cancel,
+    reload_reference,
+    poll_answers,
+    stats,
+    schedule,
+]
+
+
+async def on_startup(bot: Bot):
+    # Доводим схему БД до актуальной версии до открытия пула
+    await migrate(DB_PATH)
+    # Один пул соединений к БД на всё время работы бота
+    await init_pool(DB_PATH, readers=DB_POOL_SIZE, pragmas=DB_PRAGMAS)
+    # Позиции и чаты читаются один раз; после их правки — команда /reload
+    await load_reference_data(DB_PATH)
+    # Опросы по расписанию (с догоном пропущенного за время простоя) и напоминания не проголосовавшим
+    poll_scheduler.start(bot)
+    reminder_job.start(bot)
+
+
+async def on_shutdown():
+    await poll_scheduler.close()
+    await reminder_job.close()
+    # Оставшиеся в памяти голоса записываются до закрытия пула
+    await vote_writer.close()
+    await close_pool()
+
+
+def create_dispatcher(storage: BaseStorage | None = None) -> Dispatcher:
+    """
+    Собирает Dispatcher со всеми роутерами, middleware и хуками старта/остановки.
+    storage — FSM-хранилище; по умолчанию SQLiteStorage в основной БД.
+    """
+    # Состояния диалогов хранятся в БД и переживают перезапуск; storage.close()
+    # (последний сброс на диск) вызывается Dispatcher'ом при остановке до закрытия пула
+    if storage is None:
+        storage = SQLiteStorage(DB_PATH, flush_interval=FSM_FLUSH_INTERVAL, ttl=FSM_STATE_TTL)
+    dp = Dispatcher(storage=storage)
+    # Роли отправителя определяются один раз на апдейт и передаются в фильтры/хендлеры
+    dp.update.outer_middleware(RoleMiddleware())
+
+    # Роутеры собираются заново для каждого Dispatcher (тесты и бенчмарки собирают свои)
+    dp.include_routers(*(handlers.create_router() for handlers in HANDLERS))
+
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
+
+
+def create_webhook_app(bot: Bot, dp: Dispatcher, path: str = WEBHOOK_PATH, secret: str | None = WEBHOOK_SECRET) -> web.Application:
+    """
+    aiohttp-приложение для приёма апдейтов через webhook.
+    Запросы без правильного X-Telegram-Bot-Api-Secret-Token отклоняются (401),
+    каждый апдейт обрабатывается в отдельной задаче — параллельно с остальными.
+    """
+    if not secret:
+        raise ValueError("Для webhook-режима нужен WEBHOOK_SECRET")
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=secret,
+        handle_in_background=True
+    ).register(app, path=path)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_polling(bot: Bot, dp: Dispatcher):
+    # Если раньше был включён webhook, getUpdates с ним конфликтует
+    await bot.delete_webhook()
+    print("Bot started (polling)")
+    await dp.start_polling(bot)
+
+
+def run_webhook(bot: Bot, dp: Dispatcher):
+    async def set_webhook():
+        # Без публичного адреса webhook регистрируется вручную (например, за reverse-proxy)
+        if WEBHOOK_BASE_URL:
+            # Типы апдейтов — по используемым хендлерам (в т.ч. poll_answer для голосов в опросах)
+            await bot.set_webhook(
+                f"{WEBHOOK_BASE_URL.rstrip('/')}{WEBHOOK_PATH}",
+                secret_token=WEBHOOK_SECRET,
+                allowed_updates=dp.resolve_used_update_types()
+            )
+
+    dp.startup.register(set_webhook)
+    app = create_webhook_app(bot, dp)
+    print(f"Bot started (webhook) on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    web.run_app(app, host=WEBHOOK_HOST, port=WEBHOOK_PORT)
 
-bot = Bot(token=BOT_TOKEN)
-dp = Dispatcher(storage=MemoryStorage())
-dp.include_router(add_player_router)
-dp.include_router(list_players_router)
-dp.include_router(create_poll_router)
-dp.include_router(update_players_router)
-dp.include_router(cancel_router)
 
 if __name__ == "__main__":
     import asyncio
-    async def main():
-        print("Bot started")
-        await dp.start_polling(bot)
-    asyncio.run(main())
\ No newline at end of file
+
+    logging.basicConfig(level=logging.INFO)
+
+    bot = Bot(token=BOT_TOKEN)
+    dp = create_dispatcher()
+
+    if BOT_MODE == "webhook":
+        run_webhook(bot, dp)
+    else:
+        asyncio.run(run_polling(bot, dp))
@@ -0,0 +1,275 @@
+"""
+Аналитика посещаемости по истории опросов на тренировки (polls / poll_votes).
+
+История загружается в матрицу «игроки × тренировки» на битовых масках (int):
+бит j — j-я по времени тренировка позиции игрока. Доли посещаемости, серии и
+разрезы по дням недели считаются операциями &, | и int.bit_count() над целыми
+строками матрицы. Матрица строится один раз и переиспользуется, пока не
+изменятся состав или история опросов.
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+
+from bot.utils import db as db_module
+from bot.utils.db import (
+    list_role_members,
+    list_training_polls,
+    list_training_votes,
+    on_votes_saved,
+    roster_version,
+    votes_version,
+)
+from bot.utils.poll_question import MSK
+
+# Вариант «Буду» в опросе на тренировку (quick_poll: «Буду», «Не буду», «Тренер»)
+YES_OPTION = 0
+
+WEEKDAYS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+
+
+def longest_run(mask: int) -> int:
+    """Длина самой длинной серии единиц в маске (число итераций = длине серии)."""
+    run = 0
+    while mask:
+        mask &= mask >> 1
+        run += 1
+    return run
+
+
+@dataclass(frozen=True)
+class PlayerAttendance:
+    player_id: int
+    name: str
+    surname: str
+    position_id: int | None
+    attended: int
+    expected: int
+    current_streak: int
+    best_streak: int
+
+    @property
+    def rate(self) -> float | None:
+        """Доля тренировок, на которые игрок ответил «Буду»; None — тренировок не было."""
+        return self.attended / self.expected if self.expected else None
+
+
+class AttendanceMatrix:
+    """
+    Матрица посещаемости игроков.
+
+    - trainings — позиция -> времена тренировок по порядку (номер = бит в масках)
+    - weekday_masks — позиция -> 7 масок тренировок по дням недели
+    - expected / attended — игрок -> маска тренировок, на которые его ждали / на которые он придёт.
+      Игрока ждут начиная с первой тренировки, где он ответил: новичков не штрафуем за прошлое
+    - totals — (позиция, день недели или None) -> [пришли, ожидались] по всем игрокам позиции
+    """
+
+    def __init__(self, trainings, votes, players):
+        """
+        trainings — (poll_id, position_id, время), как list_training_polls()
+        votes — (poll_id, tg_id, option_id), как list_training_votes()
+        players — (id, name, surname, position_id, tg_id), как list_role_members("player")
+        """
+        self.trainings: dict[int, list[float]] = {}
+        self.weekday_masks: dict[int, list[int]] = {}
+        # Опросы одной тренировки в разных чатах позиции — один столбец матрицы
+        self.columns: dict[str, tuple[int, int]] = {}
+        self._column_polls: dict[tuple[int, int], list[str]] = {}
+        bits: dict[tuple[int, float], int] = {}
+        for poll_id, position_id, at in trainings:
+            bit = bits.get((position_id, at))
+            if bit is None:
+                times = self.trainings.setdefault(position_id, [])
+                bit = bits[(position_id, at)] = len(times)
+                times.append(at)
+                masks = self.weekday_masks.setdefault(position_id, [0] * 7)
+                masks[datetime.fromtimestamp(at, MSK).weekday()] |= 1 << bit
+            self.columns[poll_id] = (position_id, bit)
+            self._column_polls.setdefault((position_id, bit), []).append(poll_id)
+
+        self.players = {pid: (name, surname, position_id) for pid, name, surname, position_id, _ in players}
+        self._by_tg_id = {tg_id: pid for pid, *_, tg_id in players if tg_id is not None}
+        # Голоса в опросах на тренировки: (poll_id, tg_id) -> вариант; нужны, чтобы применять новые голоса
+        self._votes: dict[tuple[str, int], int] = {}
+        self._answered: dict[int, int] = {}
+        self._yes: dict[int, int] = {}
+        for poll_id, tg_id, option_id in votes:
+            column = self.columns.get(poll_id)
+            if column is None:
+                continue
+            self._votes[(poll_id, tg_id)] = option_id
+            player_id = self._by_tg_id.get(tg_id)
+            player = self.players.get(player_id)
+            # Учитываются только тренировки текущей позиции игрока
+            if player is None or column[0] != player[2]:
+                continue
+            bit = 1 << column[1]
+            self._answered[player_id] = self._answered.get(player_id, 0) | bit
+            if option_id == YES_OPTION:
+                self._yes[player_id] = self._yes.get(player_id, 0) | bit
+
+        self.expected: dict[int, int] = {}
+        self.attended: dict[int, int] = {}
+        self.by_position: dict[int | None, list[int]] = {}
+        self.totals: dict[tuple[int | None, int | None], list[int]] = {}
+        for player_id, (_, _, position_id) in self.players.items():
+            self.by_position.setdefault(position_id, []).append(player_id)
+            self._update_row(player_id)
+
+    @property
+    def votes(self) -> int:
+        return len(self._votes)
+
+    def _update_row(self, player_id: int):
+        """Пересчитывает строку игрока по маскам его ответов и обновляет totals."""
+        position_id = self.players[player_id][2]
+        if player_id in self.expected:
+            self._count(player_id, -1)
+        full = (1 << len(self.trainings.get(position_id, ()))) - 1
+        answered = self._answered.get(player_id, 0)
+        first = answered & -answered
+        expected = full & ~(first - 1) if first else full
+        self.expected[player_id] = expected
+        self.attended[player_id] = self._yes.get(player_id, 0) & expected
+        self._count(player_id, 1)
+
+    def _count(self, player_id: int, sign: int):
+        """Добавляет (sign=1) или вычитает (sign=-1) строку игрока из totals."""
+        position_id = self.players[player_id][2]
+        attended, expected = self.attended[player_id], self.expected[player_id]
+        self._add(position_id, None, attended, expected, sign)
+        for weekday, mask in enumerate(self.weekday_masks.get(position_id, ())):
+            if mask:
+                self._add(position_id, weekday, attended & mask, expected & mask, sign)
+
+    def _add(self, position_id, weekday, attended: int, expected: int, sign: int = 1):
+        total = self.totals.setdefault((position_id, weekday), [0, 0])
+        total[0] += sign * attended.bit_count()
+        total[1] += sign * expected.bit_count()
+
+    def apply_votes(self, upserts: list[tuple[str, int, int, float]], deletes: list[tuple[str, int]]):
+        """
+        Применяет записанную пачку голосов (как в save_poll_votes) без перестройки матрицы:
+        пересчитываются только строки проголосовавших. Голоса в других опросах пропускаются.
+        """
+        changed = set()
+        for poll_id, tg_id, option_id, _ in upserts:
+            if poll_id in self.columns:
+                self._votes[(poll_id, tg_id)] = option_id
+                changed.add((poll_id, tg_id))
+        for poll_id, tg_id in deletes:
+            if self._votes.pop((poll_id, tg_id), None) is not None:
+                changed.add((poll_id, tg_id))
+
+        rows = set()
+        for poll_id, tg_id in changed:
+            player_id = self._by_tg_id.get(tg_id)
+            player = self.players.get(player_id)
+            position_id, bit = self.columns[poll_id]
+            if player is None or position_id != player[2]:
+                continue
+            # Ответ на тренировку — голос в любом из её опросов (по одному на чат позиции)
+            options = {
+                self._votes[(other, tg_id)] for other in self._column_polls[(position_id, bit)]
+                if (other, tg_id) in self._votes
+            }
+            mask = 1 << bit
+            self._answered[player_id] = self._answered.get(player_id, 0) & ~mask | (mask if options else 0)
+            self._yes[player_id] = self._yes.get(player_id, 0) & ~mask | (mask if YES_OPTION in options else 0)
+            rows.add(player_id)
+        for player_id in rows:
+            self._update_row(player_id)
+
+    def training_count(self, position_id: int | None = None) -> int:
+        """Число тренировок позиции (или всех позиций)."""
+        if position_id is not None:
+            return len(self.trainings.get(position_id, ()))
+        return sum(len(times) for times in self.trainings.values())
+
+    def rate(self, position_id: int | None = None, weekday: int | None = None) -> tuple[int, int]:
+        """(пришли, ожидались) по позиции или по всей команде; weekday — только тренировки этого дня."""
+        if position_id is not None:
+            return tuple(self.totals.get((position_id, weekday), (0, 0)))
+        attended = expected = 0
+        for (_, day), (a, e) in self.totals.items():
+            if day == weekday:
+                attended += a
+                expected += e
+        return attended, expected
+
+    def weekdays(self, position_id: int | None = None) -> list[int]:
+        """Дни недели, по которым были тренировки позиции (или команды)."""
+        masks = [self.weekday_masks.get(position_id, [0] * 7)] if position_id is not None \
+            else self.weekday_masks.values()
+        return [day for day in range(7) if any(m[day] for m in masks)]
+
+    def player(self, player_id: int) -> PlayerAttendance:
+        name, surname, position_id = self.players[player_id]
+        expected = self.expected[player_id]
+        attended = self.attended[player_id]
+        misses = expected & ~attended
+        # Текущая серия — подряд посещённые тренировки, начиная с последней
+        current = attended.bit_count() if not misses else expected.bit_length() - misses.bit_length()
+        return PlayerAttendance(
+            player_id=player_id,
+            name=name,
+            surname=surname,
+            position_id=position_id,
+            attended=attended.bit_count(),
+            expected=expected.bit_count(),
+            current_streak=current,
+            best_streak=longest_run(attended),
+        )
+
+    def depth_chart(self, position_id: int) -> list[PlayerAttendance]:
+        """Игроки позиции по убыванию посещаемости, затем по текущей серии."""
+        rows = [self.player(pid) for pid in self.by_position.get(position_id, ())]
+        return sorted(rows, key=lambda r: (-(r.rate or 0.0), -r.current_streak, r.surname, r.name, r.player_id))
+
+
+async def build_attendance(db_path=None) -> AttendanceMatrix:
+    """Загружает историю опросов из БД и строит матрицу."""
+    trainings = await list_training_polls(db_path)
+    votes = await list_training_votes(db_path)
+    players = await list_role_members("player", db_path)
+    return AttendanceMatrix(trainings, votes, players)
+
+
+# Последняя построенная матрица и ключ (версия состава, версия опросов, БД), по которому она строилась
+_cached: tuple[tuple, AttendanceMatrix] | None = None
+_lock = asyncio.Lock()
+# Пачки голосов, записанные, пока матрица строилась: (БД, upserts, deletes)
+_pending: list[tuple[str, list, list]] = []
+
+
+@on_votes_saved
+def _apply_saved_votes(upserts: list, deletes: list, db_path=None):
+    """Новые голоса применяются к готовой матрице на месте — без перестройки по всей истории."""
+    path = str(db_path or db_module.DB_PATH)
+    if _lock.locked():
+        # Матрица строится и могла прочитать историю до этой записи — применим пачку после сборки
+        _pending.append((path, upserts, deletes))
+    if _cached is not None and _cached[0][2] == path:
+        _cached[1].apply_votes(upserts, deletes)
+
+
+async def get_attendance() -> AttendanceMatrix:
+    """
+    Матрица посещаемости; перестраивается, только если изменились состав или опросы.
+    Новые голоса применяются к ней на месте.
+    """
+    global _cached
+    key = (roster_version(), votes_version(), str(db_module.DB_PATH))
+    if _cached is None or _cached[0] != key:
+        async with _lock:
+            if _cached is None or _cached[0] != key:
+                _pending.clear()
+                matrix = await build_attendance()
+                # Повторное применение уже прочитанных голосов ничего не меняет
+                for path, upserts, deletes in _pending:
+                    if path == key[2]:
+                        matrix.apply_votes(upserts, deletes)
+                _pending.clear()
+                _cached = (key, matrix)
+    return _cached[1]
@@ -0,0 +1,44 @@
+"""
+Типизированные callback_data inline-кнопок (aiogram CallbackData).
+
+Префиксы короткие, вместо названий и строковых id передаются числа: Telegram
+ограничивает callback_data 64 байтами. Разбор — CallbackData.unpack, в
+хендлерах — фильтр <Класс>.filter() и аргумент callback_data.
+"""
+from aiogram.filters.callback_data import CallbackData
+
+
+class PollChatCallback(CallbackData, prefix="pc"):
+    """
+    Выбор чата для опроса: номер чата в ReferenceData.chats и версия справочников,
+    по которой строилась клавиатура (после /reload номера могут сдвинуться).
+    """
+    index: int
+    version: int
+
+
+class UpdateCallback(CallbackData, prefix="up"):
+    """
+    Кнопки диалога /update: action — что сделать, value — аргумент.
+
+    - f — выбрать поле (value — имя поля)
+    - s — новый статус (value — статус)
+    - p — новая позиция (value — id позиции)
+    - ok — сохранить введённое значение
+    - bk — назад к меню полей
+    - x — отменить редактирование
+    """
+    action: str
+    value: str | None = None
+
+
+class RosterPageCallback(CallbackData, prefix="rp"):
+    """
+    Навигация по /players и /coaches: id и номер в списке крайнего показанного
+    участника (курсор) и направление (forward=1 — вперёд, 0 — назад).
+    """
+    kind: str
+    position: str | None = None
+    forward: bool
+    cursor_id: int
+    cursor_index: int
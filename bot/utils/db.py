@@ -1,10 +1,109 @@
 import logging
+from contextlib import asynccontextmanager
 
 import aiosqlite
-from bot.config import DB_PATH
+from bot.config import DB_PATH, ROLE_CACHE_SIZE, ROLE_CACHE_TTL
+from bot.utils.db_pool import get_pool
+from bot.utils.role_cache import MISSING, RoleCache, parse_roles
 
+# Кэш ролей по tg_id, сбрасывается при любой записи в team / player_roles
+role_cache = RoleCache(maxsize=ROLE_CACHE_SIZE, ttl=ROLE_CACHE_TTL)
 
-async def insert_player(data: dict, role_ids: list[int] | None = None, db_path: str = DB_PATH) -> bool:
+# Подписчики на изменения состава (кэши, построенные по team / player_roles)
+_roster_listeners: list = []
+# Версия состава: растёт при каждой записи в team / player_roles
+_roster_version = 0
+
+
+def roster_version() -> int:
+    """Текущая версия состава — ключ для кэшей, построенных по team / player_roles."""
+    return _roster_version
+
+
+def on_roster_change(callback):
+    """
+    Регистрирует функцию без аргументов, вызываемую после каждой записи в состав.
+    Можно использовать как декоратор.
+    """
+    _roster_listeners.append(callback)
+    return callback
+
+
+def notify_roster_changed():
+    """
+    Сообщает подписчикам, что состав изменился.
+    Вызывается всеми записями в db.py; нужна и при правках БД в обход этих функций.
+    """
+    global _roster_version
+    _roster_version += 1
+    for callback in _roster_listeners:
+        callback()
+
+
+# Версия истории опросов: растёт при каждой записи в polls
+_votes_version = 0
+# Подписчики на записанные пачки голосов (poll_votes)
+_votes_listeners: list = []
+
+
+def votes_version() -> int:
+    """Текущая версия списка опросов — ключ для кэшей аналитики посещаемости."""
+    return _votes_version
+
+
+def notify_votes_changed():
+    """
+    Сообщает, что история опросов изменилась и кэши нужно перестроить
+    (вызывается записью в polls; нужна и при правках БД в обход db.py).
+    """
+    global _votes_version
+    _votes_version += 1
+
+
+def on_votes_saved(callback):
+    """
+    Регистрирует функцию callback(upserts, deletes, db_path), вызываемую после каждой
+    записанной пачки голосов — чтобы применять голоса к кэшам без перестройки.
+    Можно использовать как декоратор.
+    """
+    _votes_listeners.append(callback)
+    return callback
+
+
+@asynccontextmanager
+async def _read(db_path=None):
+    """
+    Соединение для чтения.
+    Берётся из общего пула, если он открыт для этой БД, иначе открывается разовое.
+    """
+    path = db_path or DB_PATH
+    pool = get_pool()
+    if pool is not None and pool.serves(path):
+        async with pool.reader() as db:
+            yield db
+    else:
+        async with aiosqlite.connect(path) as db:
+            yield db
+
+
+@asynccontextmanager
+async def _write(db_path=None):
+    """
+    Соединение для записи.
+    Через пул все записи идут последовательно через одно соединение.
+    """
+    path = db_path or DB_PATH
+    pool = get_pool()
+    if pool is not None and pool.serves(path):
+        async with pool.writer() as db:
+            yield db
+    else:
+        async with aiosqlite.connect(path) as db:
+            yield db
+
+
+
+async def insert_player(data: dict, role_ids: list[int] | None = None, db_path: str | None = None) -> bool:
     """
     Вставляет игрока в таблицу team и роли в player_roles.
     data — словарь с ключами:
@@ -13,7 +112,7 @@ async def insert_player(data: dict, role_ids: list[int] | None = None, db_path:
     Возвращает True, если игрок создан; False если игрок уже существует (по tg_id или tg_username).
     """
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _write(db_path) as db:
         # Проверка на дубликат по tg_id или tg_username
         query = "SELECT id FROM team WHERE tg_id = ? OR tg_username = ?"
         async with db.execute(query, (data.get("tg_id"), data.get("tg_username"))) as cursor:
@@ -52,10 +151,12 @@ async def insert_player(data: dict, role_ids: list[int] | None = None, db_path:
             )
 
         await db.commit()
+        role_cache.invalidate(data.get("tg_id"))
+        notify_roster_changed()
         return True
 
-async def get_positions():
-    async with aiosqlite.connect(DB_PATH) as db:
+async def get_positions(db_path=None):
+    async with _read(db_path) as db:
         cursor = await db.execute("SELECT id, position FROM positions ORDER BY id")
         rows = await cursor.fetchall()
         await cursor.close()
@@ -80,20 +181,66 @@ async def get_user_role(tg_id: int) -> str | None:
             LIMIT 1
         """
 
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _read() as db:
         cursor = await db.execute(query, (tg_id,))
         row = await cursor.fetchone()
         await cursor.close()
 
         return row[0] if row else None
 
-async def list_players(db_path=DB_PATH, only_active: bool = False):
+async def get_user_roles(tg_id: int) -> frozenset[str] | None:
+    """
+    Роли пользователя по tg_id в виде frozenset, например frozenset({'admin', 'coach'}).
+    Если игрок не найден — возвращает None.
+    Результат кэшируется в role_cache (TTL + LRU).
+    """
+    roles = role_cache.get(tg_id)
+    if roles is not MISSING:
+        return roles
+
+    roles = parse_roles(await get_user_role(tg_id))
+    role_cache.set(tg_id, roles)
+    return roles
+
+def invalidate_user_roles(*tg_ids: int):
+    """
+    Сбрасывает закэшированные роли.
+    Без аргументов — очищает кэш полностью (например, после массовой смены ролей).
+    """
+    if tg_ids:
+        role_cache.invalidate(*tg_ids)
+    else:
+        role_cache.clear()
+
+# Общая часть запроса профиля игрока: данные из team + позиция + роли строкой
+PLAYER_SELECT = """
+    SELECT
+        t.id,
+        t.name,
+        t.surname,
+        t.middlename,
+        t.number,
+        t.tg_username,
+        t.tg_id,
+        t.status,
+        p.position,
+        COALESCE(GROUP_CONCAT(r.role, ', '), '') as roles
+    FROM team t
+    LEFT JOIN positions p ON t.position_id = p.id
+    LEFT JOIN player_roles pr ON t.id = pr.player_id
+    LEFT JOIN roles r ON pr.role_id = r.id
+"""
+
+# Ограничение SQLite на число параметров в одном запросе (с запасом)
+MAX_QUERY_PARAMS = 500
+
+async def list_players(db_path=None, only_active: bool = False):
     """
     Получаем список всех игроков/тренеров с их ролями.
     Роли возвращаются как строка через запятую: "admin, coach"
     """
     try:
-        async with aiosqlite.connect(db_path) as db:
+        async with _read(db_path) as db:
             db.row_factory = aiosqlite.Row
 
             where_clause = ""
@@ -104,27 +251,13 @@ async def list_players(db_path=DB_PATH, only_active: bool = False):
                 params.append("active")
 
             query = f"""
-                SELECT
-                    t.id,
-                    t.name,
-                    t.surname,
-                    t.middlename,
-                    t.number,
-                    t.tg_username,
-                    t.tg_id,
-                    t.status,
-                    p.position,
-                    COALESCE(GROUP_CONCAT(r.role, ', '), '') as roles
-                FROM team t
-                LEFT JOIN positions p ON t.position_id = p.id
-                LEFT JOIN player_roles pr ON t.id = pr.player_id
-                LEFT JOIN roles r ON pr.role_id = r.id
+                {PLAYER_SELECT}
                 {where_clause}
                 GROUP BY t.id
                 ORDER BY t.name
             """
-            cursor = await db.execute(query, params)
-            rows = await cursor.fetchall()
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
             result = [dict(row) for row in rows]
             return result
 
@@ -132,35 +265,139 @@ async def list_players(db_path=DB_PATH, only_active: bool = False):
         logging.error(f"Ошибка при получении списка игроков: {e}")
         return []
 
-async def get_chat_by_position(position_name: str):
-    """Возвращает кортеж (chat_id, thread_id) по названию позиции."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute(
-            "SELECT id FROM positions WHERE position = ?",
-            (position_name,)
-        )
-        pos_row = await cursor.fetchone()
-        if not pos_row:
-            return None, None
-        position_id = pos_row[0]
+async def list_players_page(
+        role: str,
+        position: str | None = None,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        limit: int = 20,
+        db_path=None
+) -> list[dict]:
+    """
+    Одна страница состава с ролью `role` (и позицией, если указана), по порядку (name, id).
+    Keyset-пагинация: after_id — следующая страница после этого игрока,
+    before_id — предыдущая страница перед ним. Стоимость запроса не зависит
+    от номера страницы и размера состава.
+    Формат записей тот же, что у list_players.
+    """
+    conditions = [
+        """EXISTS (
+            SELECT 1 FROM player_roles pr JOIN roles r ON pr.role_id = r.id
+            WHERE pr.player_id = t.id AND r.role = ?
+        )"""
+    ]
+    params: list = [role]
 
-        cursor = await db.execute(
-            "SELECT chat_id, thread_id FROM chats WHERE position_id = ?",
-            (position_id,)
+    if position:
+        conditions.append("t.position_id = (SELECT id FROM positions WHERE position = ?)")
+        params.append(position)
+
+    order = "t.name, t.id"
+    if after_id is not None:
+        conditions.append("(t.name, t.id) > ((SELECT name FROM team WHERE id = ?), ?)")
+        params += [after_id, after_id]
+    elif before_id is not None:
+        conditions.append("(t.name, t.id) < ((SELECT name FROM team WHERE id = ?), ?)")
+        params += [before_id, before_id]
+        # Идём назад от курсора, затем разворачиваем страницу
+        order = "t.name DESC, t.id DESC"
+
+    query = f"""
+        WITH page AS (
+            SELECT t.id FROM team t
+            WHERE {" AND ".join(conditions)}
+            ORDER BY {order}
+            LIMIT ?
         )
-        chat_row = await cursor.fetchone()
+        {PLAYER_SELECT}
+        WHERE t.id IN (SELECT id FROM page)
+        GROUP BY t.id
+        ORDER BY t.name, t.id
+    """
+    params.append(limit)
+
+    async with _read(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+async def list_mention_targets(position: str | None = None, status: str = "active", db_path=None) -> list[dict]:
+    """
+    Лёгкая выборка для упоминаний: только name, surname, tg_username, tg_id
+    игроков с нужным статусом (и позицией, если указана), без агрегации ролей.
+    """
+    if position:
+        query = """
+            SELECT t.name, t.surname, t.tg_username, t.tg_id
+            FROM team t
+            JOIN positions p ON t.position_id = p.id
+            WHERE p.position = ? AND t.status = ?
+            ORDER BY t.name, t.id
+        """
+        params = (position, status)
+    else:
+        query = """
+            SELECT t.name, t.surname, t.tg_username, t.tg_id
+            FROM team t
+            WHERE t.status = ?
+            ORDER BY t.name, t.id
+        """
+        params = (status,)
+
+    async with _read(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(query, params) as cursor:
+            rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+async def get_chat_by_position(position_name: str):
+    """
+    Возвращает кортеж (chat_id, thread_id) первого чата позиции одним запросом.
+    Бот берёт чаты из таблицы маршрутов в памяти (reference_data); функция — для разовых выборок.
+    """
+    async with _read() as db:
+        async with db.execute(
+            """
+            SELECT c.chat_id, c.thread_id
+            FROM positions p
+            JOIN chats c ON c.position_id = p.id
+            WHERE p.position = ?
+            ORDER BY c.id
+            LIMIT 1
+            """,
+            (position_name,)
+        ) as cursor:
+            chat_row = await cursor.fetchone()
         if not chat_row:
             return None, None
 
         return chat_row[0], chat_row[1]
 
-async def get_all_chats(db_path: str = DB_PATH) -> list[tuple[int, int, str]]:
+async def get_trainings(db_path=None) -> list[tuple[int, str, int | None]]:
+    """Еженедельные тренировки: (weekday, "HH:MM", position_id)."""
+    async with _read(db_path) as db:
+        async with db.execute("SELECT weekday, time, position_id FROM trainings ORDER BY id") as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+
+async def get_training_exceptions(since: str, db_path=None) -> list[tuple[str, int | None, str | None]]:
+    """Исключения в расписании начиная с даты since ("YYYY-MM-DD"): (date, position_id, "HH:MM" или None)."""
+    async with _read(db_path) as db:
+        async with db.execute(
+            "SELECT date, position_id, time FROM training_exceptions WHERE date >= ? ORDER BY date",
+            (since,)
+        ) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+
+async def get_all_chats(db_path: str | None = None) -> list[tuple[int, int, str]]:
     """
     Возвращает список всех чатов для опросов.
 
     Каждая запись — кортеж (chat_id, thread_id, chat_name)
     """
-    async with aiosqlite.connect(db_path) as db:
+    async with _read(db_path) as db:
         cursor = await db.execute(
             "SELECT chat_id, thread_id, chat_name FROM chats ORDER BY id"
         )
@@ -168,18 +405,322 @@ async def get_all_chats(db_path: str = DB_PATH) -> list[tuple[int, int, str]]:
         await cursor.close()
         return [(row[0], row[1], row[2]) for row in rows]
 
-async def get_player_by_id(player_id: int):
-    players = await list_players()
-    for player in players:
-        if player["id"] == player_id:
-            return player
-    return None
+async def get_position_chats(db_path=None) -> list[tuple[str, str, str]]:
+    """
+    Чаты, привязанные к позициям: (позиция, chat_id, thread_id) в порядке id чата.
+    Одним запросом для справочника reference_data.
+    """
+    async with _read(db_path) as db:
+        async with db.execute(
+            """
+            SELECT p.position, c.chat_id, c.thread_id
+            FROM chats c
+            JOIN positions p ON c.position_id = p.id
+            ORDER BY c.id
+            """
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [(row[0], row[1], row[2]) for row in rows]
+
+async def get_player_by_id(player_id: int, db_path=None) -> dict | None:
+    """
+    Возвращает игрока по id (в том же формате, что и list_players) или None.
+    Поиск идёт по первичному ключу, без чтения всего состава.
+    """
+    async with _read(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        query = f"""
+            {PLAYER_SELECT}
+            WHERE t.id = ?
+            GROUP BY t.id
+        """
+        async with db.execute(query, (player_id,)) as cursor:
+            row = await cursor.fetchone()
+        return dict(row) if row else None
+
+async def get_players_by_ids(player_ids, db_path=None) -> dict[int, dict]:
+    """
+    Пакетный вариант get_player_by_id.
+    Возвращает словарь {id: игрок}; отсутствующие id в него не попадают.
+    """
+    ids = list(dict.fromkeys(player_ids))
+    result: dict[int, dict] = {}
+    if not ids:
+        return result
+
+    async with _read(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        for i in range(0, len(ids), MAX_QUERY_PARAMS):
+            chunk = ids[i:i + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"""
+                {PLAYER_SELECT}
+                WHERE t.id IN ({placeholders})
+                GROUP BY t.id
+            """
+            async with db.execute(query, chunk) as cursor:
+                async for row in cursor:
+                    result[row["id"]] = dict(row)
+    return result
+
+
+# Столбцы team, которые можно менять через update_player_field (имя столбца подставляется в SQL)
+PLAYER_FIELDS = {"name", "surname", "middlename", "number", "tg_username", "tg_id", "position_id", "status"}
 
 
 async def update_player_field(player_id: int, field: str, value):
-    async with aiosqlite.connect(DB_PATH) as db:
+    if field not in PLAYER_FIELDS:
+        raise ValueError(f"Поле {field!r} нельзя изменить")
+    async with _write() as db:
+        async with db.execute("SELECT tg_id FROM team WHERE id = ?", (player_id,)) as cursor:
+            row = await cursor.fetchone()
         await db.execute(
             f"UPDATE team SET {field} = ? WHERE id = ?",
             (value, player_id)
         )
-        await db.commit()
\ No newline at end of file
+        await db.commit()
+
+    # Роли привязаны к tg_id: сбрасываем старый и, если он менялся, новый
+    role_cache.invalidate(row[0] if row else None, value if field == "tg_id" else None)
+    notify_roster_changed()
+
+async def load_fsm_record(key: str, db_path=None) -> tuple[str | None, str, float] | None:
+    """Возвращает (state, data_json, updated_at) из fsm_states или None."""
+    async with _read(db_path) as db:
+        async with db.execute(
+            "SELECT state, data, updated_at FROM fsm_states WHERE key = ?",
+            (key,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return (row[0], row[1], row[2]) if row else None
+
+
+async def save_fsm_records(
+        upserts: list[tuple[str, str | None, str, float]],
+        deletes: list[str],
+        db_path=None
+):
+    """
+    Сохраняет пачку состояний FSM одной транзакцией.
+    upserts — (key, state, data_json, updated_at); deletes — ключи пустых состояний.
+    """
+    async with _write(db_path) as db:
+        if upserts:
+            await db.executemany(
+                """
+                INSERT INTO fsm_states (key, state, data, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    state = excluded.state,
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                """,
+                upserts
+            )
+        if deletes:
+            await db.executemany("DELETE FROM fsm_states WHERE key = ?", [(k,) for k in deletes])
+        await db.commit()
+
+
+async def delete_expired_fsm_records(before: float, db_path=None) -> int:
+    """Удаляет состояния FSM, не менявшиеся с момента `before`. Возвращает число удалённых."""
+    async with _write(db_path) as db:
+        cursor = await db.execute("DELETE FROM fsm_states WHERE updated_at < ?", (before,))
+        await db.commit()
+        return cursor.rowcount
+
+
+async def save_polls(polls: list[tuple], db_path=None):
+    """
+    Сохраняет отправленные опросы одной транзакцией.
+    polls — (poll_id, chat_id, thread_id, message_id, position_id, kind, question, options_json,
+    created_at, training_at).
+    """
+    async with _write(db_path) as db:
+        await db.executemany(
+            """
+            INSERT OR IGNORE INTO polls
+                (poll_id, chat_id, thread_id, message_id, position_id, kind, question, options, created_at, training_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            polls
+        )
+        await db.commit()
+    notify_votes_changed()
+
+
+async def save_poll_votes(
+        upserts: list[tuple[str, int, int, float]],
+        deletes: list[tuple[str, int]],
+        db_path=None
+):
+    """
+    Сохраняет пачку голосов одной транзакцией.
+    upserts — (poll_id, tg_id, option_id, voted_at); deletes — (poll_id, tg_id) отозванных голосов.
+    """
+    async with _write(db_path) as db:
+        if upserts:
+            await db.executemany(
+                """
+                INSERT INTO poll_votes (poll_id, tg_id, option_id, voted_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(poll_id, tg_id) DO UPDATE SET
+                    option_id = excluded.option_id,
+                    voted_at = excluded.voted_at
+                """,
+                upserts
+            )
+        if deletes:
+            await db.executemany("DELETE FROM poll_votes WHERE poll_id = ? AND tg_id = ?", deletes)
+        await db.commit()
+    for callback in _votes_listeners:
+        callback(upserts, deletes, db_path)
+
+
+async def get_poll_votes(poll_id: str, db_path=None) -> dict[int, int]:
+    """Голоса в опросе: tg_id -> номер выбранного варианта."""
+    async with _read(db_path) as db:
+        async with db.execute(
+            "SELECT tg_id, option_id FROM poll_votes WHERE poll_id = ?",
+            (poll_id,)
+        ) as cursor:
+            return {row[0]: row[1] for row in await cursor.fetchall()}
+
+
+async def list_training_polls(db_path=None) -> list[tuple[str, int, float]]:
+    """
+    Опросы на тренировки позиций: (poll_id, position_id, время тренировки) по времени.
+    У опросов без training_at (записанных до миграции 6) берётся время отправки.
+    """
+    async with _read(db_path) as db:
+        async with db.execute(
+            """
+            SELECT poll_id, position_id, COALESCE(training_at, created_at) AS at
+            FROM polls
+            WHERE kind = 'training' AND position_id IS NOT NULL
+            ORDER BY at, poll_id
+            """
+        ) as cursor:
+            return [(row[0], row[1], row[2]) for row in await cursor.fetchall()]
+
+
+async def list_training_votes(db_path=None) -> list[tuple[str, int, int]]:
+    """
+    Голоса в опросах на тренировки: (poll_id, tg_id, option_id).
+    Без JOIN с team: голосов на порядки больше, чем участников, их сопоставляют по tg_id в памяти.
+    """
+    async with _read(db_path) as db:
+        async with db.execute(
+            """
+            SELECT v.poll_id, v.tg_id, v.option_id
+            FROM polls p
+            JOIN poll_votes v ON v.poll_id = p.poll_id
+            WHERE p.kind = 'training'
+            """
+        ) as cursor:
+            return [(row[0], row[1], row[2]) for row in await cursor.fetchall()]
+
+
+async def list_role_members(role: str, db_path=None) -> list[tuple[int, str, str, int | None, int | None]]:
+    """Участники с ролью: (id, name, surname, position_id, tg_id), без агрегации ролей."""
+    async with _read(db_path) as db:
+        async with db.execute(
+            """
+            SELECT t.id, t.name, t.surname, t.position_id, t.tg_id
+            FROM roles r
+            JOIN player_roles pr ON pr.role_id = r.id
+            JOIN team t ON t.id = pr.player_id
+            WHERE r.role = ?
+            """,
+            (role,)
+        ) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+
+async def list_due_reminders(after: float, until: float, lead: float, db_path=None) -> list[tuple]:
+    """
+    Опросы на тренировки, которые начнутся в (after, until] и по которым ещё не напоминали:
+    (poll_id, chat_id, thread_id, position_id, training_at).
+    Опросы, отправленные позже чем за `lead` секунд до тренировки, пропускаются:
+    напоминание сразу вслед за опросом не даёт игрокам времени ответить.
+    """
+    async with _read(db_path) as db:
+        async with db.execute(
+            """
+            SELECT poll_id, chat_id, thread_id, position_id, training_at
+            FROM polls
+            WHERE reminded_at IS NULL AND training_at > ? AND training_at <= ?
+                AND created_at <= training_at - ?
+                AND kind = 'training' AND position_id IS NOT NULL
+            ORDER BY training_at, poll_id
+            """,
+            (after, until, lead)
+        ) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+
+async def mark_polls_reminded(poll_ids: list[str], reminded_at: float, db_path=None):
+    """Отмечает, что по опросам напоминание уже отправлено."""
+    async with _write(db_path) as db:
+        for i in range(0, len(poll_ids), MAX_QUERY_PARAMS):
+            chunk = poll_ids[i:i + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            await db.execute(
+                f"UPDATE polls SET reminded_at = ? WHERE poll_id IN ({placeholders})",
+                [reminded_at, *chunk]
+            )
+        await db.commit()
+
+
+async def list_poll_voters(poll_ids: list[str], db_path=None) -> list[tuple[str, int]]:
+    """Все голоса в опросах: (poll_id, tg_id) — один запрос на каждые MAX_QUERY_PARAMS опросов."""
+    rows: list[tuple[str, int]] = []
+    async with _read(db_path) as db:
+        for i in range(0, len(poll_ids), MAX_QUERY_PARAMS):
+            chunk = poll_ids[i:i + MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            async with db.execute(
+                f"SELECT poll_id, tg_id FROM poll_votes WHERE poll_id IN ({placeholders})",
+                chunk
+            ) as cursor:
+                rows += [(row[0], row[1]) for row in await cursor.fetchall()]
+    return rows
+
+
+async def list_poll_schedule(db_path=None) -> list[tuple[int, str, int | None, float]]:
+    """Правила расписания опросов: (id, cron, position_id, last_run_at) по id."""
+    async with _read(db_path) as db:
+        async with db.execute(
+            "SELECT id, cron, position_id, last_run_at FROM poll_schedule ORDER BY id"
+        ) as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+
+
+async def add_poll_schedule(cron: str, position_id: int | None, created_at: float, db_path=None) -> int:
+    """Добавляет правило расписания; срабатывания до created_at не догоняются. Возвращает id."""
+    async with _write(db_path) as db:
+        cursor = await db.execute(
+            "INSERT INTO poll_schedule (cron, position_id, last_run_at) VALUES (?, ?, ?)",
+            (cron, position_id, created_at)
+        )
+        await db.commit()
+        return cursor.lastrowid
+
+
+async def delete_poll_schedule(rule_id: int, db_path=None) -> bool:
+    async with _write(db_path) as db:
+        cursor = await db.execute("DELETE FROM poll_schedule WHERE id = ?", (rule_id,))
+        await db.commit()
+        return cursor.rowcount > 0
+
+
+async def claim_schedule_run(rule_id: int, last_run_at: float, run_at: float, db_path=None) -> bool:
+    """
+    Отмечает срабатывание правила в run_at, только если с last_run_at его никто не отметил
+    (compare-and-set). True — срабатывание за вызывающим, False — его уже обработали.
+    """
+    async with _write(db_path) as db:
+        cursor = await db.execute(
+            "UPDATE poll_schedule SET last_run_at = ? WHERE id = ? AND last_run_at = ?",
+            (run_at, rule_id, last_run_at)
+        )
+        await db.commit()
+        return cursor.rowcount > 0
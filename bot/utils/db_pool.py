@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiosqlite
+
+
+async def apply_pragmas(db: aiosqlite.Connection, pragmas: dict):
+    """Применяет к соединению набор PRAGMA вида {"journal_mode": "WAL", ...}."""
+    for name, value in pragmas.items():
+        async with db.execute(f"PRAGMA {name} = {value}"):
+            pass
+
+
+class ConnectionPool:
+    """
+    Пул долгоживущих соединений aiosqlite к одному файлу БД.
+
+    - readers — ограниченный набор соединений для чтения (SELECT),
+      выдаются через очередь, при нехватке запрос ждёт освобождения
+    - writer — единственное соединение для записи, доступ к нему
+      сериализуется через asyncio.Lock (SQLite всё равно допускает одного писателя)
+
+    Пул собирает метрики: размер, число занятых соединений и время ожидания.
+    """
+
+    def __init__(self, db_path, readers: int = 4, pragmas: dict | None = None, on_connect=None):
+        """
+        pragmas — PRAGMA для каждого соединения (см. DB_PRAGMA_PROFILES в config.py)
+        on_connect — необязательная корутина `async def (db)`, вызывается
+        для каждого нового соединения пула (трассировка, доп. настройки и т.п.)
+        """
+        if readers < 1:
+            raise ValueError("Пулу нужно хотя бы одно соединение для чтения")
+        self.db_path = Path(db_path).resolve()
+        self.size = readers
+        self._pragmas = pragmas or {}
+        self._on_connect = on_connect
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._all_readers: list[aiosqlite.Connection] = []
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._closed = True
+
+        # Метрики
+        self._reads = 0
+        self._writes = 0
+        self._read_wait_total = 0.0
+        self._read_wait_max = 0.0
+        self._write_wait_total = 0.0
+        self._write_wait_max = 0.0
+
+    async def _connect(self, read_only: bool = False) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path)
+        await apply_pragmas(db, self._pragmas)
+        if self._on_connect is not None:
+            await self._on_connect(db)
+        if read_only:
+            await db.execute("PRAGMA query_only = ON")
+        return db
+
+    async def open(self):
+        """Открывает все соединения пула."""
+        if not self._closed:
+            return
+        # Писатель открывается первым: он переводит файл в нужный journal_mode
+        self._writer = await self._connect()
+        for _ in range(self.size):
+            db = await self._connect(read_only=True)
+            self._all_readers.append(db)
+            self._readers.put_nowait(db)
+        self._closed = False
+        logging.info(f"[db_pool] Открыт пул {self.db_path}: readers={self.size}, writer=1")
+
+    async def close(self):
+        """Закрывает все соединения пула (дожидается окончания текущей записи)."""
+        if self._closed:
+            return
+        self._closed = True
+        async with self._write_lock:
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+        for db in self._all_readers:
+            await db.close()
+        self._all_readers.clear()
+        self._readers = asyncio.Queue()
+        logging.info(f"[db_pool] Пул закрыт, статистика: {self.stats()}")
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def serves(self, db_path) -> bool:
+        """Проверяет, что пул открыт и обслуживает указанный файл БД."""
+        return not self._closed and Path(db_path).resolve() == self.db_path
+
+    @asynccontextmanager
+    async def reader(self):
+        """Выдаёт соединение для чтения, по выходу возвращает его в пул."""
+        started = time.perf_counter()
+        db = await self._readers.get()
+        waited = time.perf_counter() - started
+        self._reads += 1
+        self._read_wait_total += waited
+        self._read_wait_max = max(self._read_wait_max, waited)
+        try:
+            yield db
+        finally:
+            db.row_factory = None
+            self._readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self):
+        """
+        Выдаёт единственное соединение для записи.
+        Если внутри блока возникло исключение — незафиксированные изменения откатываются.
+        """
+        started = time.perf_counter()
+        async with self._write_lock:
+            waited = time.perf_counter() - started
+            self._writes += 1
+            self._write_wait_total += waited
+            self._write_wait_max = max(self._write_wait_max, waited)
+            db = self._writer
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
+            finally:
+                db.row_factory = None
+
+    def stats(self) -> dict:
+        """Текущие метрики пула (время — в миллисекундах)."""
+        return {
+            "size": self.size,
+            "idle": self._readers.qsize(),
+            "in_use": self.size - self._readers.qsize() if not self._closed else 0,
+            "writer_busy": self._write_lock.locked(),
+            "reads": self._reads,
+            "writes": self._writes,
+            "read_wait_avg_ms": self._read_wait_total / self._reads * 1000 if self._reads else 0.0,
+            "read_wait_max_ms": self._read_wait_max * 1000,
+            "write_wait_avg_ms": self._write_wait_total / self._writes * 1000 if self._writes else 0.0,
+            "write_wait_max_ms": self._write_wait_max * 1000,
+        }
+
+
+_pool: ConnectionPool | None = None
+
+
+async def init_pool(db_path, readers: int = 4, pragmas: dict | None = None, on_connect=None) -> ConnectionPool:
+    """Создаёт и открывает глобальный пул (вызывается на старте бота)."""
+    global _pool
+    if _pool is not None and not _pool.closed:
+        await _pool.close()
+    _pool = ConnectionPool(db_path, readers=readers, pragmas=pragmas, on_connect=on_connect)
+    await _pool.open()
+    return _pool
+
+
+async def close_pool():
+    """Закрывает глобальный пул (вызывается при остановке бота)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_pool() -> ConnectionPool | None:
+    return _pool
+
+
+def get_pool_stats() -> dict | None:
+    """Метрики глобального пула или None, если пул не создан."""
+    return _pool.stats() if _pool is not None else None
@@ -1,5 +1,10 @@
+from functools import wraps
+from typing import Callable
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 
+from bot.utils.callbacks import PollChatCallback, UpdateCallback
+
 CANCEL_KEYBOARD = InlineKeyboardMarkup(
     inline_keyboard=[
         [InlineKeyboardButton(text="Отмена", callback_data="cancel")]
@@ -16,7 +21,137 @@ SKIP_KEYBOARD = keyboard = InlineKeyboardMarkup(
 # Inline-кнопки для подтверждения/отката
 EDIT_FIELD_INLINE = InlineKeyboardMarkup(
     inline_keyboard=[
-        [InlineKeyboardButton(text="💾 Сохранить", callback_data="save")],
-        [InlineKeyboardButton(text="⬅️ Назад", callback_data="back")]
+        [InlineKeyboardButton(text="💾 Сохранить", callback_data=UpdateCallback(action="ok").pack())],
+        [InlineKeyboardButton(text="⬅️ Назад", callback_data=UpdateCallback(action="bk").pack())]
+    ]
+)
+
+# Выбор роли при добавлении игрока
+ROLE_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="Только игрок", callback_data="role:player")],
+        [InlineKeyboardButton(text="Только тренер", callback_data="role:coach")],
+        [InlineKeyboardButton(text="Игрок + тренер", callback_data="role:both")],
+        [InlineKeyboardButton(text="Отмена", callback_data="cancel")]
+    ]
+)
+
+# Подтверждение добавления игрока / создания опроса
+CONFIRM_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="✅ Подтвердить", callback_data="confirm:yes"),
+            InlineKeyboardButton(text="❌ Отменить", callback_data="confirm:no")
+        ]
+    ]
+)
+
+# Уведомлять ли игроков о новом опросе
+NOTIFY_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="Да", callback_data="notify:yes")],
+        [InlineKeyboardButton(text="Нет", callback_data="notify:no")],
+        [InlineKeyboardButton(text="Отмена", callback_data="cancel")]
+    ]
+)
+
+# Выбор поля для редактирования (/update)
+FIELD_MENU_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="✏️ Имя", callback_data=UpdateCallback(action="f", value="name").pack()),
+         InlineKeyboardButton(text="✏️ Фамилия", callback_data=UpdateCallback(action="f", value="surname").pack())],
+        [InlineKeyboardButton(text="✏️ Отчество", callback_data=UpdateCallback(action="f", value="middlename").pack()),
+         InlineKeyboardButton(text="🔢 Номер", callback_data=UpdateCallback(action="f", value="number").pack())],
+        [InlineKeyboardButton(text="👤 TG username", callback_data=UpdateCallback(action="f", value="tg_username").pack()),
+         InlineKeyboardButton(text="🧭 Позиция", callback_data=UpdateCallback(action="f", value="position").pack())],
+        [InlineKeyboardButton(text="🚦 Статус", callback_data=UpdateCallback(action="f", value="status").pack())],
+        [InlineKeyboardButton(text="❌ Отмена", callback_data=UpdateCallback(action="x").pack())]
+    ]
+)
+
+STATUS_KEYBOARD = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="✅ В строю", callback_data=UpdateCallback(action="s", value="active").pack()),
+            InlineKeyboardButton(text="💤 В запасе", callback_data=UpdateCallback(action="s", value="inactive").pack()),
+            InlineKeyboardButton(text="🤕 Травма", callback_data=UpdateCallback(action="s", value="injured").pack())
+        ],
+        [
+            InlineKeyboardButton(text="⬅️ Назад", callback_data=UpdateCallback(action="bk").pack())
+        ]
     ]
 )
+
+
+# --- Клавиатуры из справочников ---
+
+def build_positions_keyboard(positions) -> InlineKeyboardMarkup:
+    """Выбор позиции при добавлении игрока: по одной в ряд + «Отмена»."""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+                            [InlineKeyboardButton(text=name, callback_data=f"position:{pos_id}")]
+                            for pos_id, name in positions
+                        ] + [[InlineKeyboardButton(text="Отмена", callback_data="cancel")]]
+    )
+
+
+def build_position_edit_keyboard(positions) -> InlineKeyboardMarkup:
+    """Смена позиции в /update: по 2 кнопки в ряд + «Назад»."""
+    buttons = [
+        InlineKeyboardButton(text=name, callback_data=UpdateCallback(action="p", value=str(pos_id)).pack())
+        for pos_id, name in positions
+    ]
+    inline_keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+    inline_keyboard.append([InlineKeyboardButton(text="⬅️ Назад", callback_data=UpdateCallback(action="bk").pack())])
+    return InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+
+
+def build_chats_keyboard(chats, version: int = 0) -> InlineKeyboardMarkup:
+    """Выбор чата для опроса + «Отмена»; в кнопке — только номер чата в списке и версия справочников."""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+                            [InlineKeyboardButton(
+                                text=name,
+                                callback_data=PollChatCallback(index=index, version=version).pack()
+                            )]
+                            for index, (chat_id, thread_id, name) in enumerate(chats)
+                        ] + [[InlineKeyboardButton(text="Отмена", callback_data="cancel")]]
+    )
+
+
+def memoize_by_version(build: Callable) -> Callable:
+    """
+    Кэширует клавиатуру, построенную из ReferenceData, до смены reference.version
+    (перезагрузки справочников). Хранится одна — последняя — версия; сверяется
+    и сам объект справочников, чтобы ReferenceData, собранные вручную (тесты)
+    с одинаковой версией, не получили чужую клавиатуру.
+    """
+    cache: dict[int, tuple] = {}
+
+    @wraps(build)
+    def wrapper(reference) -> InlineKeyboardMarkup:
+        cached = cache.get(reference.version)
+        if cached is not None and cached[0] is reference:
+            return cached[1]
+        keyboard = build(reference)
+        cache.clear()
+        cache[reference.version] = (reference, keyboard)
+        return keyboard
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+@memoize_by_version
+def positions_keyboard(reference) -> InlineKeyboardMarkup:
+    return build_positions_keyboard(reference.positions)
+
+
+@memoize_by_version
+def position_edit_keyboard(reference) -> InlineKeyboardMarkup:
+    return build_position_edit_keyboard(reference.positions)
+
+
+@memoize_by_version
+def chats_keyboard(reference) -> InlineKeyboardMarkup:
+    return build_chats_keyboard(reference.chats, reference.version)
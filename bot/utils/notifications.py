@@ -1,44 +1,83 @@
-from bot.config import DB_PATH
-from bot.utils.db import list_players
+import html
 
-async def build_players_mention_list(
-        position: str | None = None,
-        db_path=DB_PATH
-) -> list[str]:
+from bot.utils.db import list_mention_targets, on_roster_change
+from bot.utils.sender import get_sender
+from bot.utils.text_chunks import MAX_MESSAGE_ENTITIES, pack_parts
+
+MENTIONS_PREFIX = "Новый опрос! "
+
+# Кэш готовых упоминаний по позиции (None — все активные игроки).
+# Сбрасывается при любом изменении состава через db.py.
+_mention_cache: dict[str | None, list[str]] = {}
+on_roster_change(_mention_cache.clear)
+# Тот же кэш, но с tg_id: позиция -> {tg_id: упоминание} (для сравнения с проголосовавшими)
+_voter_cache: dict[str | None, dict[int, str]] = {}
+on_roster_change(_voter_cache.clear)
+
+
+def render_mention(player: dict) -> str:
     """
-    Формирует список упоминаний игроков.
-    - Если указан `position`, фильтрует по позиции.
+    Упоминание одного игрока:
     - Если есть tg_username — упоминание через @username.
     - Если нет username, но есть tg_id — упоминание через tg://user?id=.
     - Если нет и tg_id — вывод 'Имя Фамилия'.
     """
-    players = await list_players(
-        db_path=db_path,
-        only_active=True
-    )
-    mentions: list[str] = []
+    username = player.get("tg_username")
+    tg_id = player.get("tg_id")
+    full_name = f"{player.get('name') or ''} {player.get('surname') or ''}".strip()
 
-    for p in players:
-        if position and p.get("position") != position:
-            continue
+    if username:
+        return f"@{username}"
+    if tg_id:
+        # HTML-формат упоминания по ID
+        return f'<a href="tg://user?id={tg_id}">{html.escape(full_name)}</a>'
+    return html.escape(full_name)
 
-        username = p.get("tg_username")
-        tg_id = p.get("tg_id")
-        name = p.get("name", "")
-        surname = p.get("surname", "")
-        full_name = f"{name} {surname}".strip()
 
-        if username:
-            mentions.append(f"@{username}")
+async def build_players_mention_list(
+        position: str | None = None,
+        db_path=None
+) -> list[str]:
+    """
+    Формирует список упоминаний активных игроков.
+    - Если указан `position`, берёт только игроков этой позиции (фильтр в SQL).
+    - Результат кэшируется по позиции до следующего изменения состава.
+    """
+    if db_path is None and position in _mention_cache:
+        return list(_mention_cache[position])
+
+    players = await list_mention_targets(position=position, status="active", db_path=db_path)
+    mentions = [render_mention(p) for p in players]
 
-        elif tg_id:
-            # HTML-формат упоминания по ID
-            mentions.append(f'<a href="tg://user?id={tg_id}">{full_name}</a>')
+    if db_path is None:
+        _mention_cache[position] = mentions
+    return list(mentions)
 
-        else:
-            mentions.append(full_name)
 
-    return mentions
+async def build_voter_mentions(position: str | None = None) -> dict[int, str]:
+    """
+    Упоминания активных игроков с tg_id: {tg_id: упоминание} в порядке состава.
+    Игроки без tg_id не могут проголосовать, поэтому сюда не попадают.
+    Кэшируется по позиции до следующего изменения состава.
+    """
+    if position not in _voter_cache:
+        players = await list_mention_targets(position=position, status="active")
+        _voter_cache[position] = {p["tg_id"]: render_mention(p) for p in players if p["tg_id"]}
+    return _voter_cache[position]
+
+
+def pack_mentions(
+        mentions: list[str],
+        batch_size: int | None = None,
+        prefix: str = MENTIONS_PREFIX
+) -> list[str]:
+    """
+    Раскладывает упоминания по минимальному числу сообщений:
+    каждое заполняется до лимита длины Telegram и лимита сущностей.
+    batch_size — дополнительное ограничение числа упоминаний в сообщении.
+    """
+    max_parts = min(batch_size, MAX_MESSAGE_ENTITIES) if batch_size else MAX_MESSAGE_ENTITIES
+    return pack_parts(mentions, prefix=prefix, sep=" ", max_parts=max_parts)
 
 
 async def send_mentions_in_batches(
@@ -46,15 +85,38 @@ async def send_mentions_in_batches(
         chat_id: int,
         thread_id: int | None,
         mentions: list[str],
-        batch_size: int = 8
+        batch_size: int | None = None
 ):
-    for i in range(0, len(mentions), batch_size):
-        chunk = mentions[i:i + batch_size]
-        text = "Новый опрос! " + " ".join(chunk)
-
-        await bot.send_message(
-            chat_id=chat_id,
-            message_thread_id=thread_id,
-            text=text,
-            parse_mode="HTML"   # обязательно для упоминаний через tg_id
-        )
+    """
+    Отправляет упоминания в один чат минимальным числом сообщений.
+    Отправка идёт через общий MessageSender: с учётом лимитов Telegram и повтором после 429.
+    """
+    await broadcast_mentions(bot, [(chat_id, thread_id, mentions)], batch_size=batch_size)
+
+
+async def broadcast_mentions(
+        bot,
+        targets: list[tuple[int, int | None, list[str]]],
+        batch_size: int | None = None,
+        prefix: str = MENTIONS_PREFIX
+) -> list[Exception | None]:
+    """
+    Рассылает упоминания сразу в несколько чатов.
+    targets — список (chat_id, thread_id, mentions); разные чаты обслуживаются параллельно.
+    Возвращает по каждому target ошибку отправки или None, если все его сообщения ушли.
+    """
+    messages, owners = [], []
+    for n, (chat_id, thread_id, mentions) in enumerate(targets):
+        for text in pack_mentions(mentions, batch_size, prefix):
+            messages.append((chat_id, thread_id, text))
+            owners.append(n)
+
+    results = await get_sender(bot).broadcast(
+        messages,
+        parse_mode="HTML"   # обязательно для упоминаний через tg_id
+    )
+    errors: list[Exception | None] = [None] * len(targets)
+    for n, result in zip(owners, results):
+        if isinstance(result, Exception) and errors[n] is None:
+            errors[n] = result
+    return errors
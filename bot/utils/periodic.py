@@ -0,0 +1,41 @@
+"""
+Фоновые задачи бота, которые повторяются с фиксированным интервалом
+(опросы по расписанию, напоминания).
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+
+class PeriodicJob:
+    """
+    Фоновая задача: сразу после start(bot) и затем раз в `interval` секунд вызывает job(bot).
+    Ошибка одного запуска логируется и не останавливает следующие.
+    """
+
+    def __init__(self, name: str, job: Callable[..., Awaitable], interval: float):
+        self.name = name
+        self.job = job
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self, bot):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(bot))
+
+    async def _run(self, bot):
+        while True:
+            try:
+                await self.job(bot)
+            except Exception as e:
+                logging.error(f"[{self.name}] Ошибка фоновой задачи: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
@@ -1,32 +1,135 @@
-from datetime import datetime, timedelta
+import logging
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
 MSK = ZoneInfo("Europe/Moscow")
 
-def get_training_poll_question(position: str) -> str:
+# Расписание по умолчанию (0 = ПН ... 6 = ВС): им заполняется таблица trainings
+# при миграции, оно же действует, пока расписание не загружено из БД
+TRAINING_TIMES = {
+    2: (20, 30),  # среда
+    6: (17, 15),  # воскресенье
+}
+# Опрос собирается на тренировку, которая ещё не началась или идёт не дольше этого
+TRAINING_GRACE = timedelta(minutes=30)
+# На сколько дней вперёд заранее считаются тренировки
+CALENDAR_HORIZON_DAYS = 180
+
+WEEKDAY_PHRASES = ["в понедельник", "во вторник", "в среду", "в четверг", "в пятницу", "в субботу", "в воскресенье"]
+
+
+def parse_time(value: str) -> time:
+    """Время "HH:MM" -> time; ValueError — неверный формат."""
+    return datetime.strptime(value, "%H:%M").time()
+
+
+class TrainingCalendar:
+    """
+    Ближайшие тренировки, заранее посчитанные по расписанию на horizon_days вперёд.
+
+    - rules — (weekday, "HH:MM", position_id или None), как get_trainings().
+      Если у позиции есть свои правила, они заменяют общие (position_id = None)
+    - exceptions — ("YYYY-MM-DD", position_id или None, "HH:MM" или None), как get_training_exceptions():
+      в этот день тренировки позиции (None — всех) отменяются, а если указано время — переносятся на него
+    - sessions — позиция (None — общее расписание) -> отсортированные времена начала (unix time);
+      ближайшая тренировка ищется бинарным поиском
+    """
+
+    def __init__(self, rules, exceptions=(), start: date | None = None, horizon_days: int = CALENDAR_HORIZON_DAYS):
+        self.rules = [(weekday, at, position_id) for weekday, at, position_id in rules if self._valid(at)]
+        self.exceptions = [
+            (date.fromisoformat(day), position_id, at)
+            for day, position_id, at in exceptions
+            if at is None or self._valid(at)
+        ]
+        self.horizon_days = horizon_days
+        self._fill(start or datetime.now(MSK).date())
+
+    @staticmethod
+    def _valid(at: str) -> bool:
+        try:
+            parse_time(at)
+        except (TypeError, ValueError):
+            logging.warning(f"[poll_question] Пропущено время тренировки в неверном формате: {at!r}")
+            return False
+        return True
+
+    @classmethod
+    def default(cls) -> "TrainingCalendar":
+        """Календарь по TRAINING_TIMES."""
+        return cls([(weekday, f"{hour:02d}:{minute:02d}", None) for weekday, (hour, minute) in TRAINING_TIMES.items()])
+
+    def _fill(self, start: date):
+        self.start = start
+        self.end = start + timedelta(days=self.horizon_days)
+        positions = {p for _, _, p in self.rules if p is not None} | {p for _, p, _ in self.exceptions if p is not None}
+        self.sessions = {position_id: self._sessions(position_id) for position_id in [None, *positions]}
+
+    def _sessions(self, position_id: int | None) -> list[float]:
+        weekly = [(weekday, at) for weekday, at, p in self.rules if p == position_id]
+        if not weekly and position_id is not None:
+            weekly = [(weekday, at) for weekday, at, p in self.rules if p is None]
+        by_weekday: dict[int, list[str]] = {}
+        for weekday, at in weekly:
+            by_weekday.setdefault(weekday, []).append(at)
+
+        overrides: dict[date, list[str]] = {}
+        for day, p, at in self.exceptions:
+            if self.start <= day < self.end and p in (None, position_id):
+                overrides.setdefault(day, []).extend([at] if at else [])
+
+        times = []
+        day = self.start
+        while day < self.end:
+            day_times = overrides[day] if day in overrides else by_weekday.get(day.weekday(), ())
+            times += [datetime.combine(day, parse_time(at), MSK).timestamp() for at in day_times]
+            day += timedelta(days=1)
+        return sorted(set(times))
+
+    def next_session(self, position_id: int | None = None, now: datetime | None = None) -> datetime | None:
+        """Ближайшая тренировка позиции после `now` (с учётом TRAINING_GRACE); None — тренировок нет."""
+        after = (now or datetime.now(MSK)).astimezone(MSK) - TRAINING_GRACE
+        if not self.start <= after.date() < self.end:
+            # Запрос вне посчитанного окна — пересчитываем окно от этого дня
+            self._fill(after.date())
+        times = self.sessions.get(position_id, self.sessions[None])
+        index = bisect_right(times, after.timestamp())
+        if index == len(times) and after.date() != self.start:
+            self._fill(after.date())
+            times = self.sessions.get(position_id, self.sessions[None])
+            index = bisect_right(times, after.timestamp())
+        return datetime.fromtimestamp(times[index], MSK) if index < len(times) else None
+
+
+_default_calendar: TrainingCalendar | None = None
+
+
+def next_training(
+        now: datetime | None = None,
+        position_id: int | None = None,
+        calendar: TrainingCalendar | None = None
+) -> datetime | None:
+    """
+    Дата и время ближайшей тренировки (МСК), на которую собирается опрос.
+    calendar — расписание из БД (ReferenceData.calendar); по умолчанию — TRAINING_TIMES.
+    """
+    global _default_calendar
+    if calendar is None:
+        if _default_calendar is None:
+            _default_calendar = TrainingCalendar.default()
+        calendar = _default_calendar
+    return calendar.next_session(position_id, now)
+
+
+def get_training_poll_question(position: str, training: datetime) -> str:
     """
-    Формирует вопрос динамического опроса по логике тренировки.
+    Формирует вопрос опроса на тренировку.
 
     position – OL, QB, WR и т.д. (для подстановки в вопрос)
+    training – тренировка из next_training() / TrainingCalendar.next_session();
+    если тренировок нет (None), опрос не собирается — это решает вызывающий код
     """
-    now = datetime.now(MSK)
-    weekday = now.weekday()  # 0 = ПН ... 6 = ВС
-    hour = now.hour
-
-    # Определяем ближайшую тренировку
-    if (weekday == 6 and hour >= 18) or (weekday in [0, 1]) or (weekday == 2 and hour < 21):
-        # Следующая тренировка — среда 18:00
-        next_training_weekday = 2  # среда
-    else:
-        # Следующая тренировка — воскресенье 18:00
-        next_training_weekday = 6  # воскресенье
-
-    # Вычисляем дату ближайшей тренировки
-    days_ahead = (next_training_weekday - weekday) % 7
-    training_date = now + timedelta(days=days_ahead)
-    training_date_str = training_date.strftime("%d.%m.%Y")
-
-    if next_training_weekday == 2:
-        return f"Тренировка в среду {training_date_str} в 20:30 {position}"
-    else:
-        return f"Тренировка в воскресенье {training_date_str} в 17:15 {position}"
+    training_date_str = training.strftime("%d.%m.%Y")
+    training_time_str = training.strftime("%H:%M")
+    return f"Тренировка {WEEKDAY_PHRASES[training.weekday()]} {training_date_str} в {training_time_str} {position}"
@@ -0,0 +1,167 @@
+"""
+Автоматическая рассылка опросов на тренировки по расписанию (таблица poll_schedule).
+
+Правило — cron-выражение "минута час день месяц день_недели" по МСК и позиция
+(или все позиции с чатами). Раз в SCHEDULE_CHECK_INTERVAL секунд планировщик
+находит для каждого правила последнее наступившее срабатывание после last_run_at:
+- правило «забирается» compare-and-set по last_run_at, и опрос уходит только
+  у того, кто его забрал, — без повторной отправки;
+- после перезапуска пропущенное срабатывание догоняется, если опоздание
+  не больше SCHEDULE_CATCHUP_HOURS; более старые не отправляются.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from bot.config import SCHEDULE_CATCHUP_HOURS, SCHEDULE_CHECK_INTERVAL
+from bot.utils.db import claim_schedule_run, list_poll_schedule
+from bot.utils.periodic import PeriodicJob
+from bot.utils.poll_question import MSK
+from bot.utils.reference_data import get_reference_data
+from bot.utils.training_polls import send_training_polls
+
+# Допустимые значения полей cron: минута, час, день месяца, месяц, день недели (0 и 7 — воскресенье)
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+# Сколько дней вперёд искать срабатывание: правило на 29 февраля срабатывает раз в 4 года
+MAX_LOOKAHEAD_DAYS = 366 * 4 + 1
+
+
+def parse_cron_field(field: str, low: int, high: int) -> tuple[int, ...]:
+    """Поле cron (*, 5, 1-5, */15, 1-10/2, списки через запятую) -> отсортированные значения."""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_raw = part.split("/", 1)
+            step = int(step_raw)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step != 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Значение вне диапазона {low}-{high}: {field}")
+        values.update(range(start, end + 1, step))
+    return tuple(sorted(values))
+
+
+@dataclass(frozen=True)
+class CronRule:
+    expr: str
+    minutes: tuple[int, ...]
+    hours: tuple[int, ...]
+    days: tuple[int, ...]
+    months: tuple[int, ...]
+    weekdays: tuple[int, ...]  # 0 = ВС ... 6 = СБ, как в cron
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, expr: str) -> "CronRule":
+        """Разбирает "минута час день месяц день_недели"; ValueError — выражение некорректно."""
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError("Нужно 5 полей: минута час день месяц день_недели")
+        try:
+            minutes, hours, days, months, weekdays = (
+                parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)
+            )
+        except ValueError as e:
+            raise ValueError(f"Некорректное cron-выражение «{expr}»: {e}") from None
+        return cls(
+            expr=" ".join(fields),
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            weekdays=tuple(sorted({day % 7 for day in weekdays})),
+            any_day=fields[2] == "*",
+            any_weekday=fields[4] == "*",
+        )
+
+    def matches_day(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        by_day = day.day in self.days
+        by_weekday = (day.weekday() + 1) % 7 in self.weekdays
+        # Как в cron: если заданы и день месяца, и день недели, достаточно любого из них
+        if self.any_day:
+            return by_weekday
+        if self.any_weekday:
+            return by_day
+        return by_day or by_weekday
+
+    def next_after(self, after: datetime) -> datetime | None:
+        """Первое срабатывание строго после `after` (МСК); None — правило никогда не сработает."""
+        after = after.astimezone(MSK)
+        day = after.date()
+        for _ in range(MAX_LOOKAHEAD_DAYS):
+            if self.matches_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        moment = datetime(day.year, day.month, day.day, hour, minute, tzinfo=MSK)
+                        if moment > after:
+                            return moment
+            day += timedelta(days=1)
+        return None
+
+    def last_fire(self, after: float, now: float) -> datetime | None:
+        """Последнее срабатывание в (after, now] или None, если срабатываний не было."""
+        moment = self.next_after(datetime.fromtimestamp(after, MSK))
+        last = None
+        while moment is not None and moment.timestamp() <= now:
+            last = moment
+            moment = self.next_after(moment)
+        return last
+
+
+async def run_schedule_rule(bot, rule_id: int, expr: str, position_id: int | None, last_run_at: float, now: float) -> bool:
+    """Отправляет опросы по правилу, если наступило его срабатывание. True — правило сработало."""
+    rule = CronRule.parse(expr)
+    # Срабатывания старше окна догона не отправляются — и не перебираются
+    fire = rule.last_fire(max(last_run_at, now - SCHEDULE_CATCHUP_HOURS * 3600), now)
+    if fire is None:
+        return False
+    # Срабатывание уже обработал другой экземпляр бота (или предыдущая проверка)
+    if not await claim_schedule_run(rule_id, last_run_at, fire.timestamp()):
+        return False
+
+    reference = await get_reference_data()
+    if position_id is None:
+        topics = [name for _, name in reference.positions if reference.chats_for(name)]
+    else:
+        topics = [reference.position_names[position_id]] if position_id in reference.position_names else []
+
+    # Опрос — на ближайшую тренировку после момента срабатывания, даже если догоняем с опозданием.
+    # Срабатывание уже забрано: сбой одной позиции не должен отменять опросы остальных
+    results = await asyncio.gather(
+        *(send_training_polls(bot, topic, now=fire) for topic in topics),
+        return_exceptions=True
+    )
+    for topic, result in zip(topics, results):
+        if isinstance(result, Exception):
+            logging.error(f"[poll_scheduler] Правило #{rule_id}: не удалось отправить опрос {topic}: {result}")
+    logging.info(f"[poll_scheduler] Правило #{rule_id} ({expr}): опросы для {', '.join(topics) or '—'}")
+    return True
+
+
+async def run_due_schedules(bot, now: float | None = None) -> int:
+    """Отправляет опросы по всем наступившим срабатываниям правил. Возвращает число сработавших правил."""
+    now = time.time() if now is None else now
+    fired = 0
+    for rule_id, expr, position_id, last_run_at in await list_poll_schedule():
+        # Ошибка в одном правиле не должна задерживать остальные
+        try:
+            fired += await run_schedule_rule(bot, rule_id, expr, position_id, last_run_at, now)
+        except Exception as e:
+            logging.error(f"[poll_scheduler] Правило #{rule_id}: {e}")
+    return fired
+
+
+# Общий планировщик бота; запускается в on_startup, останавливается в on_shutdown.
+# Первая проверка — сразу после старта: догоняем пропущенное за время простоя
+poll_scheduler = PeriodicJob("poll_scheduler", run_due_schedules, SCHEDULE_CHECK_INTERVAL)
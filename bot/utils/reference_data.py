@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from bot.utils import db as db_module
+from bot.utils.db import get_all_chats, get_position_chats, get_positions, get_training_exceptions, get_trainings
+from bot.utils.poll_question import MSK, TrainingCalendar
+
+
+def parse_thread_id(raw) -> int | None:
+    """thread_id чата из БД (число, строка, '' или NULL) -> номер темы или None (без темы)."""
+    return int(raw) if str(raw).isdigit() else None
+
+
+@dataclass
+class ReferenceData:
+    """
+    Справочники, которые почти не меняются: позиции, чаты для опросов и расписание тренировок.
+
+    - positions — [(id, название)] в порядке id, как get_positions()
+    - position_names — id -> название
+    - position_ids — НАЗВАНИЕ (в верхнем регистре) -> id
+    - chats — [(chat_id, thread_id, chat_name)] в порядке id, как get_all_chats()
+    - routes — таблица маршрутов: НАЗВАНИЕ позиции (в верхнем регистре) ->
+      [(chat_id, thread_id)], у позиции может быть несколько целевых чатов
+    - calendar — ближайшие тренировки по таблицам trainings / training_exceptions
+    - version — растёт при каждой перезагрузке (ключ для кэшей клавиатур)
+    """
+    positions: list[tuple[int, str]] = field(default_factory=list)
+    chats: list[tuple] = field(default_factory=list)
+    routes: dict[str, list[tuple]] = field(default_factory=dict)
+    calendar: TrainingCalendar = field(default_factory=TrainingCalendar.default)
+    version: int = 0
+    position_names: dict[int, str] = field(init=False)
+    position_ids: dict[str, int] = field(init=False)
+
+    def __post_init__(self):
+        self.position_names = {pid: name for pid, name in self.positions}
+        self.position_ids = {name.upper(): pid for pid, name in self.positions}
+
+    def position_name(self, raw: str | None) -> str | None:
+        """Название позиции из БД по введённому пользователем (без учёта регистра) или None."""
+        if not raw:
+            return None
+        position_id = self.position_ids.get(raw.strip().upper())
+        return self.position_names.get(position_id)
+
+    def chats_for(self, position: str | None) -> list[tuple]:
+        """Все (chat_id, thread_id) для позиции (без учёта регистра); пустой список, если чатов нет."""
+        if not position:
+            return []
+        return self.routes.get(position.strip().upper(), [])
+
+
+# Загруженные справочники; _loaded — были ли они уже прочитаны из БД
+_reference = ReferenceData()
+_loaded = False
+_lock = asyncio.Lock()
+
+
+async def load_reference_data(db_path=None) -> ReferenceData:
+    """Читает справочники из БД (вызывается на старте бота и при /reload)."""
+    global _reference, _loaded
+    path = str(db_path or db_module.DB_PATH)
+
+    positions = await get_positions(path)
+    chats = await get_all_chats(path)
+    # Исключения за прошедшую неделю — для опросов, которые догоняются после простоя
+    since = (datetime.now(MSK) - timedelta(days=7)).date().isoformat()
+    calendar = TrainingCalendar(await get_trainings(path), await get_training_exceptions(since, path))
+
+    # Таблица маршрутов строится одним JOIN chats + positions
+    routes: dict[str, list[tuple]] = {}
+    for position, chat_id, thread_id in await get_position_chats(path):
+        routes.setdefault(position.upper(), []).append((chat_id, thread_id))
+
+    _reference = ReferenceData(
+        positions=list(positions),
+        chats=chats,
+        routes=routes,
+        calendar=calendar,
+        version=_reference.version + 1,
+    )
+    _loaded = True
+    logging.info(
+        f"[reference_data] Загружено позиций: {len(positions)}, чатов: {len(chats)}, "
+        f"тренировок в неделю: {len(calendar.rules)}"
+    )
+    return _reference
+
+
+async def get_reference_data() -> ReferenceData:
+    """Справочники из памяти; при первом обращении они загружаются."""
+    if not _loaded:
+        async with _lock:
+            if not _loaded:
+                await load_reference_data()
+    return _reference
+
+
+async def reload_reference_data() -> ReferenceData:
+    """
+    Перечитывает справочники после правки positions / chats администратором.
+    Названия позиций входят в готовые списки состава, поэтому их кэши тоже сбрасываются.
+    """
+    async with _lock:
+        reference = await load_reference_data()
+    db_module.notify_roster_changed()
+    return reference
@@ -0,0 +1,92 @@
+"""
+Напоминания тем, кто не ответил на опрос о тренировке.
+
+За REMINDER_HOURS_BEFORE часов до тренировки бот берёт её опросы (по одному
+на каждый чат позиции) и считает не ответивших как разность множеств:
+(активные игроки позиции) − (проголосовавшие хотя бы в одном из опросов).
+Состав позиции берётся из кэша упоминаний, голоса — одним запросом к poll_votes
+плюс ещё не записанные голоса VoteWriter. Упоминания уходят в чаты опросов
+через общий MessageSender.
+"""
+import logging
+import time
+
+from bot.config import REMINDER_CHECK_INTERVAL, REMINDER_HOURS_BEFORE
+from bot.utils.db import list_due_reminders, list_poll_voters, mark_polls_reminded
+from bot.utils.notifications import broadcast_mentions, build_voter_mentions
+from bot.utils.periodic import PeriodicJob
+from bot.utils.reference_data import get_reference_data, parse_thread_id
+from bot.utils.vote_writer import VoteWriter, vote_writer
+
+REMINDER_PREFIX = "⏰ Скоро тренировка! Ответьте на опрос: "
+
+
+async def collect_voters(poll_ids: list[str], writer: VoteWriter) -> dict[str, set[int]]:
+    """Проголосовавшие в опросах: poll_id -> {tg_id}, с учётом голосов, ещё не записанных в БД."""
+    voters: dict[str, set[int]] = {poll_id: set() for poll_id in poll_ids}
+    for poll_id, tg_id in await list_poll_voters(poll_ids):
+        voters[poll_id].add(tg_id)
+    for poll_id in poll_ids:
+        for tg_id, option_id in writer.pending_votes(poll_id).items():
+            # None — голос отозван, но ещё не удалён из БД
+            if option_id is None:
+                voters[poll_id].discard(tg_id)
+            else:
+                voters[poll_id].add(tg_id)
+    return voters
+
+
+def non_voters(roster: dict[int, str], voters: set[int]) -> list[str]:
+    """Упоминания игроков из roster ({tg_id: упоминание}), которых нет среди voters, в порядке состава."""
+    return [mention for tg_id, mention in roster.items() if tg_id not in voters]
+
+
+async def send_due_reminders(bot, now: float | None = None, writer: VoteWriter | None = None) -> int:
+    """
+    Напоминает о тренировках, до которых осталось не больше REMINDER_HOURS_BEFORE часов.
+    Каждый опрос получает напоминание один раз; опросы, отправленные уже внутри этого окна,
+    не получают его вовсе. Возвращает число упомянутых игроков.
+    """
+    now = time.time() if now is None else now
+    writer = writer or vote_writer
+    lead = REMINDER_HOURS_BEFORE * 3600
+    polls = await list_due_reminders(now, now + lead, lead)
+    if not polls:
+        return 0
+
+    poll_ids = [poll[0] for poll in polls]
+    # Опросы одной тренировки в разных чатах позиции — одна группа голосующих
+    trainings: dict[tuple[int, float], list[tuple]] = {}
+    for poll_id, chat_id, thread_id, position_id, training_at in polls:
+        trainings.setdefault((position_id, training_at), []).append((poll_id, chat_id, parse_thread_id(thread_id)))
+
+    voters = await collect_voters(poll_ids, writer)
+    reference = await get_reference_data()
+
+    targets, target_polls = [], []
+    reminded = 0
+    for (position_id, _), group in trainings.items():
+        position = reference.position_names.get(position_id)
+        if position is None:
+            continue
+        answered = set().union(*(voters[poll_id] for poll_id, _, _ in group))
+        mentions = non_voters(await build_voter_mentions(position), answered)
+        if not mentions:
+            continue
+        reminded += len(mentions)
+        for poll_id, chat_id, thread_id in group:
+            targets.append((chat_id, thread_id, mentions))
+            target_polls.append(poll_id)
+
+    # Отмечаются опросы, напоминание по которым ушло или не понадобилось;
+    # если в чат отправить не удалось, напоминание повторится при следующей проверке
+    failed = set()
+    if targets:
+        errors = await broadcast_mentions(bot, targets, prefix=REMINDER_PREFIX)
+        failed = {poll_id for poll_id, error in zip(target_polls, errors) if error is not None}
+    await mark_polls_reminded([poll_id for poll_id in poll_ids if poll_id not in failed], now)
+    logging.info(f"[reminders] Опросов: {len(polls)}, напомнили игрокам: {reminded}, не удалось: {len(failed)}")
+    return reminded
+
+# Общая задача напоминаний бота; запускается в on_startup, останавливается в on_shutdown
+reminder_job = PeriodicJob("reminders", send_due_reminders, REMINDER_CHECK_INTERVAL)
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from typing import Callable
+
+from bot.utils.role_cache import MISSING
+
+
+class VersionedCache:
+    """
+    LRU-кэш готовых результатов, действительных для одной версии данных.
+
+    - get_version — функция, возвращающая текущую версию (например, db.roster_version)
+    - запись, сохранённая для старой версии, не отдаётся; при смене версии кэш очищается
+    - хранится не больше `maxsize` записей, самые старые по использованию вытесняются
+    - hits / misses — счётчики попаданий и промахов
+    """
+
+    def __init__(self, get_version: Callable[[], int], maxsize: int = 256):
+        self.get_version = get_version
+        self.maxsize = maxsize
+        self._version = get_version()
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _sync(self):
+        version = self.get_version()
+        if version != self._version:
+            self._data.clear()
+            self._version = version
+
+    def get(self, key, default=MISSING):
+        """Возвращает значение для текущей версии или `default`."""
+        self._sync()
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value, version: int):
+        """
+        Сохраняет значение, построенное по данным версии `version`
+        (её нужно взять до чтения из БД). Если данные успели измениться, значение не сохраняется.
+        """
+        self._sync()
+        if version != self._version:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "version": self._version,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
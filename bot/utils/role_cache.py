@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class RoleCache:
+    """
+    In-process кэш ролей пользователей: tg_id -> frozenset ролей (или None,
+    если пользователя нет в команде).
+
+    - TTL: запись живёт не дольше `ttl` секунд
+    - LRU: хранится не больше `maxsize` записей, самые старые по использованию вытесняются
+    - hits / misses — счётчики попаданий и промахов
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[int, tuple[float, frozenset[str] | None]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tg_id: int, default=MISSING):
+        """Возвращает роли из кэша или `default`, если записи нет / она устарела."""
+        entry = self._data.get(tg_id)
+        if entry is not None:
+            expires_at, roles = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(tg_id)
+                self.hits += 1
+                return roles
+            del self._data[tg_id]
+        self.misses += 1
+        return default
+
+    def set(self, tg_id: int, roles: frozenset[str] | None):
+        self._data[tg_id] = (time.monotonic() + self.ttl, roles)
+        self._data.move_to_end(tg_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, *tg_ids: int | None):
+        """Удаляет записи для указанных tg_id (None пропускаются)."""
+        for tg_id in tg_ids:
+            if tg_id is not None:
+                self._data.pop(tg_id, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, tg_id: int) -> bool:
+        return tg_id in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def parse_roles(roles_str: str | None) -> frozenset[str] | None:
+    """'admin, coach' -> frozenset({'admin', 'coach'}); None остаётся None."""
+    if roles_str is None:
+        return None
+    return frozenset(r.strip() for r in roles_str.split(",") if r.strip())
@@ -1,18 +1,22 @@
+import logging
+
 from aiogram.filters import BaseFilter
 from aiogram.types import Message
-from bot.utils.db import get_user_role
+from bot.utils.db import get_user_roles
+from bot.utils.role_cache import MISSING
 
 
 class RoleFilter(BaseFilter):
     def __init__(self, allowed_roles: list[str]):
-        self.allowed_roles = allowed_roles
+        self.allowed_roles = frozenset(allowed_roles)
 
-    async def __call__(self, message: Message) -> bool:
-        roles_str = await get_user_role(message.from_user.id)
-        print(f"[RoleFilter] user_id={message.from_user.id}, roles_str={roles_str}")
-        if not roles_str:
+    async def __call__(self, message: Message, user_roles: frozenset[str] | None = MISSING) -> bool:
+        # Роли обычно уже определены RoleMiddleware; без неё — читаем сами (через кэш)
+        if user_roles is MISSING:
+            user_roles = await get_user_roles(message.from_user.id)
+        logging.debug(f"[RoleFilter] user_id={message.from_user.id}, roles={user_roles}")
+        if not user_roles:
             return False
-        user_roles = [r.strip() for r in roles_str.split(",")]
-        result = any(role in self.allowed_roles for role in user_roles)
-        print(f"[RoleFilter] user_roles={user_roles}, allowed_roles={self.allowed_roles}, pass={result}")
-        return result
\ No newline at end of file
+        result = not self.allowed_roles.isdisjoint(user_roles)
+        logging.debug(f"[RoleFilter] user_roles={user_roles}, allowed_roles={self.allowed_roles}, pass={result}")
+        return result
@@ -0,0 +1,30 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, User
+
+from bot.utils.db import get_user_roles
+
+
+class RoleMiddleware(BaseMiddleware):
+    """
+    Outer-middleware для dp.update: один раз на апдейт определяет роли
+    отправителя и кладёт их в data["user_roles"] (frozenset или None).
+
+    RoleFilter и хендлеры получают роли аргументом `user_roles`
+    и не обращаются к БД повторно.
+    """
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: dict[str, Any]
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+        # Голосам в опросах роли не нужны: не читаем их на каждый голос волны
+        if user is None or event.poll_answer is not None:
+            data["user_roles"] = None
+        else:
+            data["user_roles"] = await get_user_roles(user.id)
+        return await handler(event, data)
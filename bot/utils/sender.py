@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Iterable
+
+from aiogram.exceptions import TelegramRetryAfter
+
+# Лимиты Telegram Bot API (https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this)
+GLOBAL_RATE = 30.0          # сообщений в секунду на бота
+GROUP_RATE = 20.0 / 60.0    # сообщений в секунду в одну группу (20 в минуту)
+GROUP_BURST = 20
+PRIVATE_RATE = 1.0          # сообщений в секунду в личный чат
+PRIVATE_BURST = 1
+MAX_RETRIES = 3
+
+
+class TokenBucket:
+    """
+    Token bucket: `rate` токенов в секунду, не больше `capacity` в запасе.
+    acquire() ждёт, пока появится токен.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic, sleep=asyncio.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self._clock()
+                if now < self._blocked_until:
+                    await self._sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await self._sleep((1 - self._tokens) / self.rate)
+
+    def block(self, seconds: float):
+        """Запрещает выдачу токенов на `seconds` секунд (после ответа 429) и обнуляет запас."""
+        now = self._clock()
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self._tokens = 0
+        self._updated = max(self._updated, now + seconds)
+
+
+class MessageSender:
+    """
+    Отправка сообщений с учётом лимитов Telegram:
+    - общий token bucket на бота и отдельный на каждый чат
+    - при TelegramRetryAfter (429) ждёт `retry_after` и повторяет запрос
+    - при 429 приостанавливаются и чат, и общий лимит бота
+    - сообщения в один чат уходят строго по порядку, в разные чаты — параллельно
+    """
+
+    def __init__(
+            self,
+            bot,
+            global_rate: float = GLOBAL_RATE,
+            max_retries: int = MAX_RETRIES,
+            clock=time.monotonic,
+            sleep=asyncio.sleep
+    ):
+        self.bot = bot
+        self.max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._global = TokenBucket(global_rate, global_rate, clock=clock, sleep=sleep)
+        self._chats: dict[int, TokenBucket] = {}
+        # chat_id -> [замок, число ожидающих и держащих его]; удаляется, когда замок никому не нужен
+        self._chat_locks: dict[int, list] = {}
+        self.sent = 0
+        self.retries = 0
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Отрицательные id — группы и каналы, положительные — личные чаты
+            if chat_id < 0:
+                bucket = TokenBucket(GROUP_RATE, GROUP_BURST, clock=self._clock, sleep=self._sleep)
+            else:
+                bucket = TokenBucket(PRIVATE_RATE, PRIVATE_BURST, clock=self._clock, sleep=self._sleep)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    @asynccontextmanager
+    async def _chat_lock(self, chat_id: int):
+        """Замок чата: запросы в один чат идут по одному, в порядке вызова."""
+        entry = self._chat_locks.get(chat_id)
+        if entry is None:
+            entry = self._chat_locks[chat_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._chat_locks[chat_id]
+
+    async def call(self, chat_id: int, request: Callable[[], Awaitable]):
+        """
+        Выполняет запрос к API (`request` — фабрика корутины, например
+        lambda: bot.send_poll(...)) с учётом лимитов чата и бота.
+        """
+        # chat_id из БД может прийти строкой — лимиты считаем по числовому id
+        key = int(chat_id)
+        bucket = self._chat_bucket(key)
+        async with self._chat_lock(key):
+            attempt = 0
+            while True:
+                await bucket.acquire()
+                await self._global.acquire()
+                try:
+                    result = await request()
+                except TelegramRetryAfter as e:
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise
+                    self.retries += 1
+                    logging.warning(f"[sender] 429 в чате {chat_id}, повтор через {e.retry_after} с")
+                    # Пока действует 429, другие чаты тоже не получают токены
+                    bucket.block(e.retry_after)
+                    self._global.block(e.retry_after)
+                    continue
+                self.sent += 1
+                return result
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        return await self.call(chat_id, lambda: self.bot.send_message(chat_id=chat_id, text=text, **kwargs))
+
+    async def broadcast(self, messages: Iterable[tuple[int, int | None, str]], **kwargs) -> list:
+        """
+        Рассылает сообщения (chat_id, thread_id, text): по порядку внутри чата,
+        параллельно между разными чатами. Возвращает результаты в исходном порядке.
+        Ошибка в чате не прерывает рассылку в другие: она логируется и возвращается
+        вместо результата для этого и оставшихся сообщений чата.
+        """
+        messages = list(messages)
+        by_chat: dict[int, list[int]] = defaultdict(list)
+        for i, (chat_id, _, _) in enumerate(messages):
+            by_chat[int(chat_id)].append(i)
+
+        results: list = [None] * len(messages)
+
+        async def send_chat(indexes: list[int]):
+            for n, i in enumerate(indexes):
+                chat_id, thread_id, text = messages[i]
+                try:
+                    results[i] = await self.send_message(chat_id, text, message_thread_id=thread_id, **kwargs)
+                except Exception as e:
+                    # Бота удалили из чата или кончились повторы после 429 — дальше в этот чат не шлём
+                    logging.error(f"[sender] Не удалось отправить сообщение в чат {chat_id}: {e}")
+                    for rest in indexes[n:]:
+                        results[rest] = e
+                    return
+
+        await asyncio.gather(*(send_chat(indexes) for indexes in by_chat.values()))
+        return results
+
+
+_senders: dict[int, MessageSender] = {}
+
+
+def get_sender(bot) -> MessageSender:
+    """Общий MessageSender для бота: лимиты должны учитываться по всем отправкам сразу."""
+    sender = _senders.get(id(bot))
+    if sender is None or sender.bot is not bot:
+        sender = MessageSender(bot)
+        _senders[id(bot)] = sender
+    return sender
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from bot.utils.db import delete_expired_fsm_records, load_fsm_record, save_fsm_records
+
+
+@dataclass
+class _Record:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    updated_at: float = 0.0
+
+
+def storage_key_to_str(key: StorageKey) -> str:
+    """StorageKey -> строковый ключ для таблицы fsm_states."""
+    return ":".join(
+        "" if part is None else str(part)
+        for part in (key.bot_id, key.chat_id, key.user_id, key.thread_id, key.business_connection_id, key.destiny)
+    )
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM-хранилище aiogram в таблице fsm_states той же БД, что и состав команды.
+
+    - Состояния переживают перезапуск бота (незавершённые /add_player, /poll, /update)
+    - Write-behind: set_state / set_data меняют только память, изменения
+      сбрасываются в БД пачкой раз в `flush_interval` секунд одной транзакцией
+      (flush_interval <= 0 — запись сразу, без отложенного сброса)
+    - Состояния без изменений дольше `ttl` секунд удаляются из памяти и из БД
+      и не отдаются, даже если ещё лежат в памяти
+    - Пустые записи (пользователь без диалога) после сброса в памяти не хранятся
+    """
+
+    def __init__(self, db_path=None, flush_interval: float = 1.0, ttl: float = 24 * 60 * 60):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+        self._records: dict[str, _Record] = {}
+        self._dirty: set[str] = set()
+        self._flusher: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._last_expire = 0.0
+        self.flushes = 0
+
+    def _expired(self, record: _Record) -> bool:
+        has_content = record.state is not None or record.data
+        return bool(has_content) and record.updated_at < time.time() - self.ttl
+
+    async def _record(self, key: StorageKey) -> _Record:
+        skey = storage_key_to_str(key)
+        record = self._records.get(skey)
+        if record is not None and self._expired(record):
+            # Состояние устарело, пока лежало в памяти; из БД его удалит expire()
+            record = self._records[skey] = _Record()
+        if record is None:
+            row = await load_fsm_record(skey, db_path=self.db_path)
+            record = _Record()
+            if row is not None:
+                state, data, updated_at = row
+                if updated_at >= time.time() - self.ttl:
+                    record = _Record(state=state, data=json.loads(data), updated_at=updated_at)
+            # Пока читали из БД, запись могла появиться из параллельного апдейта
+            record = self._records.setdefault(skey, record)
+        return record
+
+    async def _touch(self, key: StorageKey, record: _Record):
+        record.updated_at = time.time()
+        skey = storage_key_to_str(key)
+        self._records[skey] = record
+        self._dirty.add(skey)
+        if self.flush_interval <= 0:
+            await self.flush()
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._record(key)
+        record.state = state.state if isinstance(state, State) else state
+        await self._touch(key, record)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._record(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+        record = await self._record(key)
+        record.data = data.copy()
+        await self._touch(key, record)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return (await self._record(key)).data.copy()
+
+    async def flush(self):
+        """Сбрасывает накопленные изменения в БД одной транзакцией."""
+        async with self._flush_lock:
+            self._drop_clean_empty()
+            if not self._dirty:
+                return
+            keys, self._dirty = self._dirty, set()
+            upserts, deletes = [], []
+            for skey in keys:
+                record = self._records.get(skey)
+                if record is None or (record.state is None and not record.data):
+                    # Пустое состояние (state.clear()) хранить незачем
+                    deletes.append(skey)
+                    self._records.pop(skey, None)
+                else:
+                    upserts.append((
+                        skey,
+                        record.state,
+                        json.dumps(record.data, ensure_ascii=False),
+                        record.updated_at
+                    ))
+            try:
+                await save_fsm_records(upserts, deletes, db_path=self.db_path)
+            except BaseException:
+                # Не теряем изменения ни при ошибке, ни при отмене (close() посреди записи):
+                # попробуем ещё раз при следующем сбросе
+                self._dirty |= keys
+                raise
+            self.flushes += 1
+
+    def _drop_clean_empty(self):
+        """Убирает из памяти пустые записи без несохранённых изменений: их отсутствие в БД и так означает пустоту."""
+        empty = [k for k, r in self._records.items() if r.state is None and not r.data]
+        for skey in empty:
+            if skey not in self._dirty:
+                del self._records[skey]
+
+    async def expire(self) -> int:
+        """Удаляет состояния, не менявшиеся дольше ttl. Возвращает число удалённых из БД."""
+        threshold = time.time() - self.ttl
+        for skey in [k for k, r in self._records.items() if r.updated_at < threshold and k not in self._dirty]:
+            del self._records[skey]
+        self._last_expire = time.time()
+        return await delete_expired_fsm_records(threshold, db_path=self.db_path)
+
+    async def _flush_loop(self):
+        while self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                # Чистка устаревших состояний — не чаще раза в минуту
+                if time.time() - self._last_expire > 60:
+                    await self.expire()
+            except Exception as e:
+                logging.error(f"[SQLiteStorage] Ошибка при сохранении состояний FSM: {e}")
+
+    async def close(self) -> None:
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        self._flusher = None
+        await self.flush()
@@ -0,0 +1,68 @@
+from typing import Iterable, Iterator
+
+# Лимиты Telegram на одно сообщение
+TELEGRAM_MESSAGE_LIMIT = 4096   # символов (в UTF-16 code units)
+MAX_MESSAGE_ENTITIES = 100      # сущностей разметки (упоминания, ссылки, жирный и т.п.)
+
+
+def telegram_len(text: str) -> int:
+    """
+    Длина текста так, как её считает Telegram — в UTF-16 code units
+    (эмодзи и прочие символы вне BMP занимают 2).
+    HTML-теги тоже учитываются: это верхняя оценка длины после разбора разметки.
+    """
+    return len(text.encode("utf-16-le")) // 2
+
+
+def split_parts(
+        parts: Iterable[str],
+        prefix: str = "",
+        sep: str = " ",
+        limit: int = TELEGRAM_MESSAGE_LIMIT,
+        max_parts: int | None = MAX_MESSAGE_ENTITIES
+) -> Iterator[list[str]]:
+    """
+    Потоково делит части на группы по сообщениям: группа отдаётся, как только
+    следующая часть в неё уже не помещается, — весь текст заранее собирать не нужно.
+
+    Каждое сообщение = prefix + части через sep, длина не больше `limit`
+    и не больше `max_parts` частей (например, упоминаний-сущностей).
+    Части не разрезаются: часть длиннее лимита уходит отдельным сообщением.
+    """
+    current: list[str] = []
+    prefix_len = telegram_len(prefix)
+    length = prefix_len
+    sep_len = telegram_len(sep)
+
+    for part in parts:
+        part_len = telegram_len(part)
+        extra = part_len + (sep_len if current else 0)
+        too_long = length + extra > limit
+        too_many = max_parts is not None and len(current) >= max_parts
+        if current and (too_long or too_many):
+            yield current
+            current = []
+            length = prefix_len
+            extra = part_len
+        current.append(part)
+        length += extra
+
+    if current:
+        yield current
+
+
+def iter_messages(parts: Iterable[str], prefix: str = "", sep: str = " ", **kwargs) -> Iterator[str]:
+    """Потоковый вариант pack_parts: готовые тексты сообщений по мере заполнения."""
+    for group in split_parts(parts, prefix=prefix, sep=sep, **kwargs):
+        yield prefix + sep.join(group)
+
+
+def pack_parts(
+        parts: Iterable[str],
+        prefix: str = "",
+        sep: str = " ",
+        limit: int = TELEGRAM_MESSAGE_LIMIT,
+        max_parts: int | None = MAX_MESSAGE_ENTITIES
+) -> list[str]:
+    """Жадно упаковывает части в как можно меньше сообщений (см. split_parts)."""
+    return list(iter_messages(parts, prefix=prefix, sep=sep, limit=limit, max_parts=max_parts))
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from functools import partial
+
+from aiogram.types import Message
+
+from bot.utils.db import save_polls
+from bot.utils.notifications import broadcast_mentions, build_players_mention_list
+from bot.utils.poll_question import get_training_poll_question
+from bot.utils.reference_data import get_reference_data, parse_thread_id
+from bot.utils.sender import get_sender
+
+TRAINING_OPTIONS = ["Буду", "Не буду", "Тренер"]
+
+
+def poll_row(
+        sent: Message,
+        thread_id,
+        position_id: int | None,
+        kind: str = "custom",
+        training_at: float | None = None
+) -> tuple:
+    """Строка для таблицы polls по сообщению с отправленным опросом."""
+    poll = sent.poll
+    return (
+        poll.id,
+        str(sent.chat.id),
+        None if thread_id is None else str(thread_id),
+        sent.message_id,
+        position_id,
+        kind,
+        poll.question,
+        json.dumps([option.text for option in poll.options], ensure_ascii=False),
+        time.time(),
+        training_at,
+    )
+
+
+async def record_polls(rows: list[tuple]):
+    """Запоминает отправленные опросы, чтобы привязать к ним голоса (PollAnswer)."""
+    try:
+        await save_polls(rows)
+    except Exception as e:
+        # Опрос уже в чате — ошибка записи не должна ломать отправку
+        logging.error(f"[training_polls] Не удалось сохранить опросы: {e}")
+
+
+async def send_training_polls(
+        bot,
+        topic: str,
+        notify_players: bool = True,
+        now: datetime | None = None
+) -> list[Message]:
+    """
+    Отправляет опрос на тренировку во все чаты позиции (/poll <позиция> и расписание).
+    Опрос — на ближайшую после `now` (по умолчанию — сейчас) тренировку позиции по расписанию.
+    Возвращает отправленные сообщения; пустой список — у позиции нет чатов или тренировок.
+    Если опрос не ушёл ни в один чат, пробрасывает ошибку отправки.
+    """
+    topic = topic.upper().strip()
+    reference = await get_reference_data()
+    # thread_id в chats может быть пустой строкой — такие чаты без темы
+    targets = [(chat_id, parse_thread_id(thread_id)) for chat_id, thread_id in reference.chats_for(topic)]
+    if not targets:
+        return []
+
+    position_id = reference.position_ids.get(topic)
+    training = reference.calendar.next_session(position_id, now)
+    if training is None:
+        logging.warning(f"[training_polls] {topic}: в расписании нет ближайших тренировок")
+        return []
+    question = get_training_poll_question(topic, training)
+
+    # Опрос уходит во все чаты позиции; лимиты Telegram учитывает общий sender.
+    # Сбой в одном чате не отменяет опросы, уже отправленные в другие
+    sender = get_sender(bot)
+    results = await asyncio.gather(*(
+        sender.call(chat_id, partial(
+            bot.send_poll,
+            chat_id=chat_id,
+            message_thread_id=thread_id,
+            question=question,
+            options=TRAINING_OPTIONS,
+            is_anonymous=False
+        ))
+        for chat_id, thread_id in targets
+    ), return_exceptions=True)
+
+    sent_polls, sent_targets = [], []
+    for result, (chat_id, thread_id) in zip(results, targets):
+        if isinstance(result, Exception):
+            logging.error(f"[training_polls] {topic}: не удалось отправить опрос в чат {chat_id}: {result}")
+        else:
+            sent_polls.append(result)
+            sent_targets.append((chat_id, thread_id))
+    if not sent_polls:
+        # Опрос не ушёл ни в один чат — это ошибка отправки, а не отсутствие тренировок
+        raise results[0]
+    await record_polls([
+        poll_row(sent, thread_id, position_id, "training", training.timestamp())
+        for sent, (_, thread_id) in zip(sent_polls, sent_targets)
+    ])
+
+    if notify_players:
+        # В БД позиция может быть записана в другом регистре (Rookie)
+        mentions = await build_players_mention_list(position=reference.position_name(topic))
+        logging.info(f"[training_polls] {topic}: mentions={len(mentions)}")
+
+        if mentions:
+            await broadcast_mentions(bot, [(chat_id, thread_id, mentions) for chat_id, thread_id in sent_targets])
+
+    return sent_polls
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+
+from bot.config import VOTE_BATCH_SIZE, VOTE_FLUSH_INTERVAL
+from bot.utils.db import save_poll_votes
+
+
+class VoteWriter:
+    """
+    Отложенная запись голосов из PollAnswer в таблицу poll_votes.
+
+    - record() только запоминает голос в памяти; повторный голос того же
+      участника в том же опросе заменяет предыдущий — в БД попадёт последний
+    - накопленные голоса сбрасываются одной транзакцией раз в `flush_interval`
+      секунд или сразу, когда их набралось `batch_size`
+      (flush_interval <= 0 — запись сразу, без отложенного сброса)
+    """
+
+    def __init__(self, db_path=None, flush_interval: float = VOTE_FLUSH_INTERVAL, batch_size: int = VOTE_BATCH_SIZE):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # (poll_id, tg_id) -> (option_id или None, если голос отозван; время голоса)
+        self._pending: dict[tuple[str, int], tuple[int | None, float]] = {}
+        self._flusher: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self.votes = 0
+        self.flushes = 0
+
+    async def record(self, poll_id: str, tg_id: int, option_ids: list[int]):
+        """Запоминает голос; пустой option_ids — участник отозвал голос."""
+        # Опросы бота — с одним вариантом ответа
+        option_id = option_ids[0] if option_ids else None
+        self._pending[(poll_id, tg_id)] = (option_id, time.time())
+        self.votes += 1
+
+        if self.flush_interval <= 0 or len(self._pending) >= self.batch_size:
+            await self.flush()
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    def pending_votes(self, poll_id: str) -> dict[int, int | None]:
+        """Ещё не записанные голоса опроса: tg_id -> option_id (None — голос отозван)."""
+        return {tg_id: option for (pid, tg_id), (option, _) in self._pending.items() if pid == poll_id}
+
+    async def flush(self):
+        """Сбрасывает накопленные голоса в БД одной транзакцией."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            upserts, deletes = [], []
+            for (poll_id, tg_id), (option_id, voted_at) in batch.items():
+                if option_id is None:
+                    deletes.append((poll_id, tg_id))
+                else:
+                    upserts.append((poll_id, tg_id, option_id, voted_at))
+            try:
+                await save_poll_votes(upserts, deletes, db_path=self.db_path)
+            except BaseException:
+                # Не теряем голоса и при ошибке, и при отмене (close() посреди записи):
+                # запись пачки идемпотентна, повтор безопасен. Пришедшие за время записи новее — их не трогаем
+                for key, vote in batch.items():
+                    self._pending.setdefault(key, vote)
+                raise
+            self.flushes += 1
+
+    async def _flush_loop(self):
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"[VoteWriter] Ошибка при сохранении голосов: {e}")
+
+    async def close(self):
+        """Останавливает фоновый сброс и записывает оставшиеся голоса."""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        self._flusher = None
+        await self.flush()
+
+
+# Общий писатель голосов бота; закрывается в on_shutdown до закрытия пула
+vote_writer = VoteWriter()
@@ -5,8 +5,161 @@ from bot.config import DB_PATH, DEFAULT_ADMIN
 ROLES = ["admin", "coach", "player"]
 POSITIONS = ["OL", "QB", "RB", "TE", "WR", "DL", "LB", "CB", "Rookie"]
 
-async def create_all_tables():
-    async with aiosqlite.connect(DB_PATH) as db:
+# Версионные миграции схемы: (версия, описание, SQL-команды).
+# Номер последней применённой миграции хранится в PRAGMA user_version,
+# поэтому каждая миграция выполняется ровно один раз. Новые изменения схемы
+# добавляются в конец списка со следующим номером.
+MIGRATIONS = [
+    (1, "Индексы для частых запросов", [
+        # insert_player: проверка дубликата по tg_username
+        "CREATE INDEX IF NOT EXISTS idx_team_tg_username ON team(tg_username)",
+        # list_players(only_active=True) и выборки по статусу
+        "CREATE INDEX IF NOT EXISTS idx_team_status ON team(status, name)",
+        # выборки игроков по роли (например, все тренеры)
+        "CREATE INDEX IF NOT EXISTS idx_player_roles_role ON player_roles(role_id, player_id)",
+        # get_chat_by_position
+        "CREATE INDEX IF NOT EXISTS idx_chats_position ON chats(position_id)",
+    ]),
+    (2, "Индекс для выборки игроков позиции по статусу", [
+        # list_mention_targets(position, status)
+        "CREATE INDEX IF NOT EXISTS idx_team_position_status ON team(position_id, status, name)",
+    ]),
+    (3, "Таблица состояний FSM (SQLiteStorage)", [
+        """
+        CREATE TABLE IF NOT EXISTS fsm_states (
+            key TEXT PRIMARY KEY,
+            state TEXT,
+            data TEXT NOT NULL DEFAULT '{}',
+            updated_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_fsm_states_updated ON fsm_states(updated_at)",
+    ]),
+    (4, "Индексы для постраничного вывода состава", [
+        # list_players_page: keyset по (name, id) — id входит в индекс как rowid
+        "CREATE INDEX IF NOT EXISTS idx_team_name ON team(name)",
+        # list_players_page(position=...)
+        "CREATE INDEX IF NOT EXISTS idx_team_position_name ON team(position_id, name)",
+    ]),
+    (5, "Опросы и голоса", [
+        # Опросы, отправленные ботом: poll_id — id опроса в Telegram (приходит в PollAnswer)
+        """
+        CREATE TABLE IF NOT EXISTS polls (
+            poll_id TEXT PRIMARY KEY,
+            chat_id TEXT NOT NULL,
+            thread_id TEXT,
+            message_id INTEGER NOT NULL,
+            position_id INTEGER,
+            kind TEXT NOT NULL DEFAULT 'custom',
+            question TEXT NOT NULL,
+            options TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            FOREIGN KEY (position_id) REFERENCES positions(id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_polls_kind_created ON polls(kind, created_at)",
+        # Последний голос участника в опросе; отозванный голос удаляется.
+        # Без внешнего ключа на polls: голос за опрос, который не удалось
+        # сохранить, не должен ломать запись всей пачки
+        """
+        CREATE TABLE IF NOT EXISTS poll_votes (
+            poll_id TEXT NOT NULL,
+            tg_id INTEGER NOT NULL,
+            option_id INTEGER NOT NULL,
+            voted_at REAL NOT NULL,
+            PRIMARY KEY (poll_id, tg_id)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_poll_votes_tg_id ON poll_votes(tg_id)",
+    ]),
+    (6, "Время тренировки у опроса", [
+        # Начало тренировки (unix time), на которую собирается опрос; NULL — произвольный опрос
+        "ALTER TABLE polls ADD COLUMN training_at REAL",
+    ]),
+    (7, "Напоминания по опросам на тренировки", [
+        # Когда не проголосовавшим напомнили об опросе; NULL — ещё не напоминали
+        "ALTER TABLE polls ADD COLUMN reminded_at REAL",
+        # list_due_reminders: частичный индекс только по опросам, ждущим напоминания
+        "CREATE INDEX IF NOT EXISTS idx_polls_reminder ON polls(training_at) WHERE reminded_at IS NULL",
+    ]),
+    (8, "Расписание опросов на тренировки", [
+        # cron — "минута час день месяц день_недели" по МСК (0 или 7 = воскресенье);
+        # position_id NULL — все позиции, у которых есть чаты;
+        # last_run_at — последнее обработанное срабатывание (unix time): по нему
+        # догоняются пропущенные и не повторяются уже отправленные опросы
+        """
+        CREATE TABLE IF NOT EXISTS poll_schedule (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cron TEXT NOT NULL,
+            position_id INTEGER,
+            last_run_at REAL NOT NULL,
+            FOREIGN KEY (position_id) REFERENCES positions(id)
+        )
+        """,
+    ]),
+    (9, "Расписание тренировок", [
+        # Еженедельные тренировки: weekday 0 = ПН ... 6 = ВС, time — "HH:MM" по МСК.
+        # Правила позиции (position_id) заменяют общие (position_id NULL) для этой позиции
+        """
+        CREATE TABLE IF NOT EXISTS trainings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            weekday INTEGER NOT NULL CHECK (weekday BETWEEN 0 AND 6),
+            time TEXT NOT NULL,
+            position_id INTEGER,
+            FOREIGN KEY (position_id) REFERENCES positions(id)
+        )
+        """,
+        # Текущее расписание: среда 20:30 и воскресенье 17:15
+        "INSERT INTO trainings (weekday, time) VALUES (2, '20:30'), (6, '17:15')",
+        # Исключения: в день date тренировки позиции (NULL — всех) отменяются (праздник),
+        # а если указано time — переносятся на это время
+        """
+        CREATE TABLE IF NOT EXISTS training_exceptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            position_id INTEGER,
+            time TEXT,
+            note TEXT,
+            FOREIGN KEY (position_id) REFERENCES positions(id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_training_exceptions_date ON training_exceptions(date)",
+    ]),
+]
+
+async def apply_migrations(db) -> int:
+    """
+    Применяет к открытому соединению все миграции новее PRAGMA user_version.
+    Каждая миграция выполняется в своей транзакции вместе с обновлением версии.
+    Возвращает итоговую версию схемы.
+    """
+    async with db.execute("PRAGMA user_version") as cursor:
+        version = (await cursor.fetchone())[0]
+
+    for number, description, statements in MIGRATIONS:
+        if number <= version:
+            continue
+        await db.execute("BEGIN")
+        try:
+            for statement in statements:
+                await db.execute(statement)
+            await db.execute(f"PRAGMA user_version = {number}")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        print(f"✅ Миграция {number} применена: {description}")
+        version = number
+
+    return version
+
+async def migrate(db_path=DB_PATH) -> int:
+    """Доводит схему БД до последней версии (вызывается на старте бота)."""
+    async with aiosqlite.connect(db_path) as db:
+        return await apply_migrations(db)
+
+async def create_all_tables(db_path=DB_PATH):
+    async with aiosqlite.connect(db_path) as db:
         # Создаём таблицу roles
         await db.execute("""
         CREATE TABLE IF NOT EXISTS roles (
@@ -110,6 +263,7 @@ async def create_all_tables():
             print("ℹ️ Дефолтный администратор уже существует")
 
         await db.commit()
+        await apply_migrations(db)
         print("✅ Все таблицы созданы и базовые данные вставлены")
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+"""
+Генератор синтетического состава клуба для тестов и бенчмарков.
+
+Заполняет team, player_roles и chats правдоподобными данными (кириллические
+имена, username, статусы, номера, участники с несколькими ролями) пачками через
+executemany — 1 млн строк вставляется за десятки секунд. Позиции берутся из
+справочника positions, который создаёт create_all_tables. fill_attendance
+добавляет историю опросов на тренировки и голосов (polls / poll_votes).
+
+Данные детерминированы: одинаковые N и seed дают одинаковую БД.
+
+Запуск из корня репозитория:
+    python -m data.synthetic_roster roster.db 100000 [--seed 0] [--weeks 52]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from bot.utils.poll_question import MSK, TRAINING_TIMES
+from data.create_team_table import create_all_tables
+
+TG_ID_BASE = 100_000
+CHAT_ID = "-1001000000000"
+
+MALE_NAMES = [
+    "Александр", "Алексей", "Андрей", "Артём", "Борис", "Вадим", "Виктор", "Владимир",
+    "Глеб", "Григорий", "Дмитрий", "Евгений", "Егор", "Иван", "Игорь", "Илья",
+    "Кирилл", "Константин", "Лев", "Максим", "Матвей", "Михаил", "Никита", "Николай",
+    "Олег", "Павел", "Роман", "Сергей", "Степан", "Тимофей", "Фёдор", "Ярослав",
+]
+FEMALE_NAMES = [
+    "Анна", "Дарья", "Екатерина", "Елена", "Ксения", "Мария", "Наталья", "Ольга",
+    "Полина", "Софья", "Татьяна", "Юлия",
+]
+# Мужские формы; женская получается добавлением «а»
+SURNAMES = [
+    "Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов",
+    "Новиков", "Фёдоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семёнов", "Егоров",
+    "Павлов", "Козлов", "Степанов", "Николаев", "Орлов", "Андреев", "Макаров", "Никитин",
+    "Захаров", "Зайцев", "Соловьёв", "Борисов", "Яковлев", "Григорьев", "Романов", "Воробьёв",
+]
+PATRONYMIC_ROOTS = ["Александров", "Андреев", "Дмитриев", "Сергеев", "Игорев", "Олегов", "Павлов", "Викторов"]
+
+# Доли статусов и наборов ролей (веса для random.choices)
+STATUSES = (["active", "injured", "inactive"], [80, 10, 10])
+ROLE_SETS = ([("player",), ("player", "coach"), ("coach",), ("admin", "coach")], [88, 6, 5, 1])
+
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya",
+})
+
+
+def translit(text: str) -> str:
+    return text.lower().translate(_TRANSLIT)
+
+
+def generate_roster(n: int, positions: int, seed: int = 0) -> Iterator[tuple]:
+    """
+    Генерирует n участников:
+    (name, surname, middlename, number, tg_username, tg_id, position_id, status, roles).
+    positions — число позиций в справочнике (position_id от 1 до positions).
+    """
+    rng = random.Random(seed)
+    for i in range(n):
+        female = rng.random() < 0.15
+        name = rng.choice(FEMALE_NAMES if female else MALE_NAMES)
+        surname = rng.choice(SURNAMES) + ("а" if female else "")
+        middlename = None
+        if rng.random() < 0.3:
+            middlename = rng.choice(PATRONYMIC_ROOTS) + ("на" if female else "ич")
+
+        roles = rng.choices(*ROLE_SETS)[0]
+        is_player = "player" in roles
+        # Чистый тренер может быть без позиции и номера
+        position_id = rng.randint(1, positions) if is_player or rng.random() < 0.5 else None
+        number = str(rng.randint(0, 99)) if is_player and rng.random() < 0.9 else None
+        status = rng.choices(*STATUSES)[0]
+
+        # Username и tg_id есть не у всех: часть участников добавлена без них
+        tg_username = f"{translit(surname)}_{i}" if rng.random() < 0.9 else None
+        tg_id = TG_ID_BASE + i if rng.random() < 0.95 else None
+
+        yield name, surname, middlename, number, tg_username, tg_id, position_id, status, roles
+
+
+def fill_roster(db_path, n: int, seed: int = 0, batch_size: int = 10_000, with_chats: bool = True) -> dict:
+    """
+    Добавляет в БД (схема уже создана) n синтетических участников и, если
+    with_chats, по одному топику общего чата на каждую позицию.
+    Возвращает число вставленных строк по таблицам.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        # Синтетическим данным не нужна устойчивость к сбою питания
+        conn.execute("PRAGMA synchronous = OFF")
+        role_ids = dict(conn.execute("SELECT role, id FROM roles").fetchall())
+        position_ids = [row[0] for row in conn.execute("SELECT id FROM positions ORDER BY id")]
+        next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM team").fetchone()[0]
+
+        counts = {"team": 0, "player_roles": 0, "chats": 0}
+        team_rows, role_rows = [], []
+
+        def flush():
+            conn.executemany(
+                "INSERT INTO team (id, name, surname, middlename, number, tg_username, tg_id, position_id, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                team_rows
+            )
+            conn.executemany("INSERT INTO player_roles (player_id, role_id) VALUES (?, ?)", role_rows)
+            counts["team"] += len(team_rows)
+            counts["player_roles"] += len(role_rows)
+            team_rows.clear()
+            role_rows.clear()
+
+        # id задаём явно, чтобы сразу связать участника с ролями без обратного чтения
+        for player_id, member in enumerate(generate_roster(n, len(position_ids), seed), start=next_id):
+            *fields, roles = member
+            team_rows.append((player_id, *fields))
+            role_rows.extend((player_id, role_ids[role]) for role in roles)
+            if len(team_rows) >= batch_size:
+                flush()
+        flush()
+
+        if with_chats:
+            cursor = conn.executemany(
+                "INSERT INTO chats (chat_id, thread_id, position_id, chat_name) "
+                "SELECT ?, CAST(id AS TEXT), id, position FROM positions WHERE id = ?",
+                [(CHAT_ID, position_id) for position_id in position_ids]
+            )
+            counts["chats"] = cursor.rowcount
+
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
+
+
+def fill_attendance(db_path, weeks: int, seed: int = 0, start: datetime | None = None) -> dict:
+    """
+    Добавляет историю опросов на тренировки за `weeks` недель: по опросу на каждую
+    тренировку (среда и воскресенье) каждой позиции и голоса игроков этой позиции.
+    У каждого игрока своя вероятность прийти; часть игроков на опрос не отвечает.
+    Возвращает число вставленных строк по таблицам.
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2023, 9, 4, tzinfo=MSK)  # понедельник
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA synchronous = OFF")
+        position_ids = [row[0] for row in conn.execute("SELECT id FROM positions ORDER BY id")]
+        players: dict[int, list[int]] = {}
+        for tg_id, position_id in conn.execute(
+            "SELECT t.tg_id, t.position_id FROM team t "
+            "JOIN player_roles pr ON pr.player_id = t.id JOIN roles r ON r.id = pr.role_id "
+            "WHERE r.role = 'player' AND t.tg_id IS NOT NULL AND t.position_id IS NOT NULL"
+        ):
+            players.setdefault(position_id, []).append(tg_id)
+        chance = {tg_id: rng.uniform(0.4, 0.95) for ids in players.values() for tg_id in ids}
+        options = json.dumps(["Буду", "Не буду", "Тренер"], ensure_ascii=False)
+
+        poll_rows, vote_rows = [], []
+        for week in range(weeks):
+            for weekday, (hour, minute) in sorted(TRAINING_TIMES.items()):
+                training = start + timedelta(weeks=week, days=weekday, hours=hour, minutes=minute)
+                at = training.timestamp()
+                for position_id in position_ids:
+                    poll_id = f"s{position_id}-{int(at)}"
+                    poll_rows.append((
+                        poll_id, CHAT_ID, str(position_id), len(poll_rows) + 1, position_id, "training",
+                        f"Тренировка {training:%d.%m.%Y}", options, at - 2 * 24 * 60 * 60, at
+                    ))
+                    for tg_id in players.get(position_id, ()):
+                        if rng.random() < 0.85:
+                            option_id = 0 if rng.random() < chance[tg_id] else 1
+                            vote_rows.append((poll_id, tg_id, option_id, at - 24 * 60 * 60))
+
+        conn.executemany(
+            "INSERT INTO polls (poll_id, chat_id, thread_id, message_id, position_id, kind, question, options, "
+            "created_at, training_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            poll_rows
+        )
+        conn.executemany("INSERT INTO poll_votes (poll_id, tg_id, option_id, voted_at) VALUES (?, ?, ?, ?)", vote_rows)
+        conn.commit()
+    finally:
+        conn.close()
+    return {"polls": len(poll_rows), "poll_votes": len(vote_rows)}
+
+
+async def build_roster_db(db_path, n: int, seed: int = 0, with_chats: bool = True) -> Path:
+    """Создаёт БД по схеме create_all_tables и заполняет её n синтетическими участниками."""
+    # create_all_tables печатает прогресс — здесь он не нужен
+    with contextlib.redirect_stdout(io.StringIO()):
+        await create_all_tables(db_path)
+    fill_roster(db_path, n, seed=seed, with_chats=with_chats)
+    return Path(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Синтетический состав клуба в новой или существующей БД")
+    parser.add_argument("db_path", type=Path)
+    parser.add_argument("n", type=int, help="число участников")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weeks", type=int, default=0, help="недель истории опросов на тренировки")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(create_all_tables(args.db_path))
+    counts = fill_roster(args.db_path, args.n, seed=args.seed)
+    if args.weeks:
+        counts |= fill_attendance(args.db_path, args.weeks, seed=args.seed)
+    print(f"✅ {counts} за {time.perf_counter() - started:.1f} с")
@@ -0,0 +1,183 @@
+"""
+Тесты аналитики посещаемости (bot/utils/attendance.py) и команды /stats
+"""
+import sqlite3
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from aiogram.filters import CommandObject
+
+from bot.handlers.stats import show_stats
+from bot.utils import attendance as attendance_module
+from bot.utils.attendance import AttendanceMatrix, get_attendance, longest_run
+from bot.utils.db import save_poll_votes, save_polls
+from bot.utils.poll_question import MSK
+from data.synthetic_roster import fill_attendance
+
+QB, WR = 2, 5
+WED = datetime(2025, 6, 4, 20, 30, tzinfo=MSK).timestamp()
+SUN = datetime(2025, 6, 8, 17, 15, tzinfo=MSK).timestamp()
+NEXT_WED = datetime(2025, 6, 11, 20, 30, tzinfo=MSK).timestamp()
+
+TRAININGS = [
+    ("qb1", QB, WED),
+    ("qb1-extra", QB, WED),  # та же тренировка, опрос во втором чате позиции
+    ("wr1", WR, WED),
+    ("qb2", QB, SUN),
+    ("qb3", QB, NEXT_WED),
+]
+# tg_id совпадает с id: голоса в тестах задаются по id игрока
+PLAYERS = [
+    (1, "Иван", "Иванов", QB, 1),
+    (2, "Пётр", "Петров", QB, 2),
+    (3, "Олег", "Новиков", QB, 3),
+    (4, "Глеб", "Орлов", WR, 4),
+]
+
+
+def matrix(votes) -> AttendanceMatrix:
+    return AttendanceMatrix(TRAININGS, votes, PLAYERS)
+
+
+def test_longest_run():
+    assert longest_run(0) == 0
+    assert longest_run(0b1011101110) == 3
+
+
+def test_player_rates_and_streaks():
+    m = matrix([
+        ("qb1", 1, 0), ("qb2", 1, 1), ("qb3", 1, 0),
+        ("qb1-extra", 2, 0), ("qb2", 2, 0), ("qb3", 2, 0),
+        ("wr1", 4, 0),
+    ])
+
+    assert m.training_count(QB) == 3
+    ivanov, petrov = m.player(1), m.player(2)
+    assert (ivanov.attended, ivanov.expected, ivanov.current_streak, ivanov.best_streak) == (2, 3, 1, 1)
+    assert (petrov.attended, petrov.expected, petrov.current_streak, petrov.best_streak) == (3, 3, 3, 3)
+    # Ни разу не ответил — ждали на всех тренировках позиции
+    assert m.player(3).rate == 0
+
+    assert [row.player_id for row in m.depth_chart(QB)] == [2, 1, 3]
+    assert m.rate(QB) == (5, 9)
+    assert m.rate() == (6, 10)
+
+
+def test_newcomer_is_expected_from_first_answer():
+    m = matrix([("qb2", 3, 0), ("qb3", 3, 0)])
+
+    newcomer = m.player(3)
+    assert (newcomer.attended, newcomer.expected, newcomer.current_streak) == (2, 2, 2)
+
+
+def test_weekday_rates():
+    m = matrix([("qb1", 1, 0), ("qb2", 1, 1), ("qb3", 1, 1), ("wr1", 4, 0)])
+
+    assert m.weekdays() == [2, 6]
+    assert m.weekdays(WR) == [2]
+    # Среды: у QB две тренировки на троих, у WR одна
+    assert m.rate(QB, weekday=2) == (1, 6)
+    assert m.rate(weekday=2) == (2, 7)
+    assert m.rate(QB, weekday=6) == (0, 3)
+
+
+def test_votes_for_other_position_are_ignored():
+    m = matrix([("wr1", 1, 0)])
+
+    assert m.player(1).attended == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_command(roster_db, message):
+    fill_attendance(roster_db, weeks=8)
+    message.text = "/stats"
+
+    await show_stats(message, CommandObject(command="stats"))
+
+    summary = message.answer.call_args_list[0][0][0]
+    assert "тренировок — 144" in summary
+    assert "Ср — " in summary and "Вс — " in summary
+    assert "QB — " in summary
+
+    message.answer.reset_mock()
+    await show_stats(message, CommandObject(command="stats", args="qb"))
+
+    chart = "".join(call[0][0] for call in message.answer.call_args_list)
+    assert chart.startswith("📊 QB: посещаемость")
+    assert "1. " in chart and "серия" in chart
+
+
+@pytest.mark.asyncio
+async def test_stats_unknown_position(schema_db, message):
+    await show_stats(message, CommandObject(command="stats", args="XX"))
+
+    assert message.answer.call_args[0][0].startswith("Неизвестная позиция: XX")
+
+
+def test_applied_votes_match_rebuild():
+    """Тест: голоса, применённые к готовой матрице, дают тот же результат, что и перестройка."""
+    votes = [("qb1", 1, 0), ("qb2", 1, 1), ("qb1", 3, 1), ("wr1", 4, 0)]
+    m = matrix(votes)
+
+    # Голос во втором чате той же тренировки, смена ответа, отзыв, чужой опрос и голос не игрока
+    m.apply_votes(
+        [("qb1-extra", 1, 1, 0.0), ("qb2", 1, 0, 0.0), ("qb3", 2, 0, 0.0), ("custom", 1, 0, 0.0), ("qb3", 99, 0, 0.0)],
+        [("qb1", 3), ("wr1", 4)]
+    )
+    expected = matrix([
+        ("qb1", 1, 0), ("qb1-extra", 1, 1), ("qb2", 1, 0), ("qb3", 2, 0), ("qb3", 99, 0),
+    ])
+    assert (m.expected, m.attended, m.totals, m.votes) == (expected.expected, expected.attended, expected.totals, 5)
+
+    # Отзыв голоса в одном из чатов: ответ во втором чате остаётся ответом на тренировку
+    m.apply_votes([], [("qb1-extra", 1)])
+    assert m.player(1).attended == 2
+
+
+@pytest.mark.asyncio
+async def test_new_votes_are_applied_without_rebuild(roster_db, monkeypatch):
+    fill_attendance(roster_db, weeks=2)
+    builds = MagicMock(wraps=attendance_module.build_attendance)
+    monkeypatch.setattr(attendance_module, "build_attendance", builds)
+
+    conn = sqlite3.connect(roster_db)
+    poll_id, tg_id = conn.execute("SELECT poll_id, tg_id FROM poll_votes WHERE option_id = 1 LIMIT 1").fetchone()
+    conn.close()
+
+    first = await get_attendance()
+    assert await get_attendance() is first
+    attended = first.rate()[0]
+
+    # Игрок передумал: «Не буду» -> «Буду»
+    await save_poll_votes([(poll_id, tg_id, 0, 0.0)], [])
+    assert await get_attendance() is first
+    assert builds.call_count == 1
+    assert first.rate()[0] == attended + 1
+    rebuilt = await attendance_module.build_attendance()
+    assert (first.attended, first.totals) == (rebuilt.attended, rebuilt.totals)
+
+    # Новый опрос — новый столбец матрицы: перестройка
+    await save_polls([])
+    assert await get_attendance() is not first
+
+
+@pytest.mark.asyncio
+async def test_votes_saved_during_build_are_not_lost(roster_db, monkeypatch):
+    """Тест: пачка голосов, записанная после того, как сборка прочитала историю, попадает в матрицу."""
+    fill_attendance(roster_db, weeks=2)
+    conn = sqlite3.connect(roster_db)
+    poll_id, tg_id = conn.execute("SELECT poll_id, tg_id FROM poll_votes WHERE option_id = 1 LIMIT 1").fetchone()
+    conn.close()
+    build = attendance_module.build_attendance
+
+    async def build_then_vote():
+        matrix = await build()
+        await save_poll_votes([(poll_id, tg_id, 0, 0.0)], [])
+        return matrix
+
+    monkeypatch.setattr(attendance_module, "build_attendance", build_then_vote)
+    matrix = await get_attendance()
+
+    rebuilt = await build()
+    assert (matrix.attended, matrix.totals) == (rebuilt.attended, rebuilt.totals)
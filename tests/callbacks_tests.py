@@ -0,0 +1,101 @@
+"""
+Тесты типизированных callback_data (bot/utils/callbacks.py) и таблицы действий /update
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from bot.handlers import update_players
+from bot.handlers.list_players import roster_callback
+from bot.utils import db as db_module
+from bot.utils.callbacks import RosterPageCallback, UpdateCallback
+from bot.utils.keyboards import (
+    EDIT_FIELD_INLINE,
+    FIELD_MENU_KEYBOARD,
+    STATUS_KEYBOARD,
+    build_chats_keyboard,
+    build_position_edit_keyboard,
+)
+from bot.utils.states import UpdatePlayerStates
+
+TELEGRAM_CALLBACK_LIMIT = 64
+
+
+def test_callback_data_fits_telegram_limit():
+    # Длинное название чата раньше попадало в callback_data целиком
+    chats = [("-1001234567890", "123456", "Очень длинное название чата для опроса " * 3)] * 100
+    keyboards = [
+        EDIT_FIELD_INLINE,
+        FIELD_MENU_KEYBOARD,
+        STATUS_KEYBOARD,
+        build_chats_keyboard(chats, version=10_000),
+        build_position_edit_keyboard([(10_000, "Rookie")]),
+    ]
+    payloads = [button.callback_data for kb in keyboards for row in kb.inline_keyboard for button in row]
+    payloads.append(roster_callback("coaches", "Rookie", "prev", 10**12, 10**6))
+
+    assert max(len(p.encode()) for p in payloads) <= TELEGRAM_CALLBACK_LIMIT
+
+
+def test_roster_callback_roundtrip():
+    data = RosterPageCallback.unpack(roster_callback("players", None, "next", 42, 21))
+
+    assert (data.kind, data.position, data.forward, data.cursor_id, data.cursor_index) == ("players", None, True, 42, 21)
+
+
+def test_update_actions_cover_keyboards():
+    """
+    Тестируем, что у каждой кнопки /update есть обработчик в таблице действий.
+    """
+    keyboards = [EDIT_FIELD_INLINE, FIELD_MENU_KEYBOARD, STATUS_KEYBOARD, build_position_edit_keyboard([(1, "OL")])]
+    actions = {
+        UpdateCallback.unpack(button.callback_data).action
+        for kb in keyboards for row in kb.inline_keyboard for button in row
+    }
+
+    assert actions == set(update_players.UPDATE_ACTIONS)
+
+
+@pytest.mark.asyncio
+async def test_update_status_through_dispatch(callback, state):
+    await state.update_data(player_id=7, field="status")
+
+    with patch.object(update_players, "update_player_field", new=AsyncMock()) as update_field:
+        await update_players.handle_edit_callbacks(callback, UpdateCallback(action="s", value="injured"), state)
+
+    update_field.assert_awaited_once_with(7, "status", "injured")
+    assert await state.get_state() == UpdatePlayerStates.menu.state
+    assert callback.message.answer.call_args[1]["reply_markup"] is FIELD_MENU_KEYBOARD
+    callback.answer.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_position_through_dispatch(callback, state):
+    await state.update_data(player_id=7, field="position")
+
+    with patch.object(update_players, "update_player_field", new=AsyncMock()) as update_field:
+        await update_players.handle_edit_callbacks(callback, UpdateCallback(action="p", value="3"), state)
+
+    update_field.assert_awaited_once_with(7, "position_id", 3)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("action, value", [
+    ("f", "id = 1, status"),
+    ("s", "admin"),
+    ("p", "1 OR 1=1"),
+])
+async def test_forged_update_callback_is_rejected(callback, state, action, value):
+    """Тест: поле, статус или позиция не из кнопок бота (подделанный callback_data) в БД не попадают."""
+    await state.update_data(player_id=7, field="status")
+
+    with patch.object(update_players, "update_player_field", new=AsyncMock()) as update_field:
+        await update_players.handle_edit_callbacks(callback, UpdateCallback(action=action, value=value), state)
+
+    update_field.assert_not_awaited()
+    callback.answer.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_player_field_rejects_unknown_column(schema_db):
+    with pytest.raises(ValueError):
+        await db_module.update_player_field(1, "status = 'active', name", "x")
@@ -1,6 +1,9 @@
 """
 Фикстуры для тестирования Telegram бота
 """
+import sqlite3
+from contextlib import contextmanager
+
 import aiosqlite
 import pytest
 import pytest_asyncio
@@ -11,6 +14,10 @@ from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import User, Chat, Message, CallbackQuery
 from aiogram.fsm.storage.base import StorageKey
 from bot.utils import db as db_module
+from bot.utils import reference_data
+from bot.utils.reference_data import ReferenceData
+from data.create_team_table import create_all_tables
+from data.synthetic_roster import build_roster_db
 
 
 @pytest.fixture
@@ -135,41 +142,48 @@ def mock_db_functions():
     """
     Фикстура: мокает все функции работы с БД
     """
-    with patch('bot.handlers.list_players.list_players', new_callable=AsyncMock) as mock_list_players, \
-         patch('bot.handlers.list_players.get_positions', new_callable=AsyncMock) as mock_get_pos_list, \
+    # Справочник позиций, который хендлеры берут из памяти вместо БД
+    reference = ReferenceData(positions=[
+        (1, 'QB'),
+        (2, 'RB'),
+        (3, 'WR'),
+        (4, 'LB'),
+        (5, 'OL'),
+        (6, 'DL'),
+        (7, 'TE'),
+        (8, 'CB'),
+        (9, 'ROOKIE'),
+    ])
+
+    with patch('bot.handlers.list_players.list_players_page', new_callable=AsyncMock) as mock_list_page, \
+         patch('bot.handlers.list_players.get_reference_data', new_callable=AsyncMock) as mock_ref_list, \
          patch('bot.handlers.add_player.insert_player', new_callable=AsyncMock) as mock_insert, \
-         patch('bot.handlers.add_player.get_positions', new_callable=AsyncMock) as mock_get_pos_add:
+         patch('bot.handlers.add_player.get_reference_data', new_callable=AsyncMock) as mock_ref_add:
+
 
+        # «Таблица» состава: мок list_players_page фильтрует её по роли и позиции, как SQL
+        roster = []
+
+        async def fake_list_players_page(role, position=None, limit=20, **kwargs):
+            people = [
+                p for p in roster
+                if role in [r.strip() for r in p["roles"].split(",")]
+                and (position is None or p.get("position") == position)
+            ]
+            return people[:limit]
 
         # Настраиваем дефолтные возвращаемые значения
-        mock_list_players.return_value = []
+        mock_list_page.side_effect = fake_list_players_page
+        # Новый «состав» — сбрасываем кэши, построенные по прошлому
+        db_module.notify_roster_changed()
         mock_insert.return_value = True
-        mock_get_pos_list.return_value = [
-            (1, 'QB'),
-            (2, 'RB'),
-            (3, 'WR'),
-            (4, 'LB'),
-            (5, 'OL'),
-            (6, 'DL'),
-            (7, 'TE'),
-            (8, 'CB'),
-            (9, 'ROOKIE'),
-        ]
-        mock_get_pos_add.return_value = [
-            (1, 'QB'),
-            (2, 'RB'),
-            (3, 'WR'),
-            (4, 'LB'),
-            (5, 'OL'),
-            (6, 'DL'),
-            (7, 'TE'),
-            (8, 'CB'),
-            (9, 'ROOKIE'),
-        ]
+        mock_ref_list.return_value = reference
+        mock_ref_add.return_value = reference
 
         yield {
-            'list_players': mock_list_players,
-            'get_positions': mock_get_pos_list,
+            'list_players_page': mock_list_page,
+            'roster': roster,
+            'get_reference_data': mock_ref_list,
             'insert_player': mock_insert
         }
 
@@ -187,6 +201,35 @@ def mock_role_filter():
         mock_filter.return_value.__call__ = AsyncMock(return_value=True)
         yield mock_filter
 
+@contextmanager
+def use_db(db_file):
+    """
+    Переключает бота на БД db_file на время теста.
+    Кэши состава и ролей сбрасываются до и после, справочники перечитываются при первом обращении.
+    """
+    original_db_path = db_module.DB_PATH
+    db_module.DB_PATH = str(db_file)
+    db_module.role_cache.clear()
+    db_module.notify_roster_changed()
+    reference_data._loaded = False
+    try:
+        yield db_file
+    finally:
+        db_module.DB_PATH = original_db_path
+        db_module.role_cache.clear()
+        db_module.notify_roster_changed()
+        reference_data._loaded = False
+
+
+@pytest_asyncio.fixture
+async def empty_db(tmp_path):
+    """Пустая БД по настоящей схеме из create_all_tables."""
+    db_file = tmp_path / "test.db"
+    await create_all_tables(db_file)
+    with use_db(db_file):
+        yield db_file
+
+
 @pytest_asyncio.fixture
 async def temp_db(tmp_path):
     db_file = tmp_path / "test.db"
@@ -235,9 +278,33 @@ async def temp_db(tmp_path):
         """)
         await conn.commit()
 
-    original_db_path = db_module.DB_PATH
-    db_module.DB_PATH = str(db_file)
-    try:
+    with use_db(db_file):
+        yield db_file
+
+
+@pytest_asyncio.fixture
+async def schema_db(empty_db):
+    """БД по настоящей схеме из create_all_tables, с несколькими игроками и чатами."""
+    conn = sqlite3.connect(empty_db)
+    conn.executemany(
+        "INSERT INTO team (name, surname, tg_username, tg_id, position_id, status) VALUES (?, ?, ?, ?, ?, ?)",
+        [(f"Игрок{i}", f"Фамилия{i}", f"user{i}", 1000 + i, i % 9 + 1, "active") for i in range(50)]
+    )
+    conn.executemany(
+        "INSERT INTO player_roles (player_id, role_id) SELECT id, 3 FROM team WHERE tg_id = ?",
+        [(1000 + i,) for i in range(50)]
+    )
+    conn.execute("INSERT INTO chats (chat_id, thread_id, position_id, chat_name) VALUES ('-100', '2', 2, 'QB')")
+    conn.commit()
+    conn.close()
+    db_module.notify_roster_changed()
+    return empty_db
+
+
+@pytest_asyncio.fixture
+async def roster_db(tmp_path):
+    """БД по настоящей схеме с синтетическим составом из 1000 участников (data/synthetic_roster.py)."""
+    db_file = await build_roster_db(tmp_path / "roster.db", 1000)
+
+    with use_db(db_file):
         yield db_file
-    finally:
-        db_module.DB_PATH = original_db_path
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Тесты быстрого опроса /poll <POS> с таблицей маршрутов позиция -> чаты
+и выбора чата в пошаговом /poll
+"""
+import sqlite3
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.types import Chat, Message, Poll, PollOption
+from bot.handlers.create_poll import process_chat_choice, quick_poll
+from bot.utils.callbacks import PollChatCallback
+from bot.utils.reference_data import reload_reference_data
+from bot.utils.states import CreatePollStates
+
+
+def sent_poll(chat_id, question, options, message_thread_id=None, **kwargs) -> Message:
+    """Ответ send_poll: сообщение с опросом, id опроса — poll<chat_id>."""
+    poll = Poll.model_construct(
+        id=f"poll{chat_id}",
+        question=question,
+        options=[PollOption.model_construct(text=option, voter_count=0) for option in options],
+    )
+    return Message.model_construct(
+        message_id=1,
+        chat=Chat(id=int(chat_id), type="supergroup"),
+        message_thread_id=message_thread_id,
+        poll=poll,
+    )
+
+
+@pytest.mark.asyncio
+async def test_quick_poll_goes_to_every_chat_of_position(schema_db, message):
+    conn = sqlite3.connect(schema_db)
+    # Второй чат позиции — без темы (пустой thread_id)
+    conn.execute("INSERT INTO chats (chat_id, thread_id, position_id, chat_name) VALUES ('-300', '', 2, 'QB-2')")
+    conn.commit()
+    conn.close()
+    await reload_reference_data()
+
+    message.bot = MagicMock()
+    message.bot.send_poll = AsyncMock(side_effect=sent_poll)
+    message.bot.send_message = AsyncMock()
+
+    await quick_poll(message, "qb")
+
+    polled = sorted(c.kwargs["chat_id"] for c in message.bot.send_poll.call_args_list)
+    threads = {c.kwargs["chat_id"]: c.kwargs["message_thread_id"] for c in message.bot.send_poll.call_args_list}
+    assert threads == {'-100': 2, '-300': None}
+    mentioned = sorted({c.kwargs["chat_id"] for c in message.bot.send_message.call_args_list})
+    assert polled == ['-100', '-300']
+    assert mentioned == ['-100', '-300']
+    assert message.answer.call_args[0][0] == "Опрос для QB отправлен."
+
+    # Отправленные опросы записаны, чтобы к ним можно было привязать голоса
+    conn = sqlite3.connect(schema_db)
+    rows = conn.execute("SELECT poll_id, chat_id, thread_id, position_id, kind, options FROM polls ORDER BY poll_id").fetchall()
+    conn.close()
+    assert rows == [
+        ("poll-100", "-100", "2", 2, "training", '["Буду", "Не буду", "Тренер"]'),
+        ("poll-300", "-300", None, 2, "training", '["Буду", "Не буду", "Тренер"]'),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_quick_poll_records_polls_sent_before_a_failure(schema_db, message):
+    """Тест: если в один из чатов позиции опрос не ушёл, отправленные в остальные всё равно записываются."""
+    conn = sqlite3.connect(schema_db)
+    conn.execute("INSERT INTO chats (chat_id, thread_id, position_id, chat_name) VALUES ('-300', '7', 2, 'QB-2')")
+    conn.commit()
+    conn.close()
+    await reload_reference_data()
+
+    async def send_poll(chat_id, **kwargs):
+        if chat_id == '-300':
+            raise RuntimeError("Bad Request: chat not found")
+        return sent_poll(chat_id, **kwargs)
+
+    message.bot = MagicMock()
+    message.bot.send_poll = AsyncMock(side_effect=send_poll)
+    message.bot.send_message = AsyncMock()
+
+    await quick_poll(message, "qb")
+
+    conn = sqlite3.connect(schema_db)
+    rows = conn.execute("SELECT poll_id FROM polls").fetchall()
+    conn.close()
+    assert rows == [("poll-100",)]
+    assert {c.kwargs["chat_id"] for c in message.bot.send_message.call_args_list} == {'-100'}
+    assert message.answer.call_args[0][0] == "Опрос для QB отправлен."
+
+
+@pytest.mark.asyncio
+async def test_quick_poll_reports_failed_send(schema_db, message):
+    """Тест: если опрос не ушёл ни в один чат, тренер получает ответ об ошибке."""
+    message.bot = MagicMock()
+    message.bot.send_poll = AsyncMock(side_effect=RuntimeError("Bad Request: chat not found"))
+
+    await quick_poll(message, "qb")
+
+    assert message.answer.call_args[0][0] == "Не удалось отправить опрос для QB: Bad Request: chat not found"
+
+
+@pytest.mark.asyncio
+async def test_quick_poll_unknown_position(schema_db, message):
+    message.bot = MagicMock()
+    message.bot.send_poll = AsyncMock()
+
+    await quick_poll(message, "XX")
+
+    message.bot.send_poll.assert_not_called()
+    assert message.answer.call_args[0][0] == "Не удалось найти чат для топика XX."
+
+
+@pytest.mark.asyncio
+async def test_chat_choice_reads_chat_from_reference(schema_db, callback, state):
+    reference = await reload_reference_data()
+    await state.set_state(CreatePollStates.chat)
+
+    await process_chat_choice(callback, PollChatCallback(index=0, version=reference.version), state)
+
+    data = await state.get_data()
+    assert (data["chat_id"], data["thread_id"], data["chat_name"]) == (-100, 2, "QB")
+    assert await state.get_state() == CreatePollStates.notify_players.state
+
+
+@pytest.mark.asyncio
+async def test_chat_choice_from_stale_keyboard(schema_db, callback, state):
+    """
+    Тестируем, что кнопка из клавиатуры до /reload не выбирает чат,
+    а клавиатура заменяется актуальной.
+    """
+    reference = await reload_reference_data()
+    callback.message.edit_reply_markup = AsyncMock()
+    await state.set_state(CreatePollStates.chat)
+
+    await process_chat_choice(callback, PollChatCallback(index=0, version=reference.version - 1), state)
+
+    assert "обновился" in callback.answer.call_args[0][0]
+    keyboard = callback.message.edit_reply_markup.call_args[1]["reply_markup"]
+    assert keyboard.inline_keyboard[0][0].callback_data == PollChatCallback(index=0, version=reference.version).pack()
+    assert await state.get_state() == CreatePollStates.chat.state
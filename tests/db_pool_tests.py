@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from bot.config import DB_PRAGMA_PROFILES
+from bot.utils import db as db_module
+from bot.utils.db_pool import ConnectionPool, init_pool, close_pool, get_pool_stats
+
+
+@pytest.mark.asyncio
+async def test_db_functions_use_pool(temp_db):
+    """
+    Тестируем, что при открытом пуле функции db.py берут соединения из него,
+    а не открывают новые.
+    """
+    pool = await init_pool(temp_db, readers=2)
+    try:
+        roles = await db_module.get_user_role(123)
+        assert set(roles.split(', ')) == {'player', 'coach'}
+
+        positions = await db_module.get_positions()
+        assert positions == [(1, 'Rookie'), (2, 'QB'), (3, 'WR')]
+
+        await db_module.update_player_field(3, "name", "Тест")
+
+        stats = get_pool_stats()
+        assert stats["size"] == 2
+        assert stats["reads"] == 2
+        assert stats["writes"] == 1
+        assert stats["idle"] == 2
+        assert pool.serves(temp_db)
+    finally:
+        await close_pool()
+
+    assert get_pool_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_pool_readers_are_bounded(temp_db):
+    """
+    Тестируем ограничение пула: третий читатель ждёт, пока освободится соединение.
+    """
+    pool = ConnectionPool(temp_db, readers=2)
+    await pool.open()
+    try:
+        async def hold():
+            async with pool.reader():
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(hold(), hold(), hold())
+
+        stats = pool.stats()
+        assert stats["reads"] == 3
+        assert stats["read_wait_max_ms"] > 0
+        assert stats["idle"] == 2
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_readers_are_read_only(temp_db):
+    pool = ConnectionPool(temp_db, readers=1)
+    await pool.open()
+    try:
+        async with pool.reader() as db:
+            with pytest.raises(Exception):
+                await db.execute("DELETE FROM team")
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_applies_pragma_profile(temp_db):
+    """
+    Тестируем, что профиль PRAGMA применяется к каждому соединению пула.
+    """
+    pool = ConnectionPool(temp_db, readers=2, pragmas=DB_PRAGMA_PROFILES["wal"])
+    await pool.open()
+    try:
+        async with pool.reader() as db:
+            async with db.execute("PRAGMA journal_mode") as cursor:
+                assert (await cursor.fetchone())[0] == "wal"
+            async with db.execute("PRAGMA foreign_keys") as cursor:
+                assert (await cursor.fetchone())[0] == 1
+            async with db.execute("PRAGMA busy_timeout") as cursor:
+                assert (await cursor.fetchone())[0] == 5000
+
+        # В WAL читатель видит данные, пока писатель держит незавершённую транзакцию
+        async with pool.writer() as writer:
+            await writer.execute("UPDATE team SET name = 'Новое' WHERE id = 1")
+            async with pool.reader() as db:
+                async with db.execute("SELECT name FROM team WHERE id = 1") as cursor:
+                    assert (await cursor.fetchone())[0] is None
+            await writer.commit()
+    finally:
+        await pool.close()
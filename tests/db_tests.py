@@ -55,3 +55,52 @@ async def test_list_players(temp_db):
     # Проверяем конкретные значения (если мы вставляли их в фикстуре)
     assert players[0]["tg_id"] == 123
     assert players[1]["tg_id"] == 456
+
+@pytest.mark.asyncio
+async def test_get_user_roles_cached(temp_db):
+    """
+    Тестируем get_user_roles:
+    - Возвращает frozenset ролей
+    - Повторный запрос обслуживается кэшем
+    - insert_player и update_player_field сбрасывают кэш
+    """
+    cache = db_module.role_cache
+
+    assert await db_module.get_user_roles(123) == frozenset({'player', 'coach'})
+    assert await db_module.get_user_roles(123) == frozenset({'player', 'coach'})
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+    # Неизвестный пользователь тоже кэшируется
+    assert await db_module.get_user_roles(777) is None
+    assert 777 in cache
+
+    await db_module.insert_player({"name": "Новый", "surname": "Игрок", "tg_id": 777}, [1])
+    assert 777 not in cache
+    assert await db_module.get_user_roles(777) == frozenset({'player'})
+
+    await db_module.update_player_field(1, "tg_id", 321)
+    assert 123 not in cache
+    assert await db_module.get_user_roles(321) == frozenset({'player', 'coach'})
+
+@pytest.mark.asyncio
+async def test_get_player_by_id(temp_db):
+    """
+    Тестируем get_player_by_id / get_players_by_ids:
+    - Формат записи совпадает с list_players
+    - Несуществующий id -> None / отсутствует в результате
+    """
+    players = {p["id"]: p for p in await db_module.list_players(temp_db)}
+
+    player = await db_module.get_player_by_id(1)
+    assert player == players[1]
+    assert set(player["roles"].split(', ')) == {'player', 'coach'}
+
+    assert await db_module.get_player_by_id(999) is None
+
+    batch = await db_module.get_players_by_ids([4, 1, 999, 1])
+    assert set(batch) == {1, 4}
+    assert batch[4] == players[4]
+    assert batch[4]["position"] == 'WR'
+
+    assert await db_module.get_players_by_ids([]) == {}
@@ -0,0 +1,57 @@
+"""
+Тесты фабрики клавиатур (bot/utils/keyboards.py)
+"""
+import pytest
+from bot.utils.keyboards import (
+    build_position_edit_keyboard,
+    chats_keyboard,
+    position_edit_keyboard,
+    positions_keyboard,
+)
+from bot.utils.reference_data import ReferenceData, load_reference_data, reload_reference_data
+
+POSITIONS = [(1, "OL"), (2, "QB"), (3, "WR")]
+
+
+def callback_rows(keyboard):
+    return [[button.callback_data for button in row] for row in keyboard.inline_keyboard]
+
+
+def test_positions_keyboard_layout():
+    reference = ReferenceData(positions=POSITIONS, chats=[("-100", "2", "QB")], version=1)
+
+    assert callback_rows(positions_keyboard(reference)) == [
+        ["position:1"], ["position:2"], ["position:3"], ["cancel"]
+    ]
+    # По 2 кнопки в ряд, нечётная остаётся одна
+    assert callback_rows(position_edit_keyboard(reference)) == [
+        ["up:p:1", "up:p:2"], ["up:p:3"], ["up:bk:"]
+    ]
+    assert callback_rows(chats_keyboard(reference)) == [["pc:0:1"], ["cancel"]]
+
+
+def test_keyboard_is_built_once_per_version():
+    reference = ReferenceData(positions=POSITIONS, version=1)
+
+    assert positions_keyboard(reference) is positions_keyboard(reference)
+    assert position_edit_keyboard(reference) == build_position_edit_keyboard(POSITIONS)
+
+    # Новые справочники — новая клавиатура, даже с тем же номером версии
+    other = ReferenceData(positions=POSITIONS[:1], version=1)
+    assert callback_rows(positions_keyboard(other)) == [["position:1"], ["cancel"]]
+
+
+@pytest.mark.asyncio
+async def test_keyboard_rebuilt_after_reload(schema_db, monkeypatch):
+    from bot.utils import db as db_module
+    monkeypatch.setattr(db_module, "DB_PATH", schema_db)
+
+    reference = await load_reference_data(schema_db)
+    before = positions_keyboard(reference)
+    assert positions_keyboard(reference) is before
+
+    reloaded = await reload_reference_data()
+    assert reloaded.version == reference.version + 1
+    after = positions_keyboard(reloaded)
+    assert after is not before
+    assert after == before
@@ -27,7 +27,7 @@ async def test_show_all_coaches(roles, message, mock_db_functions, mock_role_fil
     # ========== ARRANGE (Подготовка) ==========
     # Настраиваем мок list_players
     mock_role_filter['get_user_role'].return_value = roles
-    mock_db_functions['list_players'].return_value = mock_players_data
+    mock_db_functions['roster'].extend(mock_players_data)
 
     # Команда без параметров
     message.text = "/coaches"
@@ -40,8 +40,8 @@ async def test_show_all_coaches(roles, message, mock_db_functions, mock_role_fil
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что list_players_page был вызван
+    mock_db_functions['list_players_page'].assert_called_once()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -93,8 +93,7 @@ async def test_show_coaches_empty_db(message, mock_db_functions):
 
     # ========== ARRANGE (Подготовка) ==========
 
-    # Мокаем пустую БД
-    mock_db_functions['list_players'].return_value = []
+    # Пустая БД: состав для мока list_players_page не заполняем
 
     # Команда без параметров
     message.text = "/coaches"
@@ -107,8 +106,8 @@ async def test_show_coaches_empty_db(message, mock_db_functions):
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что list_players_page был вызван
+    mock_db_functions['list_players_page'].assert_called_once()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -146,8 +145,8 @@ async def test_show_players_only_player_db(message, mock_db_functions):
         }
     ]
 
-    # Настраиваем мок list_players
-    mock_db_functions['list_players'].return_value = mock_players_data
+    # Заполняем состав для мока list_players_page
+    mock_db_functions['roster'].extend(mock_players_data)
 
     # Команда без параметров
     message.text = "/coaches"
@@ -160,8 +159,8 @@ async def test_show_players_only_player_db(message, mock_db_functions):
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что list_players_page был вызван
+    mock_db_functions['list_players_page'].assert_called_once()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -0,0 +1,227 @@
+"""
+Тесты постраничного вывода /players и /coaches (keyset-пагинация по (name, id))
+"""
+import re
+import sqlite3
+
+import pytest
+from bot.config import ROSTER_PAGE_SIZE
+from bot.handlers import list_players as list_players_module
+from bot.handlers.list_players import (
+    format_person_line,
+    roster_callback,
+    roster_page_callback,
+    show_coaches,
+    show_players,
+)
+from bot.utils import db as db_module
+from bot.utils.text_chunks import TELEGRAM_MESSAGE_LIMIT, telegram_len
+from tests.list_players_players import mock_players_data
+
+
+def expected_ids(db_file, role: str, position: str | None = None) -> list[int]:
+    """id людей с ролью (и позицией) в порядке (name, id) — как должен отдавать список."""
+    conn = sqlite3.connect(db_file)
+    query = """
+        SELECT t.id FROM team t
+        JOIN player_roles pr ON pr.player_id = t.id
+        JOIN roles r ON r.id = pr.role_id
+        LEFT JOIN positions p ON p.id = t.position_id
+        WHERE r.role = ? AND (? IS NULL OR p.position = ?)
+        ORDER BY t.name, t.id
+    """
+    ids = [row[0] for row in conn.execute(query, (role, position, position))]
+    conn.close()
+    return ids
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("role, position", [("player", None), ("coach", None), ("player", "QB")])
+async def test_pages_cover_roster_in_order(roster_db, role, position):
+    """
+    Тестируем, что проход по страницам вперёд выдаёт весь список ровно один раз
+    и в правильном порядке, а проход назад — те же страницы.
+    """
+    pages = []
+    after_id = None
+    while True:
+        page = await db_module.list_players_page(role, position=position, after_id=after_id, limit=50)
+        if not page:
+            break
+        pages.append([p["id"] for p in page])
+        after_id = page[-1]["id"]
+
+    assert [i for page in pages for i in page] == expected_ids(roster_db, role, position)
+
+    # Назад от первой записи последней страницы — предпоследняя страница
+    if len(pages) > 1:
+        previous = await db_module.list_players_page(role, position=position, before_id=pages[-1][0], limit=50)
+        assert [p["id"] for p in previous] == pages[-2]
+
+
+@pytest.mark.asyncio
+async def test_show_players_first_page_has_next_button(roster_db, message):
+    message.text = "/players"
+
+    await show_players(message)
+
+    text = message.answer.call_args[0][0]
+    keyboard = message.answer.call_args[1]["reply_markup"]
+    ids = expected_ids(roster_db, "player")
+
+    assert text.count("\n") > ROSTER_PAGE_SIZE
+    assert f"Показаны 1–{ROSTER_PAGE_SIZE}" in text
+    [button] = keyboard.inline_keyboard[0]
+    assert button.callback_data == roster_callback("players", None, "next", ids[ROSTER_PAGE_SIZE - 1], ROSTER_PAGE_SIZE)
+
+
+@pytest.mark.asyncio
+async def test_navigate_next_and_back(roster_db, callback):
+    ids = expected_ids(roster_db, "player", "QB")
+
+    callback.data = roster_callback("players", "QB", "next", ids[ROSTER_PAGE_SIZE - 1], ROSTER_PAGE_SIZE)
+    await roster_page_callback(callback)
+
+    text = callback.message.edit_text.call_args[0][0]
+    keyboard = callback.message.edit_text.call_args[1]["reply_markup"]
+    assert f"ID {ids[ROSTER_PAGE_SIZE]} " in text
+    assert f"{ROSTER_PAGE_SIZE + 1}. " in text
+    back, forward = keyboard.inline_keyboard[0]
+    assert back.callback_data == roster_callback("players", "QB", "prev", ids[ROSTER_PAGE_SIZE], ROSTER_PAGE_SIZE + 1)
+    callback.answer.assert_called_once()
+
+    callback.data = back.callback_data
+    await roster_page_callback(callback)
+
+    text = callback.message.edit_text.call_args[0][0]
+    keyboard = callback.message.edit_text.call_args[1]["reply_markup"]
+    assert f"ID {ids[0]} " in text
+    assert f"ID {ids[ROSTER_PAGE_SIZE]} " not in text
+    # На первой странице кнопки «назад» нет
+    [forward] = keyboard.inline_keyboard[0]
+    assert forward.text.startswith("Вперёд")
+
+
+@pytest.mark.asyncio
+async def test_small_roster_has_no_keyboard(schema_db, message):
+    message.text = "/coaches"
+
+    await show_coaches(message)
+
+    # В schema_db тренер только один — дефолтный администратор
+    assert "Список тренеров" in message.answer.call_args[0][0]
+    assert message.answer.call_args[1]["reply_markup"] is None
+
+
+@pytest.mark.asyncio
+async def test_navigate_from_deleted_cursor(roster_db, callback):
+    conn = sqlite3.connect(roster_db)
+    conn.execute("DELETE FROM team WHERE id = 5")
+    conn.commit()
+    conn.close()
+
+    callback.data = roster_callback("players", None, "next", 5, 21)
+    await roster_page_callback(callback)
+
+    callback.message.edit_text.assert_not_called()
+    assert "Список изменился" in callback.answer.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_unpaged_roster_is_split_across_messages(roster_db, message, monkeypatch):
+    """
+    Тестируем вывод без пагинации (ROSTER_PAGE_SIZE=0): весь список уходит
+    несколькими сообщениями, каждое в пределах лимита, строки не разрезаны.
+    """
+    monkeypatch.setattr(list_players_module, "ROSTER_PAGE_SIZE", 0)
+    message.text = "/players"
+
+    await show_players(message)
+
+    texts = [c[0][0] for c in message.answer.call_args_list]
+    ids = expected_ids(roster_db, "player")
+    assert len(texts) > 1
+    assert all(telegram_len(t) <= TELEGRAM_MESSAGE_LIMIT for t in texts)
+    assert all(t.count("<b>") == t.count("</b>") for t in texts)
+    assert [int(i) for t in texts for i in re.findall(r"-- ID (\d+) ", t)] == ids
+
+
+@pytest.mark.asyncio
+async def test_page_is_trimmed_to_message_limit(roster_db, message, callback, monkeypatch):
+    """
+    Тестируем, что страница, которая не помещается в одно сообщение,
+    обрезается по целой строке, а «вперёд» продолжает с первой непоказанной.
+    """
+    monkeypatch.setattr(list_players_module, "ROSTER_PAGE_SIZE", 200)
+    message.text = "/players"
+
+    await show_players(message)
+
+    text = message.answer.call_args[0][0]
+    shown = [int(i) for i in re.findall(r"-- ID (\d+) ", text)]
+    ids = expected_ids(roster_db, "player")
+    assert telegram_len(text) <= TELEGRAM_MESSAGE_LIMIT
+    assert 0 < len(shown) < 200
+    assert shown == ids[:len(shown)]
+
+    [forward] = message.answer.call_args[1]["reply_markup"].inline_keyboard[0]
+    callback.data = forward.callback_data
+    await roster_page_callback(callback)
+
+    text = callback.message.edit_text.call_args[0][0]
+    following = [int(i) for i in re.findall(r"-- ID (\d+) ", text)]
+    assert telegram_len(text) <= TELEGRAM_MESSAGE_LIMIT
+    assert following == ids[len(shown):len(shown) + len(following)]
+    assert f"{len(shown) + 1}. " in text
+
+
+def test_person_line_escapes_html():
+    person = {"id": 1, "name": "<Иван>", "surname": "Б&Б", "tg_username": None,
+              "position": "QB", "number": "1", "status": "active"}
+
+    line = format_person_line(person, 1)
+
+    assert "<b>&lt;Иван&gt; Б&amp;Б</b>" in line
+
+
+@pytest.mark.asyncio
+async def test_repeated_request_is_served_from_cache(message, mock_db_functions):
+    """
+    Тестируем, что повторный /players QB до изменения состава
+    не обращается к БД, а после изменения — строит список заново.
+    """
+    mock_db_functions['roster'].extend(mock_players_data)
+    message.text = "/players qb"
+
+    await show_players(message)
+    await show_players(message)
+
+    assert mock_db_functions['list_players_page'].call_count == 1
+    assert mock_db_functions['get_reference_data'].call_count == 1
+    first, second = message.answer.call_args_list
+    assert first == second
+
+    db_module.notify_roster_changed()
+    await show_players(message)
+
+    assert mock_db_functions['list_players_page'].call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_page_callback_is_cached_until_roster_changes(roster_db, callback):
+    ids = expected_ids(roster_db, "player")
+    callback.data = roster_callback("players", None, "next", ids[ROSTER_PAGE_SIZE - 1], ROSTER_PAGE_SIZE)
+
+    await roster_page_callback(callback)
+    cached = list_players_module.roster_cache.stats()["hits"]
+    await roster_page_callback(callback)
+
+    assert list_players_module.roster_cache.stats()["hits"] == cached + 1
+    first, second = callback.message.edit_text.call_args_list
+    assert first == second
+
+    # Изменение через db.py сбрасывает кэш: новое имя видно сразу
+    await db_module.update_player_field(ids[ROSTER_PAGE_SIZE], "surname", "Обновлённый")
+    await roster_page_callback(callback)
+
+    assert "Обновлённый" in callback.message.edit_text.call_args[0][0]
@@ -69,7 +69,7 @@ async def test_show_all_players(roles, message, mock_db_functions,mock_role_filt
     # ========== ARRANGE (Подготовка) ==========
     # Настраиваем мок list_players
     mock_role_filter['get_user_role'].return_value = roles
-    mock_db_functions['list_players'].return_value = mock_players_data
+    mock_db_functions['roster'].extend(mock_players_data)
 
     # Команда без параметров
     message.text = "/players"
@@ -82,8 +82,8 @@ async def test_show_all_players(roles, message, mock_db_functions,mock_role_filt
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что list_players_page был вызван
+    mock_db_functions['list_players_page'].assert_called_once()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -142,8 +142,7 @@ async def test_show_players_empty_db(message, mock_db_functions):
 
     # ========== ARRANGE (Подготовка) ==========
 
-    # Мокаем пустую БД
-    mock_db_functions['list_players'].return_value = []
+    # Пустая БД: состав для мока list_players_page не заполняем
 
     # Команда без параметров
     message.text = "/players"
@@ -156,8 +155,8 @@ async def test_show_players_empty_db(message, mock_db_functions):
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что list_players_page был вызван
+    mock_db_functions['list_players_page'].assert_called_once()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -195,8 +194,8 @@ async def test_show_players_only_coach_db(message, mock_db_functions):
         }
     ]
 
-    # Настраиваем мок list_players
-    mock_db_functions['list_players'].return_value = mock_players_data
+    # Заполняем состав для мока list_players_page
+    mock_db_functions['roster'].extend(mock_players_data)
 
     # Команда без параметров
     message.text = "/players"
@@ -209,8 +208,8 @@ async def test_show_players_only_coach_db(message, mock_db_functions):
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что list_players_page был вызван
+    mock_db_functions['list_players_page'].assert_called_once()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -240,8 +239,8 @@ async def test_show_all_players_with_args(command_text, message, mock_db_functio
     """
 
     # ========== ARRANGE (Подготовка) ==========
-    # Настраиваем мок list_players
-    mock_db_functions['list_players'].return_value = mock_players_data
+    # Заполняем состав для мока list_players_page
+    mock_db_functions['roster'].extend(mock_players_data)
 
     # Команда без параметров
     message.text = command_text
@@ -254,8 +253,8 @@ async def test_show_all_players_with_args(command_text, message, mock_db_functio
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что list_players_page был вызван
+    mock_db_functions['list_players_page'].assert_called_once()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -315,8 +314,8 @@ async def test_show_all_players_with_invalid_args(message, mock_db_functions):
     """
 
     # ========== ACT (Действие) ==========
-    # Настраиваем мок list_players
-    mock_db_functions['list_players'].return_value = mock_players_data
+    # Заполняем состав для мока list_players_page
+    mock_db_functions['roster'].extend(mock_players_data)
 
     # Команда с нвеерным параметром
     message.text = "/players ABC"
@@ -327,8 +326,8 @@ async def test_show_all_players_with_invalid_args(message, mock_db_functions):
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что до БД дело не дошло: позиция отклонена сразу
+    mock_db_functions['list_players_page'].assert_not_called()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -352,8 +351,8 @@ async def test_show_players_with_args_zero_OL(message, mock_db_functions):
     """
 
     # ========== ARRANGE (Подготовка) ==========
-    # Настраиваем мок list_players
-    mock_db_functions['list_players'].return_value = mock_players_data
+    # Заполняем состав для мока list_players_page
+    mock_db_functions['roster'].extend(mock_players_data)
 
     # Команда без параметров
     message.text = "/players OL"
@@ -365,8 +364,8 @@ async def test_show_players_with_args_zero_OL(message, mock_db_functions):
 
     # ========== ASSERT (Проверка) ==========
 
-    # 1. Проверяем, что list_players был вызван
-    mock_db_functions['list_players'].assert_called_once()
+    # 1. Проверяем, что list_players_page был вызван
+    mock_db_functions['list_players_page'].assert_called_once()
 
     # 2. Проверяем, что message.answer был вызван один раз
     message.answer.assert_called_once()
@@ -375,4 +374,14 @@ async def test_show_players_with_args_zero_OL(message, mock_db_functions):
     response_text = message.answer.call_args[0][0]
 
     # 4. Проверяем точное сообщение
-    assert response_text == "📭 Игроков с такой позицией не найдено."
\ No newline at end of file
+    assert response_text == "📭 Игроков с такой позицией не найдено."
+
+@pytest.mark.asyncio
+async def test_invalid_position_lists_names_from_db(schema_db, message):
+    """Тест: в подсказке позиции названы так, как записаны в БД (Rookie, а не ROOKIE)."""
+    message.text = "/players ABC"
+
+    await show_players(message)
+
+    response_text = message.answer.call_args[0][0]
+    assert "Выберите из списка: OL, QB, RB, TE, WR, DL, LB, CB, Rookie\n" in response_text
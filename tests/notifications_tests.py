@@ -0,0 +1,108 @@
+"""
+Тесты для упаковки упоминаний в сообщения
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from bot.utils import db as db_module
+from bot.utils.notifications import (
+    MENTIONS_PREFIX,
+    build_players_mention_list,
+    pack_mentions,
+    send_mentions_in_batches,
+)
+from bot.utils.text_chunks import TELEGRAM_MESSAGE_LIMIT, pack_parts, split_parts, telegram_len
+
+
+def test_roster_of_60_fits_one_message():
+    mentions = [f"@player_{i}" for i in range(60)]
+
+    messages = pack_mentions(mentions)
+
+    assert len(messages) == 1
+    assert messages[0].startswith(MENTIONS_PREFIX)
+    assert all(m in messages[0] for m in mentions)
+
+
+def test_pack_respects_length_limit():
+    mentions = [f'<a href="tg://user?id={1000000000 + i}">Игрок Номер{i}</a>' for i in range(90)]
+
+    messages = pack_mentions(mentions)
+
+    assert len(messages) > 1
+    assert all(telegram_len(m) <= TELEGRAM_MESSAGE_LIMIT for m in messages)
+    # Ни одно упоминание не разрезано и не потеряно
+    assert sum(m.count("<a href=") for m in messages) == 90
+    assert sum(m.count("</a>") for m in messages) == 90
+    assert all(m.endswith("</a>") for m in messages)
+
+
+def test_pack_respects_entity_limit_and_batch_size():
+    mentions = [f"@u{i}" for i in range(250)]
+
+    assert len(pack_mentions(mentions)) == 3
+    assert len(pack_mentions(mentions, batch_size=8)) == 32
+
+
+def test_pack_parts_counts_utf16():
+    # Эмодзи занимает 2 code units
+    assert telegram_len("✅") == 1
+    assert telegram_len("🤕") == 2
+    assert pack_parts(["🤕" * 3, "🤕" * 3], limit=10) == ["🤕" * 3, "🤕" * 3]
+    assert pack_parts([], prefix="x") == []
+
+
+@pytest.mark.asyncio
+async def test_send_mentions_uses_minimal_number_of_messages():
+    bot = AsyncMock()
+    mentions = [f"@player_{i}" for i in range(60)]
+
+    await send_mentions_in_batches(bot, chat_id=-100, thread_id=2, mentions=mentions)
+
+    bot.send_message.assert_awaited_once()
+    kwargs = bot.send_message.call_args.kwargs
+    assert kwargs["message_thread_id"] == 2
+    assert kwargs["parse_mode"] == "HTML"
+
+
+@pytest.mark.asyncio
+async def test_build_mention_list_filters_in_sql_and_caches(temp_db):
+    """
+    Тест: упоминания строятся только по активным игрокам позиции,
+    повторный вызов обслуживается кэшем, запись в состав сбрасывает кэш.
+    """
+    with patch('bot.utils.notifications.list_mention_targets', wraps=db_module.list_mention_targets) as spy:
+        # В temp_db на позиции QB один игрок без имени и контактов
+        mentions = await build_players_mention_list(position="QB")
+        assert mentions == [""]
+        await build_players_mention_list(position="QB")
+        assert spy.await_count == 1
+
+        await db_module.insert_player(
+            {"name": "Иван", "surname": "Петров", "tg_username": "ivan_qb", "position_id": 2}, [1]
+        )
+        mentions = await build_players_mention_list(position="QB")
+        assert spy.await_count == 2
+        assert "@ivan_qb" in mentions
+
+        # Игрок другой позиции не попадает в список
+        await db_module.insert_player(
+            {"name": "Пётр", "surname": "Сидоров", "tg_username": "petr_wr", "position_id": 3}, [1]
+        )
+        mentions = await build_players_mention_list(position="QB")
+        assert "@petr_wr" not in mentions
+
+
+def test_split_parts_is_streaming():
+    """
+    Тестируем, что группа отдаётся сразу после заполнения,
+    не дожидаясь, пока будет прочитан весь источник частей.
+    """
+    def parts():
+        yield "a" * 6
+        yield "b" * 6
+        raise AssertionError("источник прочитан дальше, чем нужно")
+
+    groups = split_parts(parts(), limit=10)
+
+    assert next(groups) == ["a" * 6]
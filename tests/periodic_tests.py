@@ -0,0 +1,33 @@
+"""
+Тесты фоновых задач с фиксированным интервалом (bot/utils/periodic.py)
+"""
+import asyncio
+
+import pytest
+
+from bot.utils.periodic import PeriodicJob
+
+
+@pytest.mark.asyncio
+async def test_job_repeats_after_errors_until_closed():
+    """Тест: задача запускается сразу, ошибка одного запуска не останавливает следующие, close() останавливает."""
+    calls = []
+
+    async def job(bot):
+        calls.append(bot)
+        if len(calls) == 1:
+            raise RuntimeError("Bad Request")
+
+    periodic = PeriodicJob("test", job, interval=0.01)
+    periodic.start("bot")
+    periodic.start("bot")  # повторный старт не создаёт вторую задачу
+    for _ in range(50):
+        if len(calls) >= 3:
+            break
+        await asyncio.sleep(0.01)
+    await periodic.close()
+
+    assert calls[:3] == ["bot", "bot", "bot"]
+    stopped = len(calls)
+    await asyncio.sleep(0.05)
+    assert len(calls) == stopped
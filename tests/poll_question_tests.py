@@ -0,0 +1,87 @@
+"""
+Тесты расписания тренировок (TrainingCalendar) и вопроса опроса на тренировку
+"""
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from bot.utils.poll_question import MSK, TrainingCalendar, get_training_poll_question, next_training
+from bot.utils.reference_data import reload_reference_data
+
+QB, WR = 2, 5
+DEFAULT_RULES = [(2, "20:30", None), (6, "17:15", None)]
+
+
+def msk(day: int, hour: int, minute: int = 0, month: int = 6) -> datetime:
+    return datetime(2025, month, day, hour, minute, tzinfo=MSK)
+
+
+@pytest.mark.parametrize("now, expected", [
+    (msk(2, 10), msk(4, 20, 30)),       # понедельник -> среда
+    (msk(4, 20, 50), msk(4, 20, 30)),   # тренировка идёт меньше получаса — опрос ещё на неё
+    (msk(4, 21, 10), msk(8, 17, 15)),   # после среды -> воскресенье
+    (msk(8, 18, 0), msk(11, 20, 30)),   # после воскресенья -> следующая среда
+])
+def test_default_schedule(now, expected):
+    assert next_training(now) == expected
+
+
+def test_question_text():
+    assert get_training_poll_question("QB", msk(4, 20, 30)) == "Тренировка в среду 04.06.2025 в 20:30 QB"
+    assert get_training_poll_question("OL", msk(8, 17, 15)) == "Тренировка в воскресенье 08.06.2025 в 17:15 OL"
+    assert get_training_poll_question("WR", msk(6, 19, 0)) == "Тренировка в пятницу 06.06.2025 в 19:00 WR"
+
+
+def test_position_overrides_and_exceptions():
+    calendar = TrainingCalendar(
+        DEFAULT_RULES + [(4, "19:00", WR)],
+        [
+            ("2025-06-04", None, None),        # праздник: в среду тренировок нет
+            ("2025-06-08", QB, "12:00"),       # QB в воскресенье тренируется днём
+        ],
+        start=date(2025, 6, 1),
+    )
+
+    assert calendar.next_session(None, msk(2, 10)) == msk(8, 17, 15)
+    assert calendar.next_session(QB, msk(2, 10)) == msk(8, 12, 0)
+    # У WR своё расписание вместо общего
+    assert calendar.next_session(WR, msk(2, 10)) == msk(6, 19, 0)
+    assert calendar.next_session(WR, msk(7, 10)) == msk(13, 19, 0)
+
+
+def test_lookup_outside_precomputed_window():
+    calendar = TrainingCalendar(DEFAULT_RULES, start=date(2025, 6, 1), horizon_days=14)
+
+    assert calendar.next_session(None, msk(14, 22)) == msk(15, 17, 15)
+    assert calendar.next_session(None, msk(1, 10, month=9)) == msk(3, 20, 30, month=9)
+    assert calendar.start == date(2025, 9, 1)
+    assert TrainingCalendar([], start=date(2025, 6, 1)).next_session(None, msk(2, 10)) is None
+
+
+def test_invalid_time_is_skipped():
+    calendar = TrainingCalendar([(2, "20:30", None), (3, "25:99", None)], start=date(2025, 6, 1))
+
+    assert calendar.rules == [(2, "20:30", None)]
+
+
+@pytest.mark.asyncio
+async def test_schedule_is_loaded_from_db(schema_db):
+    """
+    Тест: расписание читается из таблиц trainings / training_exceptions
+    и меняется без деплоя — правкой в БД и /reload.
+    """
+    reference = await reload_reference_data()
+    assert sorted(reference.calendar.rules) == DEFAULT_RULES
+
+    conn = sqlite3.connect(schema_db)
+    conn.execute("INSERT INTO trainings (weekday, time, position_id) VALUES (1, '19:30', ?)", (QB,))
+    conn.execute("INSERT INTO training_exceptions (date, time, note) VALUES ('2999-01-01', NULL, 'Новый год')")
+    conn.commit()
+    conn.close()
+
+    reference = await reload_reference_data()
+    tuesday = reference.calendar.next_session(QB)
+    assert (tuesday.weekday(), tuesday.hour, tuesday.minute) == (1, 19, 30)
+    assert reference.calendar.next_session(None).weekday() in (2, 6)
+    assert len(reference.calendar.exceptions) == 1
@@ -0,0 +1,123 @@
+"""
+Тесты опросов по расписанию (bot/utils/poll_scheduler.py) и команды /schedule
+"""
+import asyncio
+import sqlite3
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiogram.filters import CommandObject
+
+from bot.handlers.schedule import manage_schedule
+from bot.utils.db import add_poll_schedule, list_poll_schedule
+from bot.utils.poll_question import MSK
+from bot.utils.poll_scheduler import CronRule, run_due_schedules
+from tests.create_poll_tests import sent_poll
+
+QB = 2
+MONDAY_NOON = datetime(2025, 6, 2, 12, 0, tzinfo=MSK)
+
+
+def at(day: int, hour: int, minute: int = 0) -> float:
+    return datetime(2025, 6, day, hour, minute, tzinfo=MSK).timestamp()
+
+
+def polling_bot() -> MagicMock:
+    bot = MagicMock()
+    bot.send_poll = AsyncMock(side_effect=sent_poll)
+    bot.send_message = AsyncMock()
+    return bot
+
+
+def test_cron_next_after():
+    rule = CronRule.parse("0 12 * * 1")
+    assert rule.next_after(MONDAY_NOON) == datetime(2025, 6, 9, 12, 0, tzinfo=MSK)
+
+    rule = CronRule.parse("*/20 9-10 * * 0,7")
+    assert rule.weekdays == (0,)
+    assert rule.next_after(MONDAY_NOON) == datetime(2025, 6, 8, 9, 0, tzinfo=MSK)
+    assert rule.next_after(datetime(2025, 6, 8, 10, 20, tzinfo=MSK)) == datetime(2025, 6, 8, 10, 40, tzinfo=MSK)
+
+    # День месяца и день недели: достаточно любого (как в cron)
+    rule = CronRule.parse("0 8 1 * 5")
+    assert rule.next_after(MONDAY_NOON) == datetime(2025, 6, 6, 8, 0, tzinfo=MSK)
+
+    assert CronRule.parse("0 0 30 2 *").next_after(MONDAY_NOON) is None
+
+
+@pytest.mark.parametrize("expr", ["0 12 * *", "60 12 * * 1", "0 12 * * 8", "0 x * * *", "0 12 5-1 * *"])
+def test_cron_rejects_invalid(expr):
+    with pytest.raises(ValueError):
+        CronRule.parse(expr)
+
+
+@pytest.mark.asyncio
+async def test_missed_run_is_caught_up_once(schema_db):
+    """
+    Тест: срабатывание, пропущенное пока бот был выключен, отправляется после старта
+    один раз — в том числе при двух одновременных проверках.
+    """
+    await add_poll_schedule("0 12 * * 1", QB, at(2, 10))
+    bot = polling_bot()
+
+    assert await run_due_schedules(bot, now=at(2, 11, 59)) == 0
+    fired = await asyncio.gather(
+        run_due_schedules(bot, now=at(2, 13)),
+        run_due_schedules(bot, now=at(2, 13)),
+    )
+    assert sorted(fired) == [0, 1]
+    assert await run_due_schedules(bot, now=at(2, 14)) == 0
+
+    bot.send_poll.assert_awaited_once()
+    # Опрос в понедельник — на ближайшую тренировку, в среду
+    assert bot.send_poll.call_args.kwargs["question"] == "Тренировка в среду 04.06.2025 в 20:30 QB"
+    assert (await list_poll_schedule())[0][3] == MONDAY_NOON.timestamp()
+
+    conn = sqlite3.connect(schema_db)
+    rows = conn.execute("SELECT kind, position_id, training_at FROM polls").fetchall()
+    conn.close()
+    assert rows == [("training", QB, at(4, 20, 30))]
+
+
+@pytest.mark.asyncio
+async def test_stale_run_is_not_sent(schema_db):
+    await add_poll_schedule("0 12 * * 1", None, at(1, 0))
+    bot = polling_bot()
+
+    # Бот был выключен больше окна догона
+    assert await run_due_schedules(bot, now=at(3, 12)) == 0
+    bot.send_poll.assert_not_called()
+
+    # Следующее срабатывание уходит во все позиции с чатами (в schema_db — только QB)
+    assert await run_due_schedules(bot, now=at(9, 12, 1)) == 1
+    assert [c.kwargs["chat_id"] for c in bot.send_poll.call_args_list] == ["-100"]
+
+
+@pytest.mark.asyncio
+async def test_failed_rule_does_not_stop_others(schema_db):
+    """Тест: сбой отправки по одному правилу и некорректное правило не мешают остальным."""
+    await add_poll_schedule("0 12 * * 1", QB, at(2, 10))
+    await add_poll_schedule("0 12 * * 8", QB, at(2, 10))
+    await add_poll_schedule("0 12 * * 1", QB, at(2, 10))
+    sends = AsyncMock(side_effect=[RuntimeError("Bad Request"), []])
+
+    with patch("bot.utils.poll_scheduler.send_training_polls", sends):
+        assert await run_due_schedules(MagicMock(), now=at(2, 13)) == 2
+
+    assert sends.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_schedule_command(schema_db, message):
+    await manage_schedule(message, CommandObject(command="schedule", args="add 0 12 * * 1 qb"))
+    assert message.answer.call_args[0][0].startswith("✅ Правило #1 добавлено")
+
+    await manage_schedule(message, CommandObject(command="schedule", args="add 0 25 * * 1"))
+    assert "Некорректное cron-выражение" in message.answer.call_args[0][0]
+
+    await manage_schedule(message, CommandObject(command="schedule"))
+    assert "#1: 0 12 * * 1 — QB, следующий:" in message.answer.call_args[0][0]
+
+    await manage_schedule(message, CommandObject(command="schedule", args="del 1"))
+    assert await list_poll_schedule() == []
@@ -0,0 +1,120 @@
+"""
+Тесты планов запросов: каждый точечный запрос из bot/utils/db.py
+должен использовать индекс, а не полный просмотр таблицы (SCAN).
+"""
+import re
+import sqlite3
+
+import pytest
+import pytest_asyncio
+from bot.utils import db as db_module
+from bot.utils.db_pool import init_pool, close_pool
+from data.create_team_table import MIGRATIONS, migrate
+
+# SCAN без индекса: "SCAN t" (но не "SCAN t USING INDEX ...")
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?! USING (COVERING )?INDEX)")
+
+
+@pytest_asyncio.fixture
+async def traced(schema_db):
+    """Пул к schema_db, записывающий все выполненные SQL-запросы."""
+    statements: list[str] = []
+
+    async def on_connect(db):
+        await db.set_trace_callback(statements.append)
+
+    await init_pool(schema_db, readers=1, on_connect=on_connect)
+    try:
+        yield statements
+    finally:
+        await close_pool()
+
+
+def full_scans(db_file, statements: list[str]) -> list[tuple[str, str]]:
+    """Возвращает пары (запрос, строка плана) для всех полных просмотров таблиц."""
+    conn = sqlite3.connect(db_file)
+    scans = []
+    try:
+        for sql in statements:
+            if not sql.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+                continue
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+                detail = row[-1]
+                if FULL_SCAN.match(detail):
+                    scans.append((" ".join(sql.split()), detail))
+    finally:
+        conn.close()
+    return scans
+
+
+@pytest.mark.asyncio
+async def test_migrations_are_idempotent(schema_db):
+    latest = MIGRATIONS[-1][0]
+    assert await migrate(schema_db) == latest
+    assert await migrate(schema_db) == latest
+
+    conn = sqlite3.connect(schema_db)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    assert {
+        "idx_team_tg_username",
+        "idx_team_status",
+        "idx_player_roles_role",
+        "idx_chats_position",
+        "idx_team_position_status",
+        "idx_team_name",
+        "idx_team_position_name",
+        "idx_polls_kind_created",
+        "idx_poll_votes_tg_id",
+        "idx_polls_reminder",
+        "idx_training_exceptions_date",
+    } <= indexes
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("call", [
+    lambda: db_module.get_user_role(1001),
+    lambda: db_module.get_player_by_id(3),
+    lambda: db_module.get_players_by_ids([1, 2, 3]),
+    lambda: db_module.get_chat_by_position("QB"),
+    lambda: db_module.list_players(only_active=True),
+    lambda: db_module.list_mention_targets("QB"),
+    lambda: db_module.list_players_page("player", after_id=10),
+    lambda: db_module.list_players_page("coach", "QB", before_id=10),
+    lambda: db_module.insert_player({"name": "Новый", "surname": "Игрок", "tg_username": "user7"}, [3]),
+    lambda: db_module.update_player_field(3, "number", "12"),
+    lambda: db_module.get_poll_votes("p1"),
+    lambda: db_module.list_training_polls(),
+    lambda: db_module.list_training_votes(),
+    lambda: db_module.list_role_members("player"),
+    lambda: db_module.list_due_reminders(0.0, 3600.0, 3600.0),
+    lambda: db_module.mark_polls_reminded(["p1", "p2"], 0.0),
+    lambda: db_module.list_poll_voters(["p1", "p2"]),
+    lambda: db_module.claim_schedule_run(1, 0.0, 60.0),
+    lambda: db_module.get_training_exceptions("2025-06-01"),
+], ids=[
+    "get_user_role",
+    "get_player_by_id",
+    "get_players_by_ids",
+    "get_chat_by_position",
+    "list_players_active",
+    "list_mention_targets",
+    "list_players_page_next",
+    "list_players_page_prev",
+    "insert_player",
+    "update_player_field",
+    "get_poll_votes",
+    "list_training_polls",
+    "list_training_votes",
+    "list_role_members",
+    "list_due_reminders",
+    "mark_polls_reminded",
+    "list_poll_voters",
+    "claim_schedule_run",
+    "get_training_exceptions",
+])
+async def test_query_uses_index(call, traced, schema_db):
+    await call()
+
+    assert traced, "запросы не были выполнены через пул"
+    assert full_scans(schema_db, traced) == []
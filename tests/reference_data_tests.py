@@ -0,0 +1,72 @@
+"""
+Тесты справочников позиций и чатов в памяти (bot/utils/reference_data.py)
+"""
+import sqlite3
+
+import pytest
+from bot.handlers.reload_reference import reload_reference
+from bot.utils import db as db_module
+from bot.utils.db_pool import init_pool, close_pool
+from bot.utils.reference_data import get_reference_data, load_reference_data
+
+
+@pytest.mark.asyncio
+async def test_reference_data_indexes(schema_db):
+    reference = await load_reference_data(schema_db)
+
+    assert reference.positions[:2] == [(1, 'OL'), (2, 'QB')]
+    assert reference.position_names[9] == 'Rookie'
+    assert reference.position_ids['ROOKIE'] == 9
+    # Позиция ищется без учёта регистра, а возвращается как записана в БД
+    assert reference.position_name('rookie') == 'Rookie'
+    assert reference.position_name('XX') is None
+    assert reference.chats == [('-100', '2', 'QB')]
+    assert reference.routes == {'QB': [('-100', '2')]}
+    assert reference.chats_for('qb') == [('-100', '2')]
+    assert reference.chats_for('WR') == []
+
+
+@pytest.mark.asyncio
+async def test_reference_data_is_served_from_memory(schema_db):
+    """
+    Тестируем, что после загрузки справочники отдаются без запросов к БД.
+    """
+    statements: list[str] = []
+
+    async def on_connect(db):
+        await db.set_trace_callback(statements.append)
+
+    await init_pool(schema_db, readers=1, on_connect=on_connect)
+    try:
+        first = await get_reference_data()
+        loaded = len(statements)
+        for _ in range(10):
+            assert await get_reference_data() is first
+    finally:
+        await close_pool()
+
+    assert loaded > 0
+    assert len(statements) == loaded
+
+
+@pytest.mark.asyncio
+async def test_reload_picks_up_admin_edits(schema_db, message):
+    reference = await get_reference_data()
+    roster_version = db_module.roster_version()
+
+    conn = sqlite3.connect(schema_db)
+    conn.execute("INSERT INTO chats (chat_id, thread_id, position_id, chat_name) VALUES ('-200', '5', 5, 'WR')")
+    conn.commit()
+    conn.close()
+
+    # Без перезагрузки справочник не меняется
+    assert (await get_reference_data()).chats_for('WR') == []
+
+    await reload_reference(message)
+
+    reloaded = await get_reference_data()
+    assert reloaded.chats_for('WR') == [('-200', '5')]
+    assert reloaded.version == reference.version + 1
+    # Готовые списки состава с названиями позиций тоже сбрасываются
+    assert db_module.roster_version() == roster_version + 1
+    assert "чатов — 2" in message.answer.call_args[0][0]
@@ -0,0 +1,132 @@
+"""
+Тесты напоминаний не проголосовавшим (bot/utils/reminders.py)
+"""
+from unittest.mock import AsyncMock
+
+import pytest
+
+from bot.utils.db import save_poll_votes, save_polls
+from bot.utils.reminders import REMINDER_PREFIX, non_voters, send_due_reminders
+from bot.utils.vote_writer import VoteWriter
+
+QB = 2
+# Активные QB в schema_db: игроки с номерами i % 9 == 1
+QB_TG_IDS = [1001, 1010, 1019, 1028, 1037, 1046]
+NOW = 1_750_000_000.0
+
+
+def training_poll(
+        poll_id: str,
+        chat_id: str,
+        training_at: float,
+        position_id: int = QB,
+        created_at: float = NOW - 24 * 3600,
+        thread_id: str | None = "2"
+) -> tuple:
+    return (poll_id, chat_id, thread_id, 1, position_id, "training", "Тренировка", "[]", created_at, training_at)
+
+
+def sent_texts(bot) -> dict[int, str]:
+    return {int(call.kwargs["chat_id"]): call.kwargs["text"] for call in bot.send_message.call_args_list}
+
+
+def test_non_voters_keeps_roster_order():
+    roster = {1: "@a", 2: "@b", 3: "@c"}
+
+    assert non_voters(roster, {2, 99}) == ["@a", "@c"]
+
+
+@pytest.mark.asyncio
+async def test_reminds_only_non_voters_once(schema_db):
+    """
+    Тест: голос в любом из опросов тренировки (в разных чатах позиции) засчитывается,
+    ещё не записанные голоса VoteWriter учитываются, напоминание уходит один раз.
+    """
+    await save_polls([
+        training_poll("qb-a", "-100", NOW + 3600),
+        training_poll("qb-b", "-200", NOW + 3600),
+    ])
+    await save_poll_votes([("qb-a", 1001, 0, NOW), ("qb-b", 1010, 1, NOW), ("qb-a", 1028, 0, NOW)], [])
+    writer = VoteWriter(flush_interval=60)
+    await writer.record("qb-b", 1019, [2])
+    await writer.record("qb-a", 1028, [])  # отозвал голос, удаление ещё не записано
+    bot = AsyncMock()
+
+    assert await send_due_reminders(bot, now=NOW, writer=writer) == 3
+
+    texts = sent_texts(bot)
+    assert set(texts) == {-100, -200}
+    for text in texts.values():
+        assert text.startswith(REMINDER_PREFIX)
+        assert text[len(REMINDER_PREFIX):].split() == ["@user28", "@user37", "@user46"]
+
+    bot.send_message.reset_mock()
+    assert await send_due_reminders(bot, now=NOW + 60, writer=writer) == 0
+    bot.send_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reminds_only_inside_window(schema_db):
+    await save_polls([
+        training_poll("soon", "-100", NOW + 3600),
+        training_poll("later", "-100", NOW + 24 * 3600),
+        training_poll("past", "-100", NOW - 60),
+    ])
+    bot = AsyncMock()
+
+    assert await send_due_reminders(bot, now=NOW, writer=VoteWriter()) == len(QB_TG_IDS)
+    bot.send_message.assert_awaited_once()
+
+    # Через сутки подходит время следующей тренировки
+    bot.send_message.reset_mock()
+    assert await send_due_reminders(bot, now=NOW + 22 * 3600, writer=VoteWriter()) == len(QB_TG_IDS)
+    bot.send_message.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_no_message_when_everyone_voted(schema_db):
+    await save_polls([training_poll("qb", "-100", NOW + 3600)])
+    await save_poll_votes([("qb", tg_id, 0, NOW) for tg_id in QB_TG_IDS], [])
+    bot = AsyncMock()
+
+    assert await send_due_reminders(bot, now=NOW, writer=VoteWriter()) == 0
+    bot.send_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_poll_sent_inside_window_is_not_reminded(schema_db):
+    """Тест: опрос, отправленный меньше чем за REMINDER_HOURS_BEFORE часов до тренировки, не дублируется напоминанием."""
+    await save_polls([training_poll("late", "-100", NOW + 3600, created_at=NOW - 60)])
+    bot = AsyncMock()
+
+    assert await send_due_reminders(bot, now=NOW, writer=VoteWriter()) == 0
+    bot.send_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_chat_is_reminded_on_next_check(schema_db):
+    """
+    Тест: чат без темы ('' в chats) не ломает рассылку, а чат, куда отправить не удалось,
+    получает напоминание при следующей проверке — без повтора в остальные.
+    """
+    await save_polls([
+        training_poll("qb-a", "-100", NOW + 3600, thread_id=""),
+        training_poll("qb-b", "-200", NOW + 3600),
+    ])
+    bot = AsyncMock()
+
+    async def kicked_from_200(chat_id, **kwargs):
+        if int(chat_id) == -200:
+            raise RuntimeError("Forbidden: bot was kicked")
+
+    bot.send_message.side_effect = kicked_from_200
+    await send_due_reminders(bot, now=NOW, writer=VoteWriter())
+    threads = {int(call.kwargs["chat_id"]): call.kwargs["message_thread_id"] for call in bot.send_message.call_args_list}
+    assert threads == {-100: None, -200: 2}
+
+    bot.send_message.reset_mock(side_effect=True)
+    await send_due_reminders(bot, now=NOW + 60, writer=VoteWriter())
+    assert set(sent_texts(bot)) == {-200}
+
+    bot.send_message.reset_mock()
+    assert await send_due_reminders(bot, now=NOW + 120, writer=VoteWriter()) == 0
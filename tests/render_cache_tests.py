@@ -0,0 +1,61 @@
+"""
+Тесты версионного кэша готовых ответов и версии состава
+"""
+import pytest
+from bot.utils import db as db_module
+from bot.utils.render_cache import VersionedCache
+from bot.utils.role_cache import MISSING
+
+
+def test_versioned_cache_drops_entries_on_new_version():
+    version = [1]
+    cache = VersionedCache(lambda: version[0], maxsize=2)
+
+    cache.set("a", "A", version=1)
+    assert cache.get("a") == "A"
+
+    version[0] = 2
+    assert cache.get("a") is MISSING
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1
+
+
+def test_versioned_cache_skips_stale_results():
+    """
+    Тестируем, что результат, построенный по старой версии данных
+    (состав изменился во время рендера), не кэшируется.
+    """
+    version = [1]
+    cache = VersionedCache(lambda: version[0])
+
+    version[0] = 2
+    cache.set("a", "A", version=1)
+
+    assert cache.get("a") is MISSING
+
+
+def test_versioned_cache_is_lru():
+    cache = VersionedCache(lambda: 0, maxsize=2)
+    cache.set("a", 1, version=0)
+    cache.set("b", 2, version=0)
+    cache.get("a")
+    cache.set("c", 3, version=0)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+@pytest.mark.asyncio
+async def test_roster_writes_bump_version(temp_db):
+    version = db_module.roster_version()
+
+    await db_module.insert_player({"name": "Новый", "surname": "Игрок", "tg_username": "new_player"}, [1])
+    assert db_module.roster_version() == version + 1
+
+    await db_module.update_player_field(1, "status", "injured")
+    assert db_module.roster_version() == version + 2
+
+    # Чтение версию не меняет
+    await db_module.list_players()
+    assert db_module.roster_version() == version + 2
@@ -1,6 +1,14 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
 import pytest
+from aiogram import Dispatcher, Router
+from aiogram.filters import Command
+from aiogram.types import Chat, Message, Update, User
 
+from bot.utils import db as db_module
 from bot.utils.role_filter import RoleFilter
+from bot.utils.role_middleware import RoleMiddleware
 
 
 @pytest.mark.asyncio
@@ -12,4 +20,57 @@ async def test_role_filter_blocks_player(message, mock_role_filter):
 
     result = await role_filter(message)
 
-    assert result is False
\ No newline at end of file
+    assert result is False
+
+@pytest.mark.asyncio
+async def test_role_filter_uses_roles_from_middleware(message):
+    # Роли пришли из RoleMiddleware — БД не опрашивается
+    role_filter = RoleFilter(allowed_roles=["admin", "coach"])
+
+    with patch('bot.utils.role_filter.get_user_roles', new_callable=AsyncMock) as mock_get_roles:
+        assert await role_filter(message, user_roles=frozenset({"coach"})) is True
+        assert await role_filter(message, user_roles=frozenset({"player"})) is False
+        assert await role_filter(message, user_roles=None) is False
+        mock_get_roles.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_role_middleware_resolves_roles_once_per_update(bot):
+    """
+    Тест: на один апдейт роли читаются из БД один раз,
+    даже если апдейт проходит через несколько RoleFilter.
+    """
+    dp = Dispatcher()
+    dp.update.outer_middleware(RoleMiddleware())
+    router = Router()
+    seen = {}
+
+    @router.message(Command("cancel"), RoleFilter(allowed_roles=["player"]))
+    async def first(message: Message):
+        seen["first"] = True
+
+    @router.message(Command("cancel"), RoleFilter(allowed_roles=["admin", "coach"]))
+    async def second(message: Message, user_roles: frozenset[str]):
+        seen["second"] = user_roles
+
+    dp.include_router(router)
+
+    update = Update(
+        update_id=1,
+        message=Message(
+            message_id=1,
+            date=datetime.now(),
+            chat=Chat(id=1, type="private"),
+            from_user=User(id=42, is_bot=False, first_name="Coach"),
+            text="/cancel",
+        ),
+    )
+
+    with patch('bot.utils.db.get_user_role', new_callable=AsyncMock) as mock_get_role:
+        mock_get_role.return_value = "coach, admin"
+        db_module.role_cache.clear()
+        await dp.feed_update(bot, update)
+        db_module.role_cache.clear()
+
+    mock_get_role.assert_awaited_once_with(42)
+    assert seen == {"second": frozenset({"coach", "admin"})}
@@ -0,0 +1,145 @@
+"""
+Тесты для отправки сообщений с учётом лимитов Telegram
+"""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from bot.utils.sender import MessageSender, TokenBucket
+
+
+class FakeClock:
+    """Часы, которые двигаются только при sleep — тесты не ждут реального времени."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(6):
+        await bucket.acquire()
+
+    # 2 токена сразу, остальные 4 — по 0.5 с
+    assert clock.now == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_sender_retries_after_429():
+    clock = FakeClock()
+    bot = AsyncMock()
+    bot.send_message.side_effect = [
+        TelegramRetryAfter(SendMessage(chat_id=-1, text="x"), "Too Many Requests", retry_after=7),
+        "ok",
+    ]
+    sender = MessageSender(bot, clock=clock, sleep=clock.sleep)
+
+    result = await sender.send_message(-100, "Привет")
+
+    assert result == "ok"
+    assert bot.send_message.await_count == 2
+    assert sender.retries == 1
+    assert clock.now >= 7
+
+
+@pytest.mark.asyncio
+async def test_sender_gives_up_after_max_retries():
+    clock = FakeClock()
+    bot = AsyncMock()
+    bot.send_message.side_effect = TelegramRetryAfter(SendMessage(chat_id=-1, text="x"), "Too Many Requests", 1)
+    sender = MessageSender(bot, max_retries=2, clock=clock, sleep=clock.sleep)
+
+    with pytest.raises(TelegramRetryAfter):
+        await sender.send_message(-100, "Привет")
+    assert bot.send_message.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_broadcast_keeps_order_per_chat():
+    bot = AsyncMock()
+    sent = []
+
+    async def send_message(chat_id, text, **kwargs):
+        sent.append((chat_id, text))
+        await asyncio.sleep(0)
+        return text
+
+    bot.send_message.side_effect = send_message
+    sender = MessageSender(bot)
+
+    messages = [(-1, None, "a1"), (-2, 5, "b1"), (-1, None, "a2"), ("-2", 5, "b2")]
+    results = await sender.broadcast(messages, parse_mode="HTML")
+
+    assert results == ["a1", "b1", "a2", "b2"]
+    assert [t for c, t in sent if c == -1] == ["a1", "a2"]
+    assert [t for c, t in sent if int(c) == -2] == ["b1", "b2"]
+    # Чаты обслуживаются параллельно: второй чат не ждёт, пока закончится первый
+    assert sent.index((-2, "b1")) < sent.index((-1, "a2"))
+
+
+class LazyClock(FakeClock):
+    """Часы, которые сдвигаются после переключения задач: пока одна задача ждёт, другие видят прежнее время."""
+
+    async def sleep(self, seconds: float):
+        wake = self.now + seconds
+        await asyncio.sleep(0)
+        self.now = max(self.now, wake)
+
+
+@pytest.mark.asyncio
+async def test_429_blocks_other_chats():
+    clock = LazyClock()
+    bot = AsyncMock()
+    sent_at = []
+
+    async def send_message(chat_id, text, **kwargs):
+        if not sent_at:
+            sent_at.append(None)
+            raise TelegramRetryAfter(SendMessage(chat_id=chat_id, text=text), "Too Many Requests", retry_after=7)
+        sent_at.append((chat_id, clock.now))
+
+    bot.send_message.side_effect = send_message
+    sender = MessageSender(bot, clock=clock, sleep=clock.sleep)
+
+    await asyncio.gather(sender.send_message(-100, "a"), sender.send_message(-200, "b"))
+
+    # Сообщение в другой чат тоже ушло только после паузы 429
+    assert all(at >= 7 for _, at in sent_at[1:])
+
+
+@pytest.mark.asyncio
+async def test_broadcast_survives_failed_chat():
+    """Тест: ошибка в одном чате не прерывает рассылку в другие и возвращается в результатах."""
+    bot = AsyncMock()
+    kicked = RuntimeError("Forbidden: bot was kicked")
+
+    async def send_message(chat_id, text, **kwargs):
+        if chat_id == -1:
+            raise kicked
+        return text
+
+    bot.send_message.side_effect = send_message
+    sender = MessageSender(bot)
+
+    results = await sender.broadcast([(-1, None, "a1"), (-2, None, "b1"), (-1, None, "a2"), (-2, None, "b2")])
+
+    assert results == [kicked, "b1", kicked, "b2"]
+    # В чат, где бот больше не состоит, второе сообщение не отправлялось
+    assert bot.send_message.await_count == 3
+    # Замки чатов не копятся после отправки
+    assert sender._chat_locks == {}
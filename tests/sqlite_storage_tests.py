@@ -0,0 +1,122 @@
+"""
+Тесты для FSM-хранилища в SQLite
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from bot.utils.db import save_fsm_records
+from bot.utils.sqlite_storage import SQLiteStorage, storage_key_to_str
+from bot.utils.states import AddPlayerStates
+
+KEY = StorageKey(bot_id=1, chat_id=12345, user_id=12345)
+OTHER_KEY = StorageKey(bot_id=1, chat_id=-100, user_id=777, thread_id=5)
+
+
+@pytest.mark.asyncio
+async def test_state_survives_restart(empty_db):
+    """
+    Тест: состояние и данные диалога сохраняются в БД
+    и доступны новому экземпляру хранилища (после перезапуска бота).
+    """
+    storage = SQLiteStorage(empty_db, flush_interval=60)
+    await storage.set_state(KEY, AddPlayerStates.surname)
+    await storage.update_data(KEY, {"name": "Иван"})
+    await storage.set_data(OTHER_KEY, {"options": ["Буду", "Не буду"]})
+
+    # Write-behind: пока в памяти, одним сбросом на close()
+    assert storage.flushes == 0
+    await storage.close()
+    assert storage.flushes == 1
+
+    restarted = SQLiteStorage(empty_db)
+    assert await restarted.get_state(KEY) == AddPlayerStates.surname.state
+    assert await restarted.get_data(KEY) == {"name": "Иван"}
+    assert await restarted.get_data(OTHER_KEY) == {"options": ["Буду", "Не буду"]}
+    assert await restarted.get_state(OTHER_KEY) is None
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_cleared_state_is_deleted(empty_db):
+    storage = SQLiteStorage(empty_db, flush_interval=0)
+    await storage.set_state(KEY, AddPlayerStates.name)
+    await storage.set_data(KEY, {"name": "Иван"})
+
+    await storage.set_state(KEY, None)
+    await storage.set_data(KEY, {})
+    await storage.close()
+
+    restarted = SQLiteStorage(empty_db)
+    assert await restarted.get_state(KEY) is None
+    assert await restarted.get_data(KEY) == {}
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_states_expire(empty_db):
+    storage = SQLiteStorage(empty_db, flush_interval=0, ttl=3600)
+    await storage.set_state(KEY, AddPlayerStates.name)
+    await storage.set_state(OTHER_KEY, AddPlayerStates.role)
+
+    # Делаем одно состояние «брошенным» два часа назад
+    storage._records[storage_key_to_str(KEY)].updated_at = time.time() - 7200
+    storage._dirty.add(storage_key_to_str(KEY))
+    await storage.flush()
+
+    assert await storage.expire() == 1
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_state(OTHER_KEY) == AddPlayerStates.role.state
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_cached_stale_state_is_not_returned(empty_db):
+    """Тест: устаревшее состояние не отдаётся, даже если expire() ещё не успел убрать его из памяти."""
+    storage = SQLiteStorage(empty_db, flush_interval=0, ttl=3600)
+    await storage.set_state(KEY, AddPlayerStates.name)
+    storage._records[storage_key_to_str(KEY)].updated_at = time.time() - 7200
+
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_data(KEY) == {}
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_empty_records_are_not_kept_in_memory(empty_db):
+    """Тест: чтение состояния пользователей без диалога не копит пустые записи в памяти."""
+    storage = SQLiteStorage(empty_db, flush_interval=60)
+    for user_id in range(100):
+        await storage.get_state(StorageKey(bot_id=1, chat_id=user_id, user_id=user_id))
+    await storage.set_state(KEY, AddPlayerStates.name)
+
+    await storage.flush()
+    assert list(storage._records) == [storage_key_to_str(KEY)]
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_close_during_flush_keeps_states(empty_db):
+    """Тест: close(), отменивший сброс посреди записи, не теряет изменения этого сброса."""
+    storage = SQLiteStorage(empty_db, flush_interval=0.01)
+    started = asyncio.Event()
+    calls = []
+
+    async def slow_save(upserts, deletes, db_path=None):
+        calls.append(upserts)
+        if len(calls) == 1:
+            started.set()
+            await asyncio.Event().wait()
+        await save_fsm_records(upserts, deletes, db_path=db_path)
+
+    with patch("bot.utils.sqlite_storage.save_fsm_records", new=slow_save):
+        await storage.set_state(KEY, AddPlayerStates.surname)
+        await started.wait()
+        await storage.close()
+
+    restarted = SQLiteStorage(empty_db)
+    assert await restarted.get_state(KEY) == AddPlayerStates.surname.state
+    await restarted.close()
@@ -0,0 +1,81 @@
+"""
+Тесты генератора синтетического состава и работы с составом в 1000 человек
+"""
+import re
+import sqlite3
+
+import pytest
+from bot.handlers.list_players import format_person_line, has_role
+from bot.utils import db as db_module
+from bot.utils.notifications import build_players_mention_list, pack_mentions
+from bot.utils.text_chunks import TELEGRAM_MESSAGE_LIMIT, telegram_len
+from data.synthetic_roster import build_roster_db, generate_roster
+
+CYRILLIC = re.compile(r"^[А-ЯЁ][а-яё]+$")
+
+
+def test_generator_is_deterministic():
+    first = list(generate_roster(200, positions=9, seed=1))
+
+    assert first == list(generate_roster(200, positions=9, seed=1))
+    assert first != list(generate_roster(200, positions=9, seed=2))
+
+
+def test_generator_produces_realistic_rows():
+    members = list(generate_roster(2000, positions=9))
+    names = {m[0] for m in members} | {m[1] for m in members}
+    usernames = [m[4] for m in members if m[4]]
+    role_sets = {m[-1] for m in members}
+
+    assert all(CYRILLIC.match(name) for name in names)
+    assert len(usernames) == len(set(usernames))
+    assert {m[7] for m in members} == {"active", "injured", "inactive"}
+    # Есть участники с несколькими ролями и чистые тренеры
+    assert ("player", "coach") in role_sets
+    assert ("coach",) in role_sets
+    assert all(m[6] is None or 1 <= m[6] <= 9 for m in members)
+
+
+@pytest.mark.asyncio
+async def test_build_roster_db_fills_all_tables(tmp_path):
+    db_file = await build_roster_db(tmp_path / "roster.db", 500)
+
+    conn = sqlite3.connect(db_file)
+    # +1 — дефолтный администратор из create_all_tables
+    assert conn.execute("SELECT COUNT(*) FROM team").fetchone()[0] == 501
+    # У каждого участника есть хотя бы одна роль
+    assert conn.execute(
+        "SELECT COUNT(*) FROM team t WHERE NOT EXISTS (SELECT 1 FROM player_roles pr WHERE pr.player_id = t.id)"
+    ).fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM chats").fetchone()[0] == 9
+    conn.close()
+
+
+@pytest.mark.asyncio
+async def test_list_players_at_scale(roster_db):
+    players = await db_module.list_players()
+
+    assert len(players) == 1001
+    coaches = [p for p in players if has_role(p, "coach")]
+    assert 0 < len(coaches) < len(players)
+
+    lines = [format_person_line(p, i) for i, p in enumerate(players, start=1)]
+    assert all(line.endswith("\n") for line in lines)
+    # Весь состав в одно сообщение Telegram не помещается
+    assert telegram_len("".join(lines)) > TELEGRAM_MESSAGE_LIMIT
+
+
+@pytest.mark.asyncio
+async def test_mentions_at_scale(roster_db):
+    mentions = await build_players_mention_list(position="QB")
+
+    conn = sqlite3.connect(roster_db)
+    expected = conn.execute(
+        "SELECT COUNT(*) FROM team t JOIN positions p ON p.id = t.position_id "
+        "WHERE p.position = 'QB' AND t.status = 'active'"
+    ).fetchone()[0]
+    conn.close()
+
+    assert len(mentions) == expected > 0
+    messages = pack_mentions(mentions)
+    assert all(telegram_len(m) <= TELEGRAM_MESSAGE_LIMIT for m in messages)
@@ -0,0 +1,129 @@
+"""
+Тесты записи голосов в опросах (PollAnswer -> poll_votes)
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiogram import Dispatcher
+from aiogram.types import PollAnswer, Update, User
+
+from bot.handlers import poll_answers
+from bot.utils.db import get_poll_votes, save_poll_votes
+from bot.utils.role_middleware import RoleMiddleware
+from bot.utils.vote_writer import VoteWriter
+
+
+@pytest.mark.asyncio
+async def test_vote_burst_is_one_transaction(empty_db):
+    """
+    Тест: волна голосов записывается одним сбросом, а передумавший
+    участник попадает в БД только с последним голосом.
+    """
+    writer = VoteWriter(empty_db, flush_interval=60)
+    for tg_id in range(100):
+        await writer.record("p1", tg_id, [tg_id % 3])
+    await writer.record("p1", 5, [0])
+    await writer.record("p1", 7, [])
+
+    assert writer.flushes == 0
+    assert writer.pending_votes("p1")[7] is None
+    await writer.close()
+    assert writer.flushes == 1
+
+    votes = await get_poll_votes("p1", empty_db)
+    assert len(votes) == 99
+    assert votes[5] == 0
+    assert 7 not in votes
+
+
+@pytest.mark.asyncio
+async def test_retracted_vote_is_deleted(empty_db):
+    writer = VoteWriter(empty_db, flush_interval=0)
+
+    await writer.record("p1", 42, [1])
+    assert await get_poll_votes("p1", empty_db) == {42: 1}
+
+    await writer.record("p1", 42, [])
+    assert await get_poll_votes("p1", empty_db) == {}
+    assert writer.flushes == 2
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_immediately(empty_db):
+    writer = VoteWriter(empty_db, flush_interval=60, batch_size=10)
+
+    for tg_id in range(25):
+        await writer.record("p1", tg_id, [0])
+
+    assert writer.flushes == 2
+    assert len(await get_poll_votes("p1", empty_db)) == 20
+    await writer.close()
+    assert len(await get_poll_votes("p1", empty_db)) == 25
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_votes(empty_db):
+    writer = VoteWriter(empty_db, flush_interval=60)
+    await writer.record("p1", 1, [0])
+
+    with patch("bot.utils.vote_writer.save_poll_votes", new=AsyncMock(side_effect=RuntimeError("disk I/O error"))):
+        with pytest.raises(RuntimeError):
+            await writer.flush()
+
+    # Голос пришёл заново, пока запись падала: сохраняется более новый
+    await writer.record("p1", 1, [2])
+    await writer.close()
+    assert await get_poll_votes("p1", empty_db) == {1: 2}
+
+
+@pytest.mark.asyncio
+async def test_close_during_flush_keeps_votes(empty_db):
+    """Тест: остановка бота посреди фонового сброса не теряет пачку, которая записывалась."""
+    writer = VoteWriter(empty_db, flush_interval=0.01)
+    started = asyncio.Event()
+    calls = []
+
+    async def slow_save(upserts, deletes, db_path=None):
+        calls.append(upserts)
+        if len(calls) == 1:
+            started.set()
+            await asyncio.Event().wait()
+        await save_poll_votes(upserts, deletes, db_path=db_path)
+
+    with patch("bot.utils.vote_writer.save_poll_votes", new=slow_save):
+        await writer.record("p1", 1, [0])
+        await started.wait()
+        await writer.close()
+
+    assert await get_poll_votes("p1", empty_db) == {1: 0}
+
+
+@pytest.mark.asyncio
+async def test_poll_answer_update_is_recorded(bot, empty_db):
+    """
+    Тест: PollAnswer проходит через Dispatcher до записи голоса,
+    роли проголосовавшего при этом из БД не читаются.
+    """
+    dp = Dispatcher()
+    dp.update.outer_middleware(RoleMiddleware())
+    dp.include_router(poll_answers.create_router())
+
+    # PollAnswer без валидации: набор обязательных полей меняется от версии к версии API
+    update = Update(
+        update_id=1,
+        poll_answer=PollAnswer.model_construct(
+            poll_id="p1",
+            user=User(id=42, is_bot=False, first_name="Игрок"),
+            option_ids=[1],
+        ),
+    ).as_(bot)
+    writer = VoteWriter(empty_db, flush_interval=60)
+
+    with patch.object(poll_answers, "vote_writer", writer), \
+            patch("bot.utils.role_middleware.get_user_roles", new_callable=AsyncMock) as mock_get_roles:
+        await dp.feed_update(bot, update)
+
+    mock_get_roles.assert_not_called()
+    await writer.close()
+    assert await get_poll_votes("p1", empty_db) == {42: 1}
@@ -0,0 +1,83 @@
+"""
+Тесты webhook-режима: фикстурные апдейты отправляются POST-запросом
+в aiohttp-приложение из bot/main.py
+"""
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot import main as main_module
+from bot.utils.db_pool import get_pool
+
+FIXTURES = Path(__file__).parent / "fixtures" / "updates"
+SECRET = "test-secret"
+
+
+def load_update(name: str) -> dict:
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+@pytest.mark.asyncio
+async def test_webhook_feeds_updates_to_dispatcher(bot, schema_db, monkeypatch):
+    """
+    Тест: апдейты с правильным секретом попадают в Dispatcher,
+    пул БД открывается на старте приложения и закрывается при остановке.
+    """
+    monkeypatch.setattr(main_module, "DB_PATH", schema_db)
+    dp = main_module.create_dispatcher(storage=MemoryStorage())
+
+    received = []
+
+    async def spy(handler, event, data):
+        received.append((event.update_id, data["user_roles"]))
+
+    dp.update.outer_middleware(spy)
+
+    app = main_module.create_webhook_app(bot, dp, path="/webhook", secret=SECRET)
+    async with TestClient(TestServer(app)) as client:
+        assert get_pool() is not None
+
+        for name in ("players_command.json", "cancel_callback.json"):
+            response = await client.post(
+                "/webhook",
+                json=load_update(name),
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET}
+            )
+            assert response.status == 200
+
+        # Апдейты обрабатываются в фоне — ждём завершения задач
+        for _ in range(50):
+            if len(received) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+    assert get_pool() is None
+    assert sorted(received) == [(100001, frozenset({"player"})), (100002, frozenset({"player"}))]
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_wrong_secret(bot, schema_db, monkeypatch):
+    monkeypatch.setattr(main_module, "DB_PATH", schema_db)
+    dp = main_module.create_dispatcher(storage=MemoryStorage())
+    app = main_module.create_webhook_app(bot, dp, path="/webhook", secret=SECRET)
+
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post(
+            "/webhook",
+            json=load_update("players_command.json"),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"}
+        )
+        assert response.status == 401
+
+        response = await client.post("/webhook", json=load_update("players_command.json"))
+        assert response.status == 401
+
+
+def test_webhook_requires_secret(bot):
+    dp = main_module.create_dispatcher(storage=MemoryStorage())
+    with pytest.raises(ValueError):
+        main_module.create_webhook_app(bot, dp, secret=None)